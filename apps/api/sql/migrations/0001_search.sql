@@ -0,0 +1,30 @@
+/* Name search (`/api/search`) for databases created before it existed.
+   New databases get the same objects from `DB.create_all()`.
+   The pg_trgm part is optional: without the extension, search falls back
+   to full-text and substring matching.
+ */
+ALTER TABLE products
+  ADD COLUMN IF NOT EXISTS search_vector tsvector
+  GENERATED ALWAYS AS (
+    to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(iscc_nbs_category, ''))
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector);
+
+-- The same check as `has_pg_trgm`, which guards these objects in `create_all`.
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+    RAISE NOTICE 'pg_trgm is not available, skipping the trigram indexes';
+    RETURN;
+  END IF;
+
+  CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+  CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops);
+  CREATE INDEX IF NOT EXISTS ix_products_iscc_nbs_category_trgm ON products USING gin (iscc_nbs_category gin_trgm_ops);
+  CREATE INDEX IF NOT EXISTS ix_tags_name_trgm ON tags USING gin (name gin_trgm_ops);
+  CREATE INDEX IF NOT EXISTS ix_vendors_name_trgm ON vendors USING gin (name gin_trgm_ops);
+  CREATE INDEX IF NOT EXISTS ix_analogous_name_trgm ON analogous USING gin (name gin_trgm_ops);
+END
+$$;
@@ -0,0 +1,5 @@
+/* GIN indexes answering the `&&` (any) and `@>` (all) category filters on
+   `/api/products?color_range=...&product_type=...`.
+ */
+CREATE INDEX IF NOT EXISTS ix_products_color_range ON products USING gin (color_range);
+CREATE INDEX IF NOT EXISTS ix_products_product_type ON products USING gin (product_type);
@@ -0,0 +1,40 @@
+/* Flattened `product_catalog` read model, kept current by statement-level
+   triggers on its source tables. The functions and triggers are defined once, in
+   domain/catalog/triggers.py: `scripts/migrate.py` creates them before running this file.
+ */
+
+CREATE TABLE IF NOT EXISTS product_catalog (
+  name VARCHAR(255) NOT NULL,
+  slug VARCHAR(100) NOT NULL,
+  iscc_nbs_category VARCHAR(255),
+  color_range colorrangeenum[] NOT NULL,
+  product_type producttypeenum[] NOT NULL,
+  product_line_id UUID NOT NULL,
+  product_line_name VARCHAR(255) NOT NULL,
+  product_line_slug VARCHAR(100) NOT NULL,
+  vendor_id UUID NOT NULL,
+  vendor_name VARCHAR(255) NOT NULL,
+  vendor_slug VARCHAR(100) NOT NULL,
+  hex_color VARCHAR(7),
+  rgb_color FLOAT[],
+  oklch_color FLOAT[],
+  overlay overlayenum,
+  tag_names VARCHAR(100)[] NOT NULL,
+  tag_slugs VARCHAR(100)[] NOT NULL,
+  prices JSONB NOT NULL,
+  refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  id UUID NOT NULL,
+  sa_orm_sentinel INTEGER,
+  CONSTRAINT pk_product_catalog PRIMARY KEY (id),
+  CONSTRAINT uq_product_catalog_slug UNIQUE (slug)
+);
+
+CREATE INDEX IF NOT EXISTS ix_product_catalog_color_range ON product_catalog USING gin (color_range);
+CREATE INDEX IF NOT EXISTS ix_product_catalog_name_id ON product_catalog (name, id);
+CREATE INDEX IF NOT EXISTS ix_product_catalog_product_line_slug ON product_catalog (product_line_slug);
+CREATE INDEX IF NOT EXISTS ix_product_catalog_product_type ON product_catalog USING gin (product_type);
+CREATE INDEX IF NOT EXISTS ix_product_catalog_tag_slugs ON product_catalog USING gin (tag_slugs);
+CREATE INDEX IF NOT EXISTS ix_product_catalog_vendor_slug ON product_catalog (vendor_slug);
+
+-- Backfill, unless done by an earlier run.
+SELECT product_catalog_refresh(ARRAY(SELECT id FROM products)) WHERE NOT EXISTS (SELECT 1 FROM product_catalog);
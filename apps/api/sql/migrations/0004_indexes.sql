@@ -0,0 +1,46 @@
+/* Indexes behind the list, lookup and sync queries of the API, for databases
+   created before they were declared on the models. `src/scripts/verify_indexes.py`
+   checks with EXPLAIN that each route's queries use them.
+
+   CONCURRENTLY keeps the tables writable while the indexes build; run this file
+   outside a transaction (plain `psql -f` does).
+ */
+
+-- Listings only ever read non-deleted rows, so the (name, id) sort indexes are
+-- partial. They replace the full indexes of the same columns, which only exist
+-- on databases built by `create_all` from the models as keyset pagination first
+-- declared them; no migration creates them.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active_name_id
+  ON products (name, id) WHERE is_deleted IS false;
+DROP INDEX CONCURRENTLY IF EXISTS ix_products_name_id;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vendors_active_name_id
+  ON vendors (name, id) WHERE is_deleted IS false;
+DROP INDEX CONCURRENTLY IF EXISTS ix_vendors_name_id;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_product_lines_active_name_id
+  ON product_lines (name, id) WHERE is_deleted IS false;
+
+-- Tags and locales are listed by keyset too, and have no soft deletes.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tags_name_id ON tags (name, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_locales_locale_id ON locales (locale, id);
+
+-- Foreign keys read from the parent side. Relationship loads don't filter on
+-- is_deleted, so these cover every row.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_product_line_id ON products (product_line_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_product_lines_vendor_id ON product_lines (vendor_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_product_variants_product_id_locale_id
+  ON product_variants (product_id, locale_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_product_tag_association_tag_id ON product_tag_association (tag_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_product_analogous_association_analogous_id
+  ON product_analogous_association (analogous_id);
+
+-- One swatch per product. Fails if duplicates exist; find them with
+--   SELECT product_id FROM product_swatches GROUP BY product_id HAVING count(*) > 1;
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_product_swatches_product_id ON product_swatches (product_id);
+
+-- Sync: rows changed since a timestamp, soft-deleted ones included, in (updated_at, id) order.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_updated_at ON products (updated_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vendors_updated_at ON vendors (updated_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_product_lines_updated_at ON product_lines (updated_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_product_variants_updated_at ON product_variants (updated_at, id);
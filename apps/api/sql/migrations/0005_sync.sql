@@ -0,0 +1,35 @@
+/* Delta sync (`/api/sync`): timestamps on tags and swatches, indexes for seeking
+   on (updated_at, id), and tombstones for hard-deleted rows. The functions and triggers
+   recording them are defined once, in domain/sync/triggers.py: `scripts/migrate.py`
+   creates them before running this file.
+   Creation and update timestamps also get database defaults, so rows written in SQL
+   have them too.
+ */
+
+ALTER TABLE tags
+  ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now();
+
+ALTER TABLE product_swatches
+  ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now();
+
+ALTER TABLE users ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN updated_at SET DEFAULT now();
+ALTER TABLE vendors ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN updated_at SET DEFAULT now();
+ALTER TABLE product_lines ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN updated_at SET DEFAULT now();
+ALTER TABLE products ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN updated_at SET DEFAULT now();
+ALTER TABLE product_variants ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN updated_at SET DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS ix_tags_updated_at ON tags (updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_product_swatches_updated_at ON product_swatches (updated_at, id);
+
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+  entity VARCHAR(50) NOT NULL,
+  entity_id UUID NOT NULL,
+  deleted_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  id UUID NOT NULL,
+  sa_orm_sentinel INTEGER,
+  CONSTRAINT pk_sync_tombstones PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_sync_tombstones_deleted_at ON sync_tombstones (deleted_at, id);
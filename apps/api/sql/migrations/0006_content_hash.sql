@@ -0,0 +1,9 @@
+/* Content hashes for incremental re-imports (see domain/importer): the digest of each
+   product, swatch and variant as last imported. A re-import compares them to the digests
+   of the incoming rows and only writes the rows that differ. Rows imported before this
+   migration have no hash, and are rewritten once by the next import.
+ */
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32);
+ALTER TABLE product_swatches ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32);
+ALTER TABLE product_variants ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32);
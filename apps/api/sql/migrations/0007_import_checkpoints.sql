@@ -0,0 +1,16 @@
+/* Checkpoints of vendor file imports (see domain/importer): how far each file has been
+   committed, so that `import_data.py --resume` picks up a failed import where it stopped.
+ */
+
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+  source VARCHAR(1024) NOT NULL,
+  vendor VARCHAR(255),
+  product_line VARCHAR(255),
+  "offset" INTEGER NOT NULL,
+  id UUID NOT NULL,
+  sa_orm_sentinel INTEGER,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  CONSTRAINT pk_import_checkpoints PRIMARY KEY (id),
+  CONSTRAINT uq_import_checkpoints_source UNIQUE (source)
+);
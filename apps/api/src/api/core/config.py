@@ -2,6 +2,7 @@
 
 import os
 import sys
+import tempfile
 from enum import Enum
 from functools import lru_cache, reduce
 from pathlib import Path
@@ -89,6 +90,14 @@ class ApiSettings(BaseSettings):
     API_BASE_URL: str = config("API_BASE_URL", default="http://localhost:8000")
     API_HTTP_PORT: int = config("API_HTTP_PORT", default=8000)
     API_PREFIX: str = config("API_PREFIX_V1", default="/api/v1")
+    # Sync leaves out rows stamped after the oldest transaction still in flight began (see
+    # `domain.sync.service`), less this allowance for rows stamped by the application's clock
+    # rather than the database's, which may be slightly behind.
+    SYNC_CLOCK_SKEW_SECONDS: float = config("SYNC_CLOCK_SKEW_SECONDS", cast=float, default=1.0)
+    # Transactions open for longer than this no longer hold the sync horizon back, so that a
+    # session left idle in a transaction cannot stall every client. Rows such a transaction
+    # writes may be missed by clients that synced meanwhile. The default matches QUEUE_JOB_TIMEOUT.
+    SYNC_MAX_TRANSACTION_SECONDS: float = config("SYNC_MAX_TRANSACTION_SECONDS", cast=float, default=3600.0)
 
     @property
     def API_URL(self) -> str:
@@ -201,6 +210,18 @@ class DatabaseSettings(BaseSettings):
     DB_USER: str = config("DB_USER", default="postgres")
     DB_PASSWORD: str = config("DB_PASSWORD", default="postgres")
     DB_ECHO_LOG: bool = bool(config("DB_ECHO_LOG", default=False))
+    # How sessions serving safe HTTP methods (GET, HEAD, OPTIONS) talk to the database:
+    # "transaction" opens a `READ ONLY` transaction, "autocommit" skips BEGIN/COMMIT entirely
+    # and "off" treats reads like any other request.
+    DB_READ_ONLY_MODE: str = config("DB_READ_ONLY_MODE", default="transaction")
+    # Statements slower than this are logged with their parameters.
+    DB_SLOW_QUERY_MS: float = config("DB_SLOW_QUERY_MS", cast=float, default=200.0)
+    # Re-run slow SELECTs under EXPLAIN (ANALYZE, BUFFERS) and log the plan. This executes them twice.
+    DB_EXPLAIN_SLOW_QUERIES: bool = config("DB_EXPLAIN_SLOW_QUERIES", cast=bool, default=False)
+    # Identical statements repeated this many times in one request are reported as a likely N+1.
+    DB_N_PLUS_ONE_THRESHOLD: int = config("DB_N_PLUS_ONE_THRESHOLD", cast=int, default=5)
+    # Rows fetched per round trip from server-side cursors, e.g. by the catalog export.
+    DB_STREAM_BATCH_SIZE: int = config("DB_STREAM_BATCH_SIZE", cast=int, default=500)
 
     @property
     def DB_URL(self) -> str:
@@ -222,6 +243,12 @@ class RedisCacheSettings(BaseSettings):
     REDIS_URL: str = config("REDIS_URL", default="redis://localhost:6379")
 
     CLIENT_CACHE_MAX_AGE: int = config("CLIENT_CACHE_MAX_AGE", default=60)
+    # Seconds a cached list total stays valid; writes to the counted tables invalidate it sooner.
+    COUNT_CACHE_TTL: int = config("COUNT_CACHE_TTL", cast=int, default=600)
+    # Seconds cached product facet counts stay valid; invalidated by writes like counts.
+    FACET_CACHE_TTL: int = config("FACET_CACHE_TTL", cast=int, default=600)
+    # Seconds a row cached for the multi-get endpoints stays valid; invalidated by writes like counts.
+    RECORD_CACHE_TTL: int = config("RECORD_CACHE_TTL", cast=int, default=600)
 
     @property
     def URL(self) -> str:
@@ -233,6 +260,29 @@ class RedisQueueSettings(BaseSettings):
 
     HOST: str = config("REDIS_QUEUE_HOST", default="localhost")
     PORT: int = config("REDIS_QUEUE_PORT", default=6379)
+    # Jobs a worker process runs at once.
+    MAX_JOBS: int = config("QUEUE_MAX_JOBS", cast=int, default=10)
+    # Seconds a job may run before it is cancelled.
+    JOB_TIMEOUT: int = config("QUEUE_JOB_TIMEOUT", cast=int, default=3600)
+    # Attempts at a job that fails, including the first.
+    JOB_TRIES: int = config("QUEUE_JOB_TRIES", cast=int, default=3)
+
+
+class ImportSettings(BaseSettings):
+    """Settings for vendor imports run as background jobs."""
+
+    # Directory the vendor files enqueued through the API are read from.
+    VENDOR_DATA_DIR: str = config("IMPORT_VENDOR_DATA_DIR", default=os.path.join(ROOT_DIR, "vendor-data"))
+    # Directory the chunks of running imports are written to; every worker must see the same one.
+    SPOOL_DIR: str = config("IMPORT_SPOOL_DIR", default=os.path.join(tempfile.gettempdir(), "color-agent-imports"))
+    # Products of a product line imported per chunk job.
+    CHUNK_SIZE: int = config("IMPORT_CHUNK_SIZE", cast=int, default=500)
+    # Seconds a chunk job may run; one that takes longer fails the attempt, and is retried.
+    CHUNK_TIMEOUT: int = config("IMPORT_CHUNK_TIMEOUT", cast=int, default=1800)
+    # Chunk jobs of one import queued or running at once, across every worker.
+    CONCURRENCY: int = config("IMPORT_CONCURRENCY", cast=int, default=4)
+    # Seconds the progress of an import is kept once it has started.
+    PROGRESS_TTL: int = config("IMPORT_PROGRESS_TTL", cast=int, default=7 * 24 * 60 * 60)
 
 
 class Settings(FastAPISettings):
@@ -244,6 +294,7 @@ class Settings(FastAPISettings):
     admin: AdminUserSettings = Field(default_factory=AdminUserSettings)
     redis: RedisCacheSettings = Field(default_factory=RedisCacheSettings)
     queue: RedisQueueSettings = Field(default_factory=RedisQueueSettings)
+    importer: ImportSettings = Field(default_factory=ImportSettings)
 
 
 @lru_cache()
@@ -1,20 +1,46 @@
 """Database module."""
 
-from typing import AsyncGenerator
+import json
+from typing import Any, AsyncGenerator
 
 from advanced_alchemy.base import orm_registry
-from sqlalchemy import ForeignKeyConstraint, MetaData, Table, inspect
+from sqlalchemy import DDL, ClauseElement, Executable, ForeignKeyConstraint, MetaData, Table, event, inspect, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.schema import DropConstraint, DropTable
 
 from .config import settings
 
 
+# HTTP methods that never write and can be served from a read-only session.
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def has_pg_trgm(ddl, target, bind, **kw) -> bool:
+    """`ddl_if` callable: whether the server can provide the `pg_trgm` extension.
+
+    Trigram indexes are skipped on servers built without the contrib modules,
+    and search falls back to full-text matching there.
+    """
+    if bind is None:
+        return True
+    return bool(
+        bind.execute(text("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')")).scalar()
+    )
+
+
+event.listen(
+    orm_registry.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql", callable_=has_pg_trgm),
+)
+
+
 class DB:
     """Singleton class for managing database connections."""
 
@@ -124,6 +150,63 @@ class DB:
             await conn.commit()
 
 
+async def begin_read_only(session: AsyncSession, mode: str | None = None) -> bool:
+    """Bind a fresh session to a read-only connection.
+
+    Must be called before the session has executed anything, since the execution
+    options only apply when the session procures its connection. Autoflush is
+    disabled as there is nothing to flush on a read.
+
+    Args:
+        session: The session to configure.
+        mode: One of "transaction", "autocommit" or "off" (see `DB_READ_ONLY_MODE`).
+
+    Returns:
+        Whether the session was switched to read-only mode.
+    """
+    mode = mode or settings.db.DB_READ_ONLY_MODE
+
+    if mode == "off" or session.in_transaction():
+        return False
+
+    if mode == "autocommit":
+        execution_options = {"isolation_level": "AUTOCOMMIT"}
+    elif mode == "transaction":
+        execution_options = {"postgresql_readonly": True}
+    else:
+        raise ValueError(f"Unsupported read-only mode: {mode}")
+
+    session.autoflush = False
+    await session.connection(execution_options=execution_options)
+    session.info["read_only"] = True
+    return True
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (<options>) <statement>` as an executable construct."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Executable, *options: str) -> None:
+        self.statement = statement
+        self.options = options or ("FORMAT JSON",)
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f"EXPLAIN ({', '.join(element.options)}) {compiler.process(element.statement, **kw)}"
+
+
+async def explain(session: AsyncSession, statement: Executable, *options: str) -> dict[str, Any]:
+    """Return the top-level node of the planner's JSON plan for a statement."""
+    if not any(option.upper().startswith("FORMAT") for option in options):
+        options = (*options, "FORMAT JSON")
+    plan = (await session.execute(Explain(statement, *options))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
 # Create async engine
 async_engine = create_async_engine(settings.db.DB_URL, echo=settings.db.DB_ECHO_LOG, future=True)
 
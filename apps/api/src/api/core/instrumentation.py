@@ -0,0 +1,185 @@
+"""Per-request SQL instrumentation.
+
+Engine events time every statement. While a request is being served, the
+numbers are collected in a `QueryStats` held in a context variable. The
+request middleware binds the totals to the structlog context, logs the
+slowest statements, and flags statements that repeat often enough to look
+like an N+1 pattern.
+"""
+
+import heapq
+import json
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from structlog.types import EventDict
+
+from .config import settings
+from .logger import get_logger
+
+
+__all__ = [
+    "QueryStats",
+    "add_query_stats",
+    "current_query_stats",
+    "sql_instrumentation_middleware",
+]
+
+logger = get_logger("sql")
+
+"""How many of the slowest statements are kept per request."""
+SLOWEST_STATEMENTS = 5
+
+"""Longest statement or parameter representation written to the logs."""
+MAX_LOGGED_LENGTH = 1000
+
+_query_stats: ContextVar["QueryStats | None"] = ContextVar("query_stats", default=None)
+
+
+@dataclass
+class QueryStats:
+    """Statements executed while serving a single request."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+    slowest: list[tuple[float, int, str, str]] = field(default_factory=list)
+
+    def record(self, statement: str, parameters: Any, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+        entry = (elapsed_ms, self.count, _truncate(statement), _truncate(repr(parameters)))
+        if len(self.slowest) < SLOWEST_STATEMENTS:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def summary(self) -> dict[str, Any]:
+        """Totals suitable for binding to the log context."""
+        return {"db_queries": self.count, "db_time_ms": round(self.total_ms, 2)}
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements executed at least `threshold` times, most frequent first."""
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+
+def current_query_stats() -> QueryStats | None:
+    """The stats of the request being served, if any."""
+    return _query_stats.get()
+
+
+def add_query_stats(_, __, event_dict: EventDict) -> EventDict:
+    """structlog processor adding the running query totals to entries logged during a request."""
+    if (stats := _query_stats.get()) is not None:
+        for key, value in stats.summary().items():
+            event_dict.setdefault(key, value)
+    return event_dict
+
+
+def _truncate(value: str) -> str:
+    return value if len(value) <= MAX_LOGGED_LENGTH else f"{value[:MAX_LOGGED_LENGTH]}…"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+
+    if (stats := _query_stats.get()) is not None:
+        stats.record(statement, parameters, elapsed_ms)
+
+    if elapsed_ms < settings.db.DB_SLOW_QUERY_MS:
+        return
+
+    log = {"duration_ms": round(elapsed_ms, 2), "statement": _truncate(statement)}
+    log["parameters"] = _truncate(repr(parameters))
+    if settings.db.DB_EXPLAIN_SLOW_QUERIES and not executemany and (options := _explain_options(statement)):
+        log["plan"] = _explain(conn, statement, parameters, options)
+    logger.warning("slow_query", **log)
+
+
+def _explain_options(statement: str) -> str | None:
+    """EXPLAIN options for a slow statement, or None for statements that are not explained.
+
+    Only a plain SELECT is re-run under ANALYZE: a `WITH` query may hold
+    data-modifying CTEs, which must not write twice, so it is only planned.
+    """
+    keyword = statement.lstrip().split(None, 1)[0].upper()
+    if keyword == "SELECT":
+        return "ANALYZE, BUFFERS, FORMAT JSON"
+    if keyword == "WITH":
+        return "FORMAT JSON"
+    return None
+
+
+def _explain(conn, statement: str, parameters: Any, options: str) -> Any:
+    """The plan of a slow statement, from `EXPLAIN (options)`.
+
+    The plan is fetched on a raw DBAPI cursor, bypassing the engine events,
+    so the EXPLAIN itself is neither timed nor explained again.
+    """
+    # A failed EXPLAIN must not abort the transaction the request is still using.
+    savepoint = conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT"
+    cursor = conn.connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT explain_slow_query")
+        try:
+            cursor.execute(f"EXPLAIN ({options}) {statement}", parameters)
+            plan = cursor.fetchone()[0]
+        except Exception as e:  # noqa: BLE001 - diagnostics must never fail the request
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+            return f"EXPLAIN failed: {e}"
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT explain_slow_query")
+    finally:
+        cursor.close()
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def sql_instrumentation_middleware() -> Any:
+    """Collect SQL statistics for each request."""
+
+    async def instrument_request(request, call_next):
+        stats = request.state.query_stats = QueryStats()
+        token = _query_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _query_stats.reset(token)
+
+        if not stats.count:
+            return response
+
+        log = {
+            "method": request.method,
+            "path": request.url.path,
+            "slowest": [
+                {"duration_ms": round(ms, 2), "statement": statement, "parameters": parameters}
+                for ms, _, statement, parameters in sorted(stats.slowest, reverse=True)
+            ],
+        }
+        with structlog.contextvars.bound_contextvars(**stats.summary()):
+            if repeated := stats.repeated(settings.db.DB_N_PLUS_ONE_THRESHOLD):
+                logger.warning(
+                    "possible_n_plus_one",
+                    **log,
+                    repeated=[{"count": n, "statement": _truncate(statement)} for statement, n in repeated],
+                )
+            else:
+                logger.debug("db_request_stats", **log)
+        return response
+
+    return instrument_request
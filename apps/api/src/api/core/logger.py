@@ -44,10 +44,14 @@ def drop_color_message_key(_, __, event_dict: EventDict) -> EventDict:
 
 
 def setup_logging(json_logs: bool = False, log_level: str = "INFO"):
+    # Imported here as the instrumentation module logs through this one.
+    from .instrumentation import add_query_stats
+
     timestamper = structlog.processors.TimeStamper(fmt="iso")
 
     shared_processors: list[Processor] = [
         structlog.contextvars.merge_contextvars,
+        add_query_stats,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
         structlog.stdlib.PositionalArgumentsFormatter(),
@@ -135,6 +139,8 @@ def log_request_middleware() -> Any:
             "status_code": response.status_code,
             "client_host": request.client.host if request.client else None,
         }
+        if (query_stats := getattr(request.state, "query_stats", None)) is not None:
+            log_dict.update(query_stats.summary())
 
         logger.info("http_request", **log_dict)
         return response
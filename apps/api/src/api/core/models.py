@@ -5,6 +5,7 @@ from uuid import UUID
 from advanced_alchemy.base import CommonTableAttributes, orm_registry
 from advanced_alchemy.mixins import SlugKey, UniqueMixin
 from advanced_alchemy.types import DateTimeUTC
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -56,6 +57,7 @@ class WithTimeAuditMixin(MappedAsDataclass, init=False):
             DateTimeUTC(timezone=True),
             nullable=False,
             insert_default=partial(datetime.now, timezone.utc),
+            server_default=func.now(),
         )
 
     """Date/time of instance last update."""
@@ -66,6 +68,7 @@ class WithTimeAuditMixin(MappedAsDataclass, init=False):
             DateTimeUTC(timezone=True),
             nullable=False,
             insert_default=partial(datetime.now, timezone.utc),
+            server_default=func.now(),
             onupdate=partial(datetime.now, timezone.utc),
         )
 
@@ -1,5 +1,6 @@
 """Database module."""
 
+import contextlib
 from collections.abc import Callable
 from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
 from typing import Any
@@ -8,12 +9,15 @@ import redis.asyncio as redis
 from advanced_alchemy.extensions.fastapi import AdvancedAlchemy, AsyncSessionConfig
 from advanced_alchemy.extensions.starlette import SQLAlchemyAsyncConfig
 from core.config import RedisCacheSettings, Settings, settings
+from core.database import SAFE_METHODS
+from core.instrumentation import sql_instrumentation_middleware
 
 # from core.logger import log_request_middleware
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 
 # from fastapi.middleware.cors import CORSMiddleware
 from services import Cache, Queue
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 async def on_startup() -> Callable[[FastAPI], _AsyncGeneratorContextManager[Any, None]]:
@@ -62,9 +66,27 @@ async def on_startup() -> Callable[[FastAPI], _AsyncGeneratorContextManager[Any,
     return lifespan
 
 
+class ReadOnlyAwareAsyncConfig(SQLAlchemyAsyncConfig):
+    """SQLAlchemy config whose autocommit handler leaves read-only sessions alone.
+
+    Sessions switched to read-only mode by `get_services` have nothing to commit,
+    so they are only closed instead of paying for a second COMMIT round trip.
+    """
+
+    async def session_handler(self, session: AsyncSession, request: Request, response: Response) -> None:
+        if request.method not in SAFE_METHODS or not session.info.get("read_only"):
+            return await super().session_handler(session=session, request=request, response=response)
+
+        try:
+            await session.close()
+        finally:
+            with contextlib.suppress(AttributeError, KeyError):
+                delattr(request.state, self.session_key)
+
+
 session_config = AsyncSessionConfig(expire_on_commit=False)
 
-sqlalchemy_config = SQLAlchemyAsyncConfig(
+sqlalchemy_config = ReadOnlyAwareAsyncConfig(
     connection_string=settings.db.DB_URL,
     session_config=session_config,
     commit_mode="autocommit",
@@ -119,6 +141,9 @@ app.state.locale = {
 
 alchemy = AdvancedAlchemy(config=sqlalchemy_config, app=app)
 
+# Registered after the session middleware so it wraps it and also times the commit.
+app.middleware("http")(sql_instrumentation_middleware())
+
 # import importlib
 # import pathlib
 #
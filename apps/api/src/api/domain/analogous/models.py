@@ -2,9 +2,10 @@ from collections.abc import Hashable
 from typing import TYPE_CHECKING
 
 from advanced_alchemy.utils.text import slugify
+from core.database import has_pg_trgm
 from core.models import Entity, WithUniqueSlugMixin
 from domain.associations import product_analogous_association
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.elements import ColumnElement
 
@@ -32,3 +33,11 @@ class Analogous(Entity, WithUniqueSlugMixin):
     def unique_filter(cls, name: str, slug: str | None = None, *args, **kwargs) -> ColumnElement[bool]:
         """SQL filter for finding existing records."""
         return cls.slug == slugify(name)
+
+# Trigrams back `/api/search` as well as `ILIKE '%...%'` filters on the name.
+Index(
+    "ix_analogous_name_trgm",
+    Analogous.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+).ddl_if(callable_=has_pg_trgm)
@@ -50,8 +50,9 @@ async def list_analogous(
     tag_name: str | None = None,
 ):
     """List all analogous colors"""
-    analogous = await container.provide_analogous.list(Analogous.name.ilike(f"%{tag_name}%"))
-    return container.provide_analogous.to_schema(analogous)
+    filters = [Analogous.name.icontains(tag_name, autoescape=True)] if tag_name else []
+    analogous = await container.provide_analogous.list(*filters)
+    return container.provide_analogous.to_schema(analogous, schema_type=AnalogousResponse).items
 
 
 @analogous_router.put("/analogous/{analogous_id}", response_model=AnalogousResponse, status_code=HTTP_200_OK)
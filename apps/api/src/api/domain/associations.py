@@ -1,5 +1,5 @@
 from advanced_alchemy.base import orm_registry
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 
 
 # Product to Tag association
@@ -17,3 +17,7 @@ product_analogous_association = Table(
     Column("product_id", ForeignKey("products.id"), primary_key=True),
     Column("analogous_id", ForeignKey("analogous.id"), primary_key=True),
 )
+
+# The primary keys lead with product_id; these serve lookups from the other side, e.g. tag filters.
+Index("ix_product_tag_association_tag_id", product_tag_association.c.tag_id)
+Index("ix_product_analogous_association_analogous_id", product_analogous_association.c.analogous_id)
@@ -0,0 +1,104 @@
+"""Fetching many rows by ID for the `:batchGet` endpoints.
+
+Each row is cached in Redis under its ID, in a key that also carries the
+generation of every table its response reads (see `domain.pagination`), so
+any write to those tables retires the cached copies. A request costs one
+`MGET`; the IDs that miss are read together with `WHERE id = ANY(:ids)`,
+whose single array parameter keeps the statement the same however many IDs
+are asked for.
+"""
+
+from collections.abc import Iterable, Sequence
+from typing import Any
+from uuid import UUID
+
+from core.config import settings
+from core.logger import get_logger
+from exceptions import MissingClientError
+from fastapi import Depends, Query
+from redis.exceptions import RedisError
+from schemas.base import BatchGetResponse, SchemaT
+from services import Cache
+from sqlalchemy import Uuid, any_, inspect, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from typing_extensions import Annotated
+
+from .pagination import table_generations
+
+
+logger = get_logger(__name__)
+
+"""Most IDs accepted by one `:batchGet` request."""
+MAX_BATCH_GET_IDS = 100
+
+
+def provide_batch_get_ids(
+    ids: list[UUID] = Query(
+        min_length=1,
+        max_length=MAX_BATCH_GET_IDS,
+        description=f"IDs to fetch, repeating the parameter for each (at most {MAX_BATCH_GET_IDS}).",
+    ),
+) -> list[UUID]:
+    return list(dict.fromkeys(ids))
+
+
+BatchGetIds = Annotated[list[UUID], Depends(provide_batch_get_ids)]
+
+
+def loaded_tables(model: Any, relationships: Iterable[str] = ()) -> list[str]:
+    """Tables read to build `model` with `relationships` loaded."""
+    mapper = inspect(model)
+    tables = {table.name for table in mapper.tables}
+    for name in relationships:
+        relationship = mapper.relationships[name]
+        tables.update(table.name for table in relationship.mapper.tables)
+        if relationship.secondary is not None:
+            tables.add(relationship.secondary.name)
+    return sorted(tables)
+
+
+async def batch_get(
+    service,
+    ids: Sequence[UUID],
+    *,
+    schema_type: type[SchemaT],
+    namespace: str,
+    relationships: Iterable[str] = (),
+    **kwargs: Any,
+) -> BatchGetResponse[SchemaT]:
+    """The rows of `service` with the given IDs, served from the cache where possible.
+
+    `namespace` must tell apart every shape the same rows are cached in, and
+    `relationships` name the relationships loaded into them. Extra keyword
+    arguments (e.g. `load`) are passed on to the service's `list`.
+    """
+    model = service.repository.model_type
+    cached: list[bytes | None] = [None] * len(ids)
+
+    try:
+        client = Cache.instance().client
+        prefix = f"records:{namespace}:{await table_generations(client, loaded_tables(model, relationships))}"
+        cached = await client.mget([f"{prefix}:{id_}" for id_ in ids])
+    except (MissingClientError, RedisError) as e:
+        logger.debug("Record cache unavailable, reading every row", error=str(e))
+        client = None
+
+    found = {id_: schema_type.model_validate_json(raw) for id_, raw in zip(ids, cached, strict=True) if raw is not None}
+
+    if misses := [id_ for id_ in ids if id_ not in found]:
+        rows = await service.list(model.id == any_(literal(misses, ARRAY(Uuid))), **kwargs)
+        read = {row.id: schema_type.model_validate(row, from_attributes=True) for row in rows}
+        found.update(read)
+        if client is not None and read:
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    for id_, item in read.items():
+                        pipe.set(f"{prefix}:{id_}", item.model_dump_json(), ex=settings.redis.RECORD_CACHE_TTL)
+                    await pipe.execute()
+            except RedisError as e:
+                logger.debug("Could not cache records", namespace=namespace, error=str(e))
+
+    return BatchGetResponse[schema_type](
+        items=[found[id_] for id_ in ids if id_ in found],
+        missing=[id_ for id_ in ids if id_ not in found],
+    )
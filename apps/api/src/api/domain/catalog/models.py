@@ -0,0 +1,56 @@
+from datetime import datetime
+from uuid import UUID
+
+from advanced_alchemy.types import DateTimeUTC
+from core.models import Entity
+from domain.enums import ColorRangeEnum, OverlayEnum, ProductTypeEnum
+from sqlalchemy import Enum, Float, Index, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import triggers  # noqa: F401 - registers the refresh triggers with the metadata
+
+
+class ProductCatalog(Entity):
+    """Flattened, read-only view of a product for list and search endpoints.
+
+    One row per non-deleted product, keyed by the product id, with its vendor,
+    product line, swatch colours, categories, tags and per-locale price range.
+    Rows are written only by the triggers in `domain.catalog.triggers`.
+    """
+
+    __tablename__ = "product_catalog"
+
+    name: Mapped[str] = mapped_column(String(255))
+    slug: Mapped[str] = mapped_column(String(100), unique=True)
+    iscc_nbs_category: Mapped[str | None] = mapped_column(String(255))
+    color_range: Mapped[list[ColorRangeEnum]] = mapped_column(ARRAY(Enum(ColorRangeEnum, inherit_schema=True)))
+    product_type: Mapped[list[ProductTypeEnum]] = mapped_column(ARRAY(Enum(ProductTypeEnum, inherit_schema=True)))
+
+    product_line_id: Mapped[UUID] = mapped_column()
+    product_line_name: Mapped[str] = mapped_column(String(255))
+    product_line_slug: Mapped[str] = mapped_column(String(100))
+    vendor_id: Mapped[UUID] = mapped_column()
+    vendor_name: Mapped[str] = mapped_column(String(255))
+    vendor_slug: Mapped[str] = mapped_column(String(100))
+
+    hex_color: Mapped[str | None] = mapped_column(String(7))
+    rgb_color: Mapped[list[float] | None] = mapped_column(ARRAY(Float))
+    oklch_color: Mapped[list[float] | None] = mapped_column(ARRAY(Float))
+    overlay: Mapped[OverlayEnum | None] = mapped_column(Enum(OverlayEnum))
+
+    tag_names: Mapped[list[str]] = mapped_column(ARRAY(String(100)), default_factory=list)
+    tag_slugs: Mapped[list[str]] = mapped_column(ARRAY(String(100)), default_factory=list)
+    # {"en_US": {"min": 399, "max": 599}}, in cents.
+    prices: Mapped[dict[str, dict[str, int]]] = mapped_column(JSONB, default_factory=dict)
+
+    refreshed_at: Mapped[datetime] = mapped_column(DateTimeUTC(timezone=True))
+
+
+# Keyset pagination seeks on (name, id); see `domain.filters.KeysetPagination`.
+Index("ix_product_catalog_name_id", ProductCatalog.name, ProductCatalog.id)
+Index("ix_product_catalog_color_range", ProductCatalog.color_range, postgresql_using="gin")
+Index("ix_product_catalog_product_type", ProductCatalog.product_type, postgresql_using="gin")
+Index("ix_product_catalog_tag_slugs", ProductCatalog.tag_slugs, postgresql_using="gin")
+Index("ix_product_catalog_vendor_slug", ProductCatalog.vendor_slug)
+Index("ix_product_catalog_product_line_slug", ProductCatalog.product_line_slug)
@@ -0,0 +1,62 @@
+from advanced_alchemy.filters import SearchFilter
+from domain.dependencies import Services
+from domain.filters import ArrayFilter, CursorPaginatedResponse, PaginatedResponse
+from domain.pagination import CountStrategyParam, paginate
+from fastapi import APIRouter, Query
+from schemas.base import CursorPage, OffsetPage
+from starlette.status import HTTP_200_OK
+from typing_extensions import Annotated
+
+from .models import ProductCatalog
+from .schemas import ProductCatalogFilters, ProductCatalogResponse
+
+
+catalog_router = APIRouter(tags=["Catalog"])
+
+
+@catalog_router.get(
+    "/catalog",
+    response_model=OffsetPage[ProductCatalogResponse] | CursorPage[ProductCatalogResponse],
+    status_code=HTTP_200_OK,
+)
+async def list_catalog(
+    container: Services,
+    filter_query: Annotated[ProductCatalogFilters, Query()],
+    limit_offset: PaginatedResponse,
+    cursor: CursorPaginatedResponse,
+    count: CountStrategyParam,
+):
+    """List products from the flattened catalog, without joins"""
+    filters = []
+    if filter_query.name:
+        filters.append(SearchFilter("name", filter_query.name, ignore_case=True))
+    if filter_query.vendor:
+        filters.append(ProductCatalog.vendor_slug == filter_query.vendor)
+    if filter_query.product_line:
+        filters.append(ProductCatalog.product_line_slug == filter_query.product_line)
+    if filter_query.tag:
+        filters.append(ArrayFilter("tag_slugs", filter_query.tag, filter_query.category_match))
+    if filter_query.color_range:
+        filters.append(ArrayFilter("color_range", filter_query.color_range, filter_query.category_match))
+    if filter_query.product_type:
+        filters.append(ArrayFilter("product_type", filter_query.product_type, filter_query.category_match))
+
+    if cursor is not None:
+        results = await container.provide_catalog.list(*filters, cursor)
+        return cursor.to_page(results, schema_type=ProductCatalogResponse)
+
+    return await paginate(
+        container.provide_catalog,
+        *filters,
+        limit_offset=limit_offset,
+        count=count,
+        schema_type=ProductCatalogResponse,
+        order_by=ProductCatalog.name.asc(),
+    )
+
+
+@catalog_router.get("/catalog/{slug}", response_model=ProductCatalogResponse, status_code=HTTP_200_OK)
+async def get_catalog_product(slug: str, container: Services):
+    """Get a product from the flattened catalog by slug"""
+    product = await container.provide_catalog.get_one(ProductCatalog.slug == slug)
+    return container.provide_catalog.to_schema(product, schema_type=ProductCatalogResponse)
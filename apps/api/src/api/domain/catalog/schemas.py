@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Annotated
+from uuid import UUID
+
+from domain.enums import ColorRangeEnum, OverlayEnum, ProductTypeEnum
+from domain.filters import ArrayMatch
+from domain.helpers import split_comma_separated
+from pydantic import BaseModel, Field, field_validator
+
+
+class PriceRange(BaseModel):
+    min: Annotated[int, Field(description="Lowest variant price in cents")]
+    max: Annotated[int, Field(description="Highest variant price in cents")]
+
+
+class ProductCatalogResponse(BaseModel):
+    id: Annotated[UUID, Field(description="Product ID")]
+    name: Annotated[str, Field(description="Product name")]
+    slug: Annotated[str, Field(description="Product slug")]
+    iscc_nbs_category: Annotated[str | None, Field(description="ISCC NBS color category", default=None)]
+    color_range: Annotated[list[ColorRangeEnum], Field(description="Color ranges")]
+    product_type: Annotated[list[ProductTypeEnum], Field(description="Product types")]
+    product_line_id: Annotated[UUID, Field(description="Product line ID")]
+    product_line_name: Annotated[str, Field(description="Product line name")]
+    product_line_slug: Annotated[str, Field(description="Product line slug")]
+    vendor_id: Annotated[UUID, Field(description="Vendor ID")]
+    vendor_name: Annotated[str, Field(description="Vendor name")]
+    vendor_slug: Annotated[str, Field(description="Vendor slug")]
+    hex_color: Annotated[str | None, Field(description="Swatch hex color", default=None)]
+    rgb_color: Annotated[list[float] | None, Field(description="Swatch RGB color", default=None)]
+    oklch_color: Annotated[list[float] | None, Field(description="Swatch OKLCH color", default=None)]
+    overlay: Annotated[OverlayEnum | None, Field(description="Swatch overlay effect", default=None)]
+    tag_names: Annotated[list[str], Field(description="Tag names", default_factory=list)]
+    tag_slugs: Annotated[list[str], Field(description="Tag slugs", default_factory=list)]
+    prices: Annotated[
+        dict[str, PriceRange],
+        Field(description="Price range of the variants per locale", examples=[{"en_US": {"min": 399, "max": 599}}]),
+    ]
+    refreshed_at: Annotated[datetime, Field(description="When the row was last rebuilt")]
+
+    class Config:
+        from_attributes = True
+
+
+class ProductCatalogFilters(BaseModel):
+    name: Annotated[str | None, Field(description="Filter by name", default=None)]
+    vendor: Annotated[str | None, Field(description="Filter by vendor slug", default=None)]
+    product_line: Annotated[str | None, Field(description="Filter by product line slug", default=None)]
+    tag: Annotated[list[str] | None, Field(description="Filter by tag slugs, comma-separated", default=None)]
+    product_type: Annotated[
+        list[ProductTypeEnum] | None,
+        Field(description="Filter by product types, comma-separated", examples=["Metallic,Wash"], default=None),
+    ]
+    color_range: Annotated[
+        list[ColorRangeEnum] | None,
+        Field(description="Filter by color ranges, comma-separated", examples=["Red,Orange"], default=None),
+    ]
+    category_match: Annotated[
+        ArrayMatch,
+        Field(
+            description="Whether products need `any` or `all` of the given tags, product types and color ranges",
+            default=ArrayMatch.any,
+        ),
+    ]
+
+    @field_validator("tag", "product_type", "color_range", mode="before")
+    @classmethod
+    def split_values(cls, value):
+        return split_comma_separated(value)
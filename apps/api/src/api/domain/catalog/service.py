@@ -0,0 +1,20 @@
+from advanced_alchemy.repository import SQLAlchemyAsyncRepository
+from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService
+from sqlalchemy import text
+
+from .models import ProductCatalog
+
+
+class ProductCatalogService(SQLAlchemyAsyncRepositoryService[ProductCatalog]):
+    """Read access to the flattened product catalog."""
+
+    class Repo(SQLAlchemyAsyncRepository[ProductCatalog]):
+        """Repository for the ProductCatalog read model."""
+
+        model_type = ProductCatalog
+
+    repository_type = Repo
+
+    async def rebuild(self) -> None:
+        """Rebuild every row, e.g. after loading data with the triggers disabled."""
+        await self.repository.session.execute(text("SELECT product_catalog_refresh(ARRAY(SELECT id FROM products))"))
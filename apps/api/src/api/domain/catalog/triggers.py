@@ -0,0 +1,152 @@
+"""Triggers keeping `product_catalog` in step with the tables it flattens.
+
+`product_catalog_refresh(ids)` rebuilds the rows of the given products
+(deleting those that no longer exist or are soft-deleted). Statement-level
+triggers on every source table collect the affected product ids from their
+transition tables, so a bulk write refreshes each product once per
+statement rather than once per row. As only the triggers write
+`product_catalog`, its cached counts are invalidated by writes to the source
+tables (see `domain.pagination.derived_table`).
+"""
+
+from advanced_alchemy.base import orm_registry
+from domain.pagination import derived_table
+from sqlalchemy import DDL, event
+
+
+REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION product_catalog_refresh(ids uuid[]) RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+  IF ids IS NULL OR cardinality(ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  DELETE FROM product_catalog c
+  WHERE c.id = ANY(ids)
+    AND NOT EXISTS (SELECT 1 FROM products p WHERE p.id = c.id AND p.is_deleted IS FALSE);
+
+  INSERT INTO product_catalog AS c (
+    id, name, slug, iscc_nbs_category, color_range, product_type,
+    product_line_id, product_line_name, product_line_slug, vendor_id, vendor_name, vendor_slug,
+    hex_color, rgb_color, oklch_color, overlay, tag_names, tag_slugs, prices, refreshed_at
+  )
+  SELECT
+    p.id, p.name, p.slug, p.iscc_nbs_category, p.color_range, p.product_type,
+    pl.id, pl.name, pl.slug, v.id, v.name, v.slug,
+    s.hex_color, s.rgb_color, s.oklch_color, s.overlay,
+    coalesce(t.names, '{}'), coalesce(t.slugs, '{}'), coalesce(pr.prices, '{}'), now()
+  FROM products p
+  JOIN product_lines pl ON pl.id = p.product_line_id
+  JOIN vendors v ON v.id = pl.vendor_id
+  LEFT JOIN product_swatches s ON s.product_id = p.id
+  LEFT JOIN LATERAL (
+    SELECT array_agg(tag.name ORDER BY tag.name) AS names, array_agg(tag.slug ORDER BY tag.name) AS slugs
+    FROM product_tag_association pta
+    JOIN tags tag ON tag.id = pta.tag_id
+    WHERE pta.product_id = p.id
+  ) t ON TRUE
+  LEFT JOIN LATERAL (
+    SELECT jsonb_object_agg(locale, jsonb_build_object('min', min_price, 'max', max_price)) AS prices
+    FROM (
+      SELECT l.locale, min(pv.price) AS min_price, max(pv.price) AS max_price
+      FROM product_variants pv
+      JOIN locales l ON l.id = pv.locale_id
+      WHERE pv.product_id = p.id AND pv.is_deleted IS FALSE
+      GROUP BY l.locale
+    ) per_locale
+  ) pr ON TRUE
+  WHERE p.id = ANY(ids) AND p.is_deleted IS FALSE
+  ON CONFLICT (id) DO UPDATE SET
+    name = EXCLUDED.name,
+    slug = EXCLUDED.slug,
+    iscc_nbs_category = EXCLUDED.iscc_nbs_category,
+    color_range = EXCLUDED.color_range,
+    product_type = EXCLUDED.product_type,
+    product_line_id = EXCLUDED.product_line_id,
+    product_line_name = EXCLUDED.product_line_name,
+    product_line_slug = EXCLUDED.product_line_slug,
+    vendor_id = EXCLUDED.vendor_id,
+    vendor_name = EXCLUDED.vendor_name,
+    vendor_slug = EXCLUDED.vendor_slug,
+    hex_color = EXCLUDED.hex_color,
+    rgb_color = EXCLUDED.rgb_color,
+    oklch_color = EXCLUDED.oklch_color,
+    overlay = EXCLUDED.overlay,
+    tag_names = EXCLUDED.tag_names,
+    tag_slugs = EXCLUDED.tag_slugs,
+    prices = EXCLUDED.prices,
+    refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$;
+"""
+
+# TG_ARGV[0] names the column of the changed rows identifying what changed.
+CHANGED_FUNCTION = """
+CREATE OR REPLACE FUNCTION product_catalog_changed() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+  changed uuid[] := '{}';
+  keys uuid[];
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    EXECUTE format('SELECT array_agg(DISTINCT %I) FROM new_rows', TG_ARGV[0]) INTO keys;
+    changed := changed || coalesce(keys, '{}');
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    EXECUTE format('SELECT array_agg(DISTINCT %I) FROM old_rows', TG_ARGV[0]) INTO keys;
+    changed := changed || coalesce(keys, '{}');
+  END IF;
+
+  PERFORM product_catalog_refresh(CASE TG_TABLE_NAME
+    WHEN 'product_lines' THEN ARRAY(SELECT id FROM products WHERE product_line_id = ANY(changed))
+    WHEN 'vendors' THEN ARRAY(
+      SELECT p.id FROM products p JOIN product_lines pl ON pl.id = p.product_line_id WHERE pl.vendor_id = ANY(changed)
+    )
+    WHEN 'tags' THEN ARRAY(SELECT product_id FROM product_tag_association WHERE tag_id = ANY(changed))
+    ELSE changed
+  END);
+  RETURN NULL;
+END;
+$$;
+"""
+
+"""Source tables and the column of each identifying the change."""
+SOURCES = {
+    "products": "id",
+    "product_swatches": "product_id",
+    "product_variants": "product_id",
+    "product_tag_association": "product_id",
+    "product_lines": "id",
+    "vendors": "id",
+    "tags": "id",
+}
+
+
+def trigger_statements() -> list[str]:
+    """Statements (re)creating the catalog triggers on every source table."""
+    statements = []
+    for table, column in SOURCES.items():
+        for operation, referencing in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "NEW TABLE AS new_rows OLD TABLE AS old_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        ):
+            name = f"product_catalog_{table}_{operation.lower()}"
+            statements += [
+                f"DROP TRIGGER IF EXISTS {name} ON {table}",
+                f"CREATE TRIGGER {name} AFTER {operation} ON {table} REFERENCING {referencing} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION product_catalog_changed('{column}')",
+            ]
+    return statements
+
+
+def ddl_statements() -> list[str]:
+    """Statements (re)creating the catalog functions and triggers, as `create_all` and migrations run them."""
+    return [REFRESH_FUNCTION, CHANGED_FUNCTION, *trigger_statements()]
+
+
+for statement in ddl_statements():
+    # DDL applies %-formatting to its statement; `format('%I')` must survive it.
+    ddl = DDL(statement.replace("%", "%%")).execute_if(dialect="postgresql")
+    event.listen(orm_registry.metadata, "after_create", ddl)
+
+derived_table("product_catalog", SOURCES)
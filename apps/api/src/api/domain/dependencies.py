@@ -1,6 +1,8 @@
+from core.database import SAFE_METHODS, begin_read_only
 from core.setup import alchemy
+from domain.pagination import invalidate_counts
 from domain.services import ServicesContainer
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing_extensions import Annotated
 
@@ -9,15 +11,24 @@ DatabaseSession = Annotated[AsyncSession, Depends(alchemy.provide_async_session(
 
 
 async def get_services(
+    request: Request,
     session: DatabaseSession,
 ):
+    read_only = request.method in SAFE_METHODS and await begin_read_only(session)
+
     try:
         yield ServicesContainer(session)
-        await session.commit()
+        # Reads have nothing to commit; the read-only transaction (if any)
+        # simply ends when the session is closed.
+        if not read_only:
+            await session.commit()
     except Exception:
         await session.rollback()
         raise
     finally:
+        # Repositories may have committed on their own before a failure, so
+        # cached totals are invalidated for anything flushed either way.
+        await invalidate_counts(session)
         await session.close()
 
 
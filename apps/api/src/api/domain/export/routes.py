@@ -0,0 +1,37 @@
+from core.setup import sqlalchemy_config
+from domain.product.fieldsets import ProductFieldset, ProductFieldsetParam
+from exceptions import BadRequestException
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from starlette.status import HTTP_200_OK
+
+from .service import catalog_lines
+
+
+export_router = APIRouter(tags=["Export"])
+
+
+async def _stream_catalog(fieldset: ProductFieldset):
+    # The request's session is closed once the handler returns, before the body is sent,
+    # so the stream opens (and closes) its own.
+    async with sqlalchemy_config.get_session() as session:
+        async for chunk in catalog_lines(session, fieldset):
+            yield chunk
+
+
+@export_router.get(
+    "/export/catalog.ndjson",
+    response_class=StreamingResponse,
+    status_code=HTTP_200_OK,
+    responses={HTTP_200_OK: {"content": {"application/x-ndjson": {}}}},
+)
+async def export_catalog(fieldset: ProductFieldsetParam):
+    """Stream every product, with its swatch, variants, tags and analogous colors, as newline-delimited JSON"""
+    if fieldset.fields is not None:
+        raise BadRequestException(detail="The export supports `include=` but not `fields=`.")
+
+    return StreamingResponse(
+        _stream_catalog(fieldset),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="catalog.ndjson"'},
+    )
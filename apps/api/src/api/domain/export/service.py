@@ -0,0 +1,34 @@
+from collections.abc import AsyncIterator
+
+from core.config import settings
+from core.database import begin_read_only
+from domain.product.fieldsets import ProductFieldset
+from domain.product.models import Product
+from domain.product.rendering import product_document
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def catalog_lines(
+    session: AsyncSession,
+    fieldset: ProductFieldset,
+    batch_size: int | None = None,
+) -> AsyncIterator[str]:
+    """Every non-deleted product as one JSON document per line, read through a server-side cursor.
+
+    Documents are built by Postgres (see `domain.product.rendering`) and fetched
+    `batch_size` rows at a time, so neither the ORM nor the API process holds
+    more than one batch, however large the catalog.
+    """
+    # Server-side cursors only live inside a transaction, so autocommit reads are not an option here.
+    await begin_read_only(session, mode="transaction")
+
+    statement = (
+        select(product_document(fieldset))
+        .where(Product.is_deleted.is_(False))
+        .order_by(Product.id)
+        .execution_options(yield_per=batch_size or settings.db.DB_STREAM_BATCH_SIZE)
+    )
+    result = await session.stream_scalars(statement)
+    async for documents in result.partitions():
+        yield "".join(f"{document}\n" for document in documents)
@@ -1,5 +1,19 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
 from advanced_alchemy.extensions.fastapi import filters
+from exceptions import BadRequestException
 from fastapi import Depends, Query
+from pydantic import TypeAdapter
+from schemas.base import CursorPage, SchemaT
+from sqlalchemy import tuple_
 from typing_extensions import Annotated
 
 
@@ -11,3 +25,122 @@ def provide_limit_offset_pagination(
 
 
 PaginatedResponse = Annotated[filters.LimitOffset, Depends(provide_limit_offset_pagination)]
+
+
+class ArrayMatch(Enum):
+    """How the values of an `ArrayFilter` are matched against an array column."""
+
+    any = "any"
+    all = "all"
+
+
+@dataclass
+class ArrayFilter(filters.StatementFilter):
+    """Filter an array column by the values it holds.
+
+    `any` keeps rows whose array shares at least one value with `values`
+    (`&&`), `all` keeps rows whose array holds every value (`@>`). Both
+    operators are answered by a GIN index on the column.
+    """
+
+    field_name: str
+    values: Sequence[Any]
+    match: ArrayMatch = ArrayMatch.any
+
+    def append_to_statement(self, statement, model, *args, **kwargs):
+        if not self.values:
+            return statement
+        column = self._get_instrumented_attr(model, self.field_name)
+        values = list(self.values)
+        if self.match is ArrayMatch.all:
+            return statement.where(column.contains(values))
+        return statement.where(column.overlap(values))
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of a row as an opaque, URL-safe cursor."""
+    payload = json.dumps([str(v) if isinstance(v, (UUID, datetime)) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Malformed cursor: {cursor!r}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Malformed cursor: {cursor!r}")
+    return values
+
+
+@dataclass
+class KeysetPagination(filters.PaginationFilter):
+    """Keyset (seek) pagination over a unique, ordered tuple of columns.
+
+    Instead of skipping `offset` rows, the statement seeks past the sort key
+    of the last row of the previous page, so every page costs the same index
+    range scan no matter how deep into the result set it is. The last column
+    of `fields` must make the sort key unique (e.g. the primary key).
+    """
+
+    limit: int
+    after: list[Any] | None = None
+    fields: tuple[str, ...] = field(default=("name", "id"))
+
+    def append_to_statement(self, statement, model, *args, **kwargs):
+        columns = [getattr(model, name) for name in self.fields]
+        if self.after is not None:
+            if len(self.after) != len(columns):
+                raise BadRequestException(detail="Cursor does not match the sort order of this resource.")
+            try:
+                values = [_coerce(column, value) for column, value in zip(columns, self.after, strict=True)]
+            except (TypeError, ValueError) as e:
+                raise BadRequestException(detail="Invalid cursor.") from e
+            statement = statement.where(tuple_(*columns) > tuple_(*values))
+        # Fetch one extra row to know whether another page follows.
+        return statement.order_by(*columns).limit(self.limit + 1)
+
+    def to_page(self, results: Sequence[Any], schema_type: type[SchemaT]) -> CursorPage[SchemaT]:
+        """Trim the look-ahead row and build the response page."""
+        has_more = len(results) > self.limit
+        items = results[: self.limit]
+        next_cursor = None
+        if has_more and items:
+            next_cursor = encode_cursor([getattr(items[-1], name) for name in self.fields])
+        return CursorPage[schema_type](
+            items=TypeAdapter(list[schema_type]).validate_python(items, from_attributes=True),
+            limit=self.limit,
+            next_cursor=next_cursor,
+            has_more=has_more,
+        )
+
+
+def _coerce(column, value: Any) -> Any:
+    python_type = column.type.python_type
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def provide_cursor_pagination(
+    limit_offset: PaginatedResponse,
+    cursor: str | None = Query(
+        default=None,
+        description="Opaque cursor from `next_cursor`. Pass an empty value to start keyset pagination.",
+    ),
+) -> KeysetPagination | None:
+    if cursor is None:
+        return None
+    if not cursor:
+        return KeysetPagination(limit=limit_offset.limit)
+    try:
+        return KeysetPagination(limit=limit_offset.limit, after=decode_cursor(cursor))
+    except ValueError as e:
+        raise BadRequestException(detail=str(e)) from e
+
+
+CursorPaginatedResponse = Annotated[KeysetPagination | None, Depends(provide_cursor_pagination)]
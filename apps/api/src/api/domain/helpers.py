@@ -18,6 +18,14 @@ def enum_has(enum_class, value: str) -> bool:
     return isinstance(enum_class, EnumType) and value in enum_class._value2member_map_
 
 
+def split_comma_separated(value: Any) -> Any:
+    """Flatten `"a,b"` or `["a,b", "c"]` into `["a", "b", "c"]`, passing `None` through."""
+    if value is None:
+        return value
+    values = [value] if isinstance(value, str) else value
+    return [part.strip() for v in values for part in str(v).split(",") if part.strip()]
+
+
 def get_enum_value(enum_class: EnumT, name: str | None, default: str | None = None) -> EnumT:
     """Get a valid enum member from a string value."""
 
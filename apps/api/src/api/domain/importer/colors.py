@@ -0,0 +1,115 @@
+"""Swatch colours derived from their hex colour, a batch of swatches at a time.
+
+A swatch's RGB and OKLCH colours follow from its hex colour, so rather than
+taking the hand-entered values of vendor files, which drift from the hex colour
+and throw off colour search (the catalog's `oklch_color` is the swatch's),
+`derive_swatches` computes them for a whole batch in a few array operations
+(see `utils.color.arrays`). Values a file does supply are checked against the
+derived ones, and those that disagree are corrected and reported.
+
+Gradient endpoints are the swatch's colour, unless the file supplies other
+valid OKLCH colours, which are kept: metallic swatches shade from one to the
+other. An endpoint copied from the supplied OKLCH colour follows its correction.
+"""
+
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+
+import numpy as np
+from utils.color.arrays import hex_to_rgb_array, rgb_to_hex_array, rgb_to_oklch_array
+
+
+"""Decimals of the lightness, chroma and hue of stored OKLCH colours."""
+OKLCH_DECIMALS = np.array([4, 4, 2])
+
+"""Largest difference of a supplied OKLCH colour from the derived one still taken for rounding."""
+OKLCH_TOLERANCE = np.array([0.005, 0.005, 1.0])
+
+"""Chroma under which a colour is grey, and its hue meaningless."""
+ACHROMATIC = 0.01
+
+GRADIENTS = ("gradient_start", "gradient_end")
+
+
+class SwatchColors(NamedTuple):
+    """The colour fields of a swatch, the supplied fields they correct, or why there are none."""
+
+    values: dict[str, Any]
+    corrected: list[str]
+    error: str | None = None
+
+
+def derive_swatches(swatches: Sequence[dict[str, Any]]) -> list[SwatchColors]:
+    """The hex, RGB, OKLCH and gradient colours of each of `swatches`, from its hex colour."""
+    if not swatches:
+        return []
+    rgb, valid = hex_to_rgb_array([swatch.get("hex_color") for swatch in swatches])
+    oklch = _round(rgb_to_oklch_array(rgb))
+    hexes = rgb_to_hex_array(rgb)
+
+    supplied_rgb, given_rgb = _supplied(swatches, "rgb_color")
+    supplied_oklch, given_oklch = _supplied(swatches, "oklch_color")
+    wrong = {
+        "rgb_color": given_rgb & ~np.all(supplied_rgb == rgb, axis=1),
+        "oklch_color": given_oklch & ~_close(supplied_oklch, oklch),
+    }
+    gradients = {}
+    for name in GRADIENTS:
+        supplied, given = _supplied(swatches, name)
+        own = given & _is_oklch(supplied) & ~np.all(supplied == supplied_oklch, axis=1)
+        gradients[name] = np.where(own[:, None], supplied, oklch)
+        wrong[name] = given & ~_is_oklch(supplied)
+
+    rgb_values, oklch_values = rgb.tolist(), oklch.tolist()
+    gradient_values = {name: values.tolist() for name, values in gradients.items()}
+    derived = []
+    for i, swatch in enumerate(swatches):
+        if not valid[i]:
+            hex_color = swatch.get("hex_color")
+            error = "The swatch has no hex color." if hex_color is None else f"Invalid hex color {hex_color!r}."
+            derived.append(SwatchColors({}, [], error))
+            continue
+        values = {
+            "hex_color": hexes[i],
+            "rgb_color": rgb_values[i],
+            "oklch_color": oklch_values[i],
+            **{name: values[i] for name, values in gradient_values.items()},
+        }
+        derived.append(SwatchColors(values, [name for name, mask in wrong.items() if mask[i]]))
+    return derived
+
+
+def _supplied(swatches: Sequence[dict[str, Any]], name: str) -> tuple[np.ndarray, np.ndarray]:
+    """Colour `name` of each swatch as an n×3 array, NaN unless three numbers, and which swatches have it."""
+    values = np.full((len(swatches), 3), np.nan)
+    given = np.zeros(len(swatches), dtype=bool)
+    for i, swatch in enumerate(swatches):
+        if (value := swatch.get(name)) is None:
+            continue
+        given[i] = True
+        if isinstance(value, (list, tuple)) and len(value) == 3:
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+                values[i] = value
+    return values, given
+
+
+def _round(oklch: np.ndarray) -> np.ndarray:
+    """`oklch` as stored: rounded, with a hue of 0 for greys and never of 360."""
+    rounded = np.round(oklch * 10.0**OKLCH_DECIMALS) / 10.0**OKLCH_DECIMALS
+    rounded[:, 2] = np.where(rounded[:, 1] > 0, rounded[:, 2] % 360, 0.0)
+    return rounded
+
+
+def _close(supplied: np.ndarray, derived: np.ndarray) -> np.ndarray:
+    """Whether supplied OKLCH colours are the derived ones, give or take rounding; NaN never is."""
+    difference = np.abs(supplied - derived)
+    difference[:, 2] = np.minimum(difference[:, 2], 360 - difference[:, 2])
+    difference[:, 2] = np.where(derived[:, 1] < ACHROMATIC, 0.0, difference[:, 2])
+    with np.errstate(invalid="ignore"):
+        return np.all(difference <= OKLCH_TOLERANCE, axis=1)
+
+
+def _is_oklch(values: np.ndarray) -> np.ndarray:
+    """Whether colours are valid OKLCH: lightness and chroma in [0, 1], hue in [0, 360]."""
+    with np.errstate(invalid="ignore"):
+        return np.all((values >= 0) & (values <= [1, 1, 360]), axis=1)
@@ -0,0 +1,500 @@
+"""Set-based, incremental import of vendor files.
+
+A vendor is flattened into rows per table (`rows`) and written with a fixed
+number of multi-row statements (`writer`): vendors and product lines are
+upserted on their slug, then products, their swatches, variants, tags and
+analogous colors.
+
+Every product, swatch and variant carries the digest of its imported values
+(`rows.content_hash`), a product's covering its children. A re-import reads
+the stored digests of a batch's products in one statement and writes only the
+products that are new or changed; the children of changed products are
+compared the same way, by product, locale and SKU for variants. Products and
+product lines missing from a vendor's file, and variants missing from their
+product, are soft-deleted once the file is done. A product whose slug belongs
+to another vendor is reported as skipped and left untouched, as is a product
+repeated in its file after the first time; one moved to another product line
+of its vendor is updated.
+
+Vendor files are streamed (`stream`) and imported a batch of products at a
+time, so that neither the file nor its rows are ever held in memory whole.
+Each batch is committed along with a checkpoint of the file (`ImportCheckpoint`),
+and an import resumed from it passes over the products committed before a
+failure. Only once the whole file is done are missing rows removed, and its
+checkpoint with them. Progress is logged batch by batch, and each file's log
+has its rates, the time spent in each stage (parsing, validating, resolving
+keys and stored rows, writing; see `metrics`) and the peak memory so far.
+`import_file_in_session` imports a file in a session of its own, which lets
+several files be imported at once by separate workers.
+
+Background imports (`jobs`) split a file into chunks imported by separate
+jobs at once, which write the vendor and its product lines only if missing
+(`update_parents`), and leave removing missing rows to a final job.
+
+Swatch colours are derived from their hex colour while validating (`colors`);
+supplied colours that disagree with it are corrected, counted and logged.
+
+Given a pool of validator processes, the importer has batches validated there
+a few ahead of the one it writes, so that validating the next batches and
+writing this one happen at the same time. Products that do not validate are
+collected in the report's `rejects`, and kept as they are in the database.
+"""
+
+import asyncio
+from collections import Counter, deque
+from collections.abc import AsyncIterator, Collection, Iterable, Iterator
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass, field, fields
+from itertools import chain
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+from uuid import UUID
+
+from core.logger import get_logger
+from domain.analogous.models import Analogous
+from domain.associations import product_analogous_association, product_tag_association
+from domain.locale.models import Locale
+from domain.pagination import TRACK_WRITES, invalidate_counts
+from domain.product.models import Product
+from domain.product_line.models import ProductLine
+from domain.product_swatch.models import ProductSwatch
+from domain.product_variant.models import ProductVariant
+from domain.tag.models import Tag
+from domain.vendor.models import Vendor
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from uuid_utils.compat import uuid7
+
+from .metrics import PARSE, RESOLVE, VALIDATE, WRITE, StageTimer, peak_memory_mb, per_second
+from .models import ImportCheckpoint
+from .rows import ImportBatch, Position, Record, Reject, Row, chunks, validate, vendor_records
+from .stream import read_vendor_file
+from .writer import BulkWriter, any_of
+
+
+logger = get_logger(__name__)
+
+"""Products imported per batch when streaming a vendor file."""
+DEFAULT_BATCH_SIZE = 500
+
+"""Batches validated ahead of the one being written, when validating in a pool of processes."""
+VALIDATION_AHEAD = 4
+
+"""Attempts at a vendor file whose transaction is chosen as a deadlock victim."""
+DEADLOCK_ATTEMPTS = 3
+
+DEADLOCK_DETECTED = "40P01"
+
+"""Association tables of products: the column pointing at the other side, its model, and the batch's rows."""
+ASSOCIATIONS = (
+    (product_tag_association, "tag_id", Tag, "product_tags"),
+    (product_analogous_association, "analogous_id", Analogous, "product_analogous"),
+)
+
+
+@dataclass
+class ImportReport:
+    """Rows written, left unchanged and removed by an import, and the products it rejected.
+
+    `swatches_corrected` counts the swatches whose supplied colours disagreed
+    with their hex colour (see `colors`), written or not.
+    """
+
+    vendors: int = 0
+    product_lines: int = 0
+    product_lines_removed: int = 0
+    products_created: int = 0
+    products_updated: int = 0
+    products_unchanged: int = 0
+    products_skipped: int = 0
+    products_removed: int = 0
+    swatches_created: int = 0
+    swatches_updated: int = 0
+    swatches_unchanged: int = 0
+    swatches_removed: int = 0
+    swatches_corrected: int = 0
+    variants_created: int = 0
+    variants_updated: int = 0
+    variants_unchanged: int = 0
+    variants_removed: int = 0
+    product_tags: int = 0
+    product_analogous: int = 0
+    rejects: list[Reject] = field(default_factory=list)
+
+    def __iadd__(self, other: "ImportReport") -> "ImportReport":
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+        return self
+
+    @property
+    def products(self) -> int:
+        """Products read, written or not."""
+        counted = self.products_created + self.products_updated + self.products_unchanged + self.products_skipped
+        return counted + len(self.rejects)
+
+    @property
+    def rows_written(self) -> int:
+        not_written = ("_unchanged", "_skipped", "_corrected")
+        return sum(count for name, count in self.counts().items() if not name.endswith(not_written))
+
+    def counts(self) -> dict[str, int]:
+        """Rows per field, as log fields."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.type is int}
+
+    def as_log(self) -> dict[str, int]:
+        return {**self.counts(), "products_rejected": len(self.rejects)}
+
+    def rates(self, seconds: float) -> dict[str, float]:
+        """Products read and rows written per second, as log fields."""
+        return {
+            "products_per_sec": per_second(self.products, seconds),
+            "rows_per_sec": per_second(self.rows_written, seconds),
+        }
+
+
+class BulkImporter:
+    """Imports vendor files through one session.
+
+    Files are committed a batch at a time; vendors imported from memory are
+    left for the caller to commit. With `names_session_factory`, tags and
+    analogous colors are created in short transactions of their own (see
+    `writer`). Without `update_parents`, vendors and product lines are only
+    inserted if missing, so that concurrent imports of one vendor's products
+    do not wait on each other's lock of the vendor's row.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        names_session_factory: async_sessionmaker | None = None,
+        validators: Executor | None = None,
+        *,
+        update_parents: bool = True,
+    ):
+        self.session = session
+        self.validators = validators
+        self.update_parents = update_parents
+        self.timer = StageTimer()
+        self.writer = BulkWriter(session, names_session_factory, self.timer)
+        # Vendor ID of each product line imported, by slug.
+        self.vendors: dict[str, UUID] = {}
+
+    async def import_vendor(self, data: dict[str, Any]) -> ImportReport:
+        report = await self.import_records(vendor_records(data), batch_size=None)
+        logger.info("Imported vendor", vendor=data.get("vendor_name"), **report.as_log())
+        return report
+
+    async def import_records(
+        self,
+        records: Iterable[Record],
+        batch_size: int | None = DEFAULT_BATCH_SIZE,
+        *,
+        source: str | None = None,
+        resume: bool = False,
+        remove: bool = True,
+    ) -> ImportReport:
+        """Import vendor file records `batch_size` products at a time, then remove what they no longer have.
+
+        With a `source`, each batch is committed with the position it got to as
+        the source's checkpoint, and with `resume` the products up to the last
+        checkpoint are passed over. Without `remove`, the records are taken to
+        be part of a vendor only, and nothing is removed.
+        """
+        timer, report = self.timer, ImportReport()
+        resume_from = await self._checkpoint(source) if source is not None and resume else None
+        if resume_from is not None:
+            logger.info("Resuming vendor file", source=source, **resume_from._asdict())
+
+        vendors, product_lines, products = set(), set(), set()
+        started = perf_counter()
+        async for batch in self._validated(chunks(timer.timed(records, PARSE), batch_size, resume_from)):
+            vendors.update(row.values["slug"] for row in batch.vendors)
+            product_lines.update(row.values["slug"] for row in batch.product_lines)
+            products.update(row.values["slug"] for row in batch.products)
+            # Products passed over or rejected are left as they are, not removed.
+            products.update(batch.resumed)
+            products.update(reject.slug for reject in batch.rejects if reject.slug is not None)
+            for reject in batch.rejects:
+                logger.warning("Rejected product", source=source, **asdict(reject))
+            report.rejects += batch.rejects
+            report.products_skipped += batch.repeated
+            if batch.corrected:
+                fields = Counter(chain.from_iterable(batch.corrected.values()))
+                logger.warning("Corrected swatch colors", source=source, products=len(batch.corrected), **fields)
+                report.swatches_corrected += len(batch.corrected)
+            with timer.stage(WRITE):
+                report += await self.import_batch(batch)
+                if source is not None:
+                    await self._commit(source, batch.position)
+            if source is not None:
+                logger.info(
+                    "Imported batch",
+                    source=source,
+                    **batch.position._asdict(),
+                    products=len(batch.products),
+                    **report.rates(perf_counter() - started),
+                )
+        with timer.stage(WRITE):
+            if remove:
+                report += await self.remove_missing(vendors, product_lines, products)
+            if source is not None:
+                await self._commit(source, None)
+        return report
+
+    async def import_file(
+        self, path: Path, batch_size: int = DEFAULT_BATCH_SIZE, *, resume: bool = False, remove: bool = True
+    ) -> ImportReport:
+        """Stream a vendor file holding one vendor or an array of them, committing it a batch at a time."""
+        started, stages = perf_counter(), dict(self.timer.seconds)
+        with open(path) as file:
+            report = await self.import_records(
+                read_vendor_file(file), batch_size, source=str(path.resolve()), resume=resume, remove=remove
+            )
+        seconds = perf_counter() - started
+        logger.info(
+            "Imported vendor file",
+            path=str(path),
+            **report.as_log(),
+            seconds=round(seconds, 3),
+            **report.rates(seconds),
+            **self.timer.as_log(since=stages),
+            peak_memory_mb=peak_memory_mb(),
+        )
+        return report
+
+    async def discard_checkpoint(self, path: Path) -> None:
+        """Delete the checkpoint of the vendor file at `path`, which is not to be resumed."""
+        await self._commit(str(path.resolve()), None)
+
+    async def _validated(self, batches: Iterator[ImportBatch]) -> AsyncIterator[ImportBatch]:
+        """Validate `batches`, in the pool of validators if there is one, in order."""
+        timer = self.timer
+        if self.validators is None:
+            for batch in timer.timed(map(validate, batches), VALIDATE):
+                yield batch
+            return
+
+        # Waiting on the pool counts as validating: it is the time the writes wait for it.
+        loop, pending = asyncio.get_running_loop(), deque()
+        for batch in chain(timer.timed(batches, VALIDATE), [None]):
+            if batch is not None:
+                pending.append(loop.run_in_executor(self.validators, validate, batch))
+            while pending and (batch is None or len(pending) > VALIDATION_AHEAD):
+                with timer.stage(VALIDATE):
+                    validated = await pending.popleft()
+                yield validated
+
+    async def _checkpoint(self, source: str) -> Position | None:
+        statement = select(ImportCheckpoint.vendor, ImportCheckpoint.product_line, ImportCheckpoint.offset).where(
+            ImportCheckpoint.source == source
+        )
+        with self.timer.stage(RESOLVE):
+            row = (await self.session.execute(statement)).first()
+        return Position(*row) if row else None
+
+    async def _commit(self, source: str, position: Position | None) -> None:
+        """Commit with `position` as the checkpoint of `source`, or with none once the source is done."""
+        if position is None:
+            statement = delete(ImportCheckpoint).where(ImportCheckpoint.source == source)
+        else:
+            values = position._asdict()
+            statement = (
+                pg_insert(ImportCheckpoint)
+                .values(id=uuid7(), source=source, **values)
+                .on_conflict_do_update(index_elements=["source"], set_={**values, "updated_at": func.now()})
+            )
+        # Nothing counts checkpoints, so writing one invalidates no cached count.
+        await self.session.execute(statement.execution_options(**{TRACK_WRITES: False}))
+        await self.session.commit()
+        await invalidate_counts(self.session)
+
+    async def import_batch(self, batch: ImportBatch) -> ImportReport:
+        with self.timer.stage(RESOLVE):
+            await self._load_locales(batch)
+        writer, report = self.writer, ImportReport()
+
+        update = self.update_parents
+        report.vendors = len(await writer.upsert(Vendor, batch.vendors, update=update))
+        report.product_lines = len(await writer.upsert(ProductLine, batch.product_lines, update=update))
+
+        # Stored digests of the batch's products, with their vendor: a slug of another vendor's is not ours to update.
+        vendors = writer.ids[Vendor.__tablename__]
+        self.vendors.update((row.values["slug"], vendors[row.refs["vendor_id"]]) for row in batch.product_lines)
+        statement = (
+            select(Product.slug, ProductLine.vendor_id, Product.content_hash, Product.is_deleted)
+            .join(ProductLine, Product.product_line_id == ProductLine.id)
+            .where(any_of(Product.slug, [row.values["slug"] for row in batch.products]))
+        )
+        with self.timer.stage(RESOLVE):
+            stored = {slug: rest for slug, *rest in (await self.session.execute(statement)).tuples()}
+        changed, unchanged = [], set()
+        for row in batch.products:
+            slug = row.values["slug"]
+            if (current := stored.get(slug)) is None:
+                changed.append(row)
+            elif current[0] != self.vendors[row.refs["product_line_id"]]:
+                report.products_skipped += 1
+            elif current[1] != row.values["content_hash"] or current[2]:
+                changed.append(row)
+            else:
+                unchanged.add(slug)
+        written = await writer.upsert(Product, changed)
+        updated = {slug: id_ for slug, id_ in written.items() if slug in stored}
+        created = written.keys() - updated.keys()
+        report.products_created, report.products_updated = len(created), len(updated)
+        report.products_unchanged = len(unchanged)
+        report.swatches_unchanged = sum(row.refs["product_id"] in unchanged for row in batch.swatches)
+        report.variants_unchanged = sum(row.refs["product_id"] in unchanged for row in batch.variants)
+
+        for _, column, model, rows in ASSOCIATIONS:
+            await writer.resolve_names(model, {row.refs[column] for row in _of(getattr(batch, rows), written)})
+
+        # Children of new products are inserted as they are; those of changed products are compared first.
+        report.swatches_created = await writer.insert(ProductSwatch, _of(batch.swatches, created))
+        report.variants_created = await writer.insert(ProductVariant, _of(batch.variants, created))
+        for table, _, _, rows in ASSOCIATIONS:
+            setattr(report, rows, await writer.insert(table, _of(getattr(batch, rows), created)))
+        if updated:
+            report += await self._update_children(batch, updated)
+
+        # Children never outlive their batch, so their parents' IDs need not be kept past it.
+        for model in (Product, ProductSwatch, ProductVariant):
+            writer.ids[model.__tablename__].clear()
+        return report
+
+    async def _update_children(self, batch: ImportBatch, products: dict[str, UUID]) -> ImportReport:
+        """Bring the swatches, variants and associations of changed `products` (IDs by slug) in line with `batch`."""
+        writer, report = self.writer, ImportReport()
+        ids = list(products.values())
+
+        stored_swatches = dict(await writer.existing(ProductSwatch, "product_id", ids, "product_id", "content_hash"))
+        swatches = _of(batch.swatches, products)
+        changed = [
+            row
+            for row in swatches
+            if stored_swatches.get(products[row.refs["product_id"]]) != row.values["content_hash"]
+        ]
+        written = await writer.upsert(ProductSwatch, changed, key="product_id")
+        report.swatches_updated = len(written.keys() & stored_swatches.keys())
+        report.swatches_created = len(written) - report.swatches_updated
+        report.swatches_unchanged = len(swatches) - len(changed)
+        if gone := stored_swatches.keys() - {products[row.refs["product_id"]] for row in swatches}:
+            report.swatches_removed = await writer.delete(ProductSwatch, any_of(ProductSwatch.product_id, gone))
+
+        # Variants are matched by product, locale and SKU; the first of several with the same key wins.
+        locales = writer.ids[Locale.__tablename__]
+        stored_variants = {
+            (product_id, locale_id, sku): (id_, digest, deleted)
+            for product_id, locale_id, sku, id_, digest, deleted in await writer.existing(
+                ProductVariant, "product_id", ids, "product_id", "locale_id", "sku", "id", "content_hash", "is_deleted"
+            )
+        }
+        variants: dict[tuple, Row] = {}
+        for row in _of(batch.variants, products):
+            key = (products[row.refs["product_id"]], locales[row.refs["locale_id"]], row.values["sku"])
+            variants.setdefault(key, row)
+        changed = []
+        for key, row in variants.items():
+            restored = {"is_deleted": False, "deleted_at": None}
+            if (current := stored_variants.get(key)) is None:
+                changed.append(Row({**row.values, **restored, "id": uuid7()}, row.refs))
+                report.variants_created += 1
+            elif current[1] != row.values["content_hash"] or current[2]:
+                changed.append(Row({**row.values, **restored, "id": current[0]}, row.refs))
+                report.variants_updated += 1
+            else:
+                report.variants_unchanged += 1
+        await writer.upsert(ProductVariant, changed, key="id")
+        if gone := [current[0] for key, current in stored_variants.items() if key not in variants and not current[2]]:
+            report.variants_removed = len(await writer.soft_delete(ProductVariant, any_of(ProductVariant.id, gone)))
+
+        for table, column, model, rows in ASSOCIATIONS:
+            names = writer.ids[model.__tablename__]
+            stored_links = set(await writer.existing(table, "product_id", ids, "product_id", column))
+            links = {
+                (products[row.refs["product_id"]], names[row.refs[column]]): row
+                for row in _of(getattr(batch, rows), products)
+            }
+            new_links = [row for link, row in links.items() if link not in stored_links]
+            setattr(report, rows, await writer.insert(table, new_links))
+            if gone := stored_links - links.keys():
+                await writer.delete(table, tuple_(table.c.product_id, table.c[column]).in_(gone))
+        return report
+
+    async def remove_missing(self, vendors: set[str], product_lines: set[str], products: set[str]) -> ImportReport:
+        """Soft-delete the product lines of `vendors` and the products of their lines that were not imported.
+
+        Variants of the removed products are soft-deleted with them.
+        """
+        report, writer = ImportReport(), self.writer
+        if not vendors:
+            return report
+        vendor_ids = await self._ids(Vendor, vendors)
+        line_ids = await self._ids(ProductLine, product_lines)
+        removed_lines = await writer.soft_delete(
+            ProductLine, any_of(ProductLine.vendor_id, vendor_ids), ~any_of(ProductLine.id, line_ids)
+        )
+        removed = await writer.soft_delete(
+            Product, any_of(Product.product_line_id, [*line_ids, *removed_lines]), ~any_of(Product.slug, products)
+        )
+        report.product_lines_removed, report.products_removed = len(removed_lines), len(removed)
+        if removed:
+            report.variants_removed = len(
+                await writer.soft_delete(ProductVariant, any_of(ProductVariant.product_id, removed))
+            )
+        return report
+
+    async def _ids(self, model: Any, slugs: set[str]) -> list[UUID]:
+        """IDs of the rows of `model` with `slugs`, looking up those the import has not written."""
+        ids = self.writer.ids[model.__tablename__]
+        if unknown := slugs - ids.keys():
+            ids.update(await self.writer.existing(model, "slug", unknown, "slug", "id"))
+        return [ids[slug] for slug in slugs if slug in ids]
+
+    async def _load_locales(self, batch: ImportBatch) -> None:
+        """Resolve the locales of the batch's variants, all of which must exist."""
+        locales = self.writer.ids[Locale.__tablename__]
+        if not locales:
+            statement = select(Locale.language_code, Locale.country_code, Locale.id)
+            for language_code, country_code, id_ in (await self.session.execute(statement)).tuples():
+                locales[language_code, country_code] = id_
+        if unknown := {row.refs["locale_id"] for row in batch.variants} - locales.keys():
+            raise ValueError(f"Unknown locales: {', '.join('-'.join(key) for key in sorted(unknown))}.")
+
+
+def _of(rows: list[Row], products: Collection[str]) -> list[Row]:
+    """The child rows of `products`, by slug."""
+    return [row for row in rows if row.refs["product_id"] in products]
+
+
+async def import_file_in_session(
+    session_factory: async_sessionmaker,
+    path: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    resume: bool = False,
+    validators: Executor | None = None,
+) -> ImportReport:
+    """Import a vendor file in a session of its own, committed a batch at a time.
+
+    Workers importing other files at the same time may insert the same product
+    slugs in another order and deadlock with this one; the batch is then rolled
+    back and the file resumed from its last checkpoint.
+    """
+    attempt = 1
+    while True:
+        async with session_factory() as session:
+            try:
+                importer = BulkImporter(session, session_factory, validators)
+                return await importer.import_file(path, batch_size, resume=resume)
+            except DBAPIError as e:
+                await session.rollback()
+                if getattr(e.orig, "sqlstate", None) != DEADLOCK_DETECTED or attempt == DEADLOCK_ATTEMPTS:
+                    raise
+            finally:
+                await invalidate_counts(session)
+        logger.warning("Retrying vendor file after a deadlock", path=str(path), attempt=attempt)
+        attempt, resume = attempt + 1, True
@@ -0,0 +1,308 @@
+"""Vendor imports run as background jobs of the arq queue (see `worker`).
+
+`import_vendor_file` splits a vendor file into chunks of at most `CHUNK_SIZE`
+products of one product line, each a vendor file of its own in the spool
+directory, and writes the file's vendors and product lines. It then queues
+chunk jobs (`import_chunk`), never more than `CONCURRENCY` of one import at a
+time: each chunk job that ends queues the next chunk, and the last one queues
+`finish_import`, which removes what the file no longer has and deletes the
+chunks. Chunk jobs only insert vendors and product lines that are missing, so
+that they do not wait on each other's lock of their vendor's row.
+
+A chunk job that fails, or runs for longer than `CHUNK_TIMEOUT`, is retried,
+up to `JOB_TRIES` attempts in all, from the chunk's checkpoint. A chunk that
+fails every attempt is abandoned, its checkpoint deleted, and fails the
+import, which then removes nothing: its products would be taken for missing.
+Every chunk ends one way or the other, even one whose last attempt was cut
+short by a worker stopping: arq gives chunk jobs one more try, which only
+abandons the chunk. Otherwise nothing would queue the chunks after it.
+
+The progress of an import is a Redis hash (`ImportProgress`) whose counters
+the jobs increment as they go, read by `GET /imports/{import_id}`.
+"""
+
+import asyncio
+import json
+import shutil
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from advanced_alchemy.utils.text import slugify
+from arq import ArqRedis, Retry
+from core.config import settings
+from core.logger import get_logger
+from domain.pagination import invalidate_counts
+from exceptions import BadRequestException, NotFoundException
+
+from .engine import BulkImporter, ImportReport
+from .rows import PRODUCT, PRODUCT_LINE, VENDOR, Record, product_line_row, vendor_row
+from .schemas import ImportRead, ImportStatus
+from .stream import read_vendor_file
+
+
+logger = get_logger(__name__)
+
+"""Seconds before the retry of a failed chunk job, times the attempts so far."""
+RETRY_DELAY = 5
+
+"""Seconds arq lets a chunk job run past `CHUNK_TIMEOUT` before cancelling it, for the job to record its timeout."""
+CHUNK_TIMEOUT_GRACE = 60
+
+"""Fields of the progress hash that are not report counts."""
+PROGRESS_FIELDS = frozenset({*ImportRead.model_fields, "chunks_finished", "next_chunk"})
+
+
+class ImportProgress:
+    """The progress of an import, as a Redis hash of its status and counters."""
+
+    def __init__(self, redis: ArqRedis, import_id: str):
+        self.redis = redis
+        self.import_id = import_id
+        self.key = f"import:{import_id}"
+
+    async def set(self, **values: Any) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.key, mapping={name: _field(value) for name, value in values.items()})
+            pipe.expire(self.key, settings.importer.PROGRESS_TTL)
+            await pipe.execute()
+
+    async def add(self, **counts: int) -> dict[str, int]:
+        """Increment the counters by `counts` at once, returning their new values."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for name, count in counts.items():
+                pipe.hincrby(self.key, name, count)
+            values = await pipe.execute()
+        return dict(zip(counts, values, strict=True))
+
+    async def add_report(self, report: ImportReport, **counts: int) -> dict[str, int]:
+        return await self.add(**{name: count for name, count in report.as_log().items() if count}, **counts)
+
+    async def read(self) -> ImportRead | None:
+        values = {_text(name): _text(value) for name, value in (await self.redis.hgetall(self.key)).items()}
+        if not values:
+            return None
+        counts = {name: int(value) for name, value in values.items() if name not in PROGRESS_FIELDS}
+        fields = {name: value for name, value in values.items() if name in ImportRead.model_fields}
+        return ImportRead(**fields, id=self.import_id, counts=counts)
+
+
+def vendor_data_file(name: str) -> Path:
+    """The vendor file `name` of the vendor data directory, which must not point out of it."""
+    directory = Path(settings.importer.VENDOR_DATA_DIR).resolve()
+    path = (directory / name).resolve()
+    if not path.is_relative_to(directory):
+        raise BadRequestException(detail="The file must be in the vendor data directory.")
+    if not path.is_file():
+        raise NotFoundException(detail=f"No vendor file {name!r}.")
+    return path
+
+
+async def enqueue_import(redis: ArqRedis, file: str) -> ImportRead:
+    """Queue the import of the vendor file `file` of the vendor data directory."""
+    vendor_data_file(file)
+    import_id = str(uuid4())
+    progress = ImportProgress(redis, import_id)
+    await progress.set(file=file, status=ImportStatus.queued)
+    await redis.enqueue_job("import_vendor_file", import_id, file, _job_id=f"import:{import_id}")
+    logger.info("Queued vendor file import", import_id=import_id, file=file)
+    return ImportRead(id=import_id, file=file, status=ImportStatus.queued)
+
+
+async def import_vendor_file(ctx: dict[str, Any], import_id: str, file: str) -> dict[str, int]:
+    """Split the vendor file into chunks, write its vendors and product lines, and queue the chunks."""
+    redis, db = ctx["redis"], ctx["db"]
+    progress = ImportProgress(redis, import_id)
+    directory = _spool(import_id)
+    try:
+        await progress.set(status=ImportStatus.splitting)
+        directory.mkdir(parents=True, exist_ok=True)
+        parents: list[Record] = []
+        keys: dict[str, set[str]] = {"vendors": set(), "product_lines": set(), "products": set()}
+        report, total = ImportReport(), 0
+        with open(vendor_data_file(file)) as source:
+            for index, chunk in enumerate(split_vendor_file(read_vendor_file(source), parents, keys, report)):
+                _write_json(_chunk(directory, index), chunk)
+                total = index + 1
+        _write_json(directory / "manifest.json", {name: sorted(slugs) for name, slugs in keys.items()})
+
+        async with db.session_factory() as session:
+            try:
+                report += await BulkImporter(session).import_records(parents, batch_size=None, remove=False)
+                await session.commit()
+            finally:
+                await invalidate_counts(session)
+        await progress.add_report(report)
+        await progress.set(status=ImportStatus.importing, chunks_total=total)
+    except Exception as e:
+        await progress.set(status=ImportStatus.failed, error=str(e))
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+    logger.info("Split vendor file", import_id=import_id, file=file, chunks=total)
+    if not total:
+        await redis.enqueue_job("finish_import", import_id, _job_id=f"import:{import_id}:finish")
+    for _ in range(min(settings.importer.CONCURRENCY, total)):
+        await _queue_next_chunk(redis, progress, total)
+    return {"chunks": total}
+
+
+def split_vendor_file(
+    records: Iterable[Record], parents: list[Record], keys: dict[str, set[str]], report: ImportReport
+) -> Iterator[dict[str, Any]]:
+    """Vendor files of at most `CHUNK_SIZE` products of one product line each, made of `records`.
+
+    The vendor and product line records are appended to `parents`, and the
+    slugs of the vendors, product lines and products to `keys`. A product line
+    repeated within its vendor is passed over, and so is a product repeated in
+    the file, counted as skipped in `report`, as the importer does: chunks are
+    imported separately, and would not know the repeat from the first one.
+    """
+    chunk_size = settings.importer.CHUNK_SIZE
+    vendor = product_line = None
+    vendor_lines: set[str] = set()
+    products: list[dict[str, Any]] = []
+
+    for kind, data in records:
+        if kind != PRODUCT and products:
+            yield _vendor_file(vendor, product_line, products)
+            products = []
+        if kind == VENDOR:
+            vendor, product_line = data, None
+            vendor_lines = set()
+            keys["vendors"].add(vendor_row(data).values["slug"])
+            parents.append((kind, data))
+        elif kind == PRODUCT_LINE:
+            slug = product_line_row(data, None).values["slug"]
+            product_line = None if slug in vendor_lines else data
+            if product_line is not None:
+                vendor_lines.add(slug)
+                keys["product_lines"].add(slug)
+                parents.append((kind, data))
+        elif product_line is not None:
+            if isinstance(name := data.get("name"), str):
+                if (slug := slugify(name)) in keys["products"]:
+                    logger.warning("Skipping repeated product", product_line=product_line.get("name"), product=slug)
+                    report.products_skipped += 1
+                    continue
+                keys["products"].add(slug)
+            products.append(data)
+            if len(products) == chunk_size:
+                yield _vendor_file(vendor, product_line, products)
+                products = []
+    if products:
+        yield _vendor_file(vendor, product_line, products)
+
+
+async def import_chunk(ctx: dict[str, Any], import_id: str, index: int, total: int) -> dict[str, int]:
+    """Import a chunk of a vendor file, then queue the next one, or the end of the import after the last."""
+    redis, db, attempt = ctx["redis"], ctx["db"], ctx["job_try"]
+    progress = ImportProgress(redis, import_id)
+    path = _chunk(_spool(import_id), index)
+    timeout = settings.importer.CHUNK_TIMEOUT
+    if attempt > settings.queue.JOB_TRIES:
+        logger.error("Import chunk stopped on its last attempt", import_id=import_id, chunk=index, attempts=attempt)
+        counts = await _abandon_chunk(db, progress, path, index, "its last attempt was stopped")
+    else:
+        try:
+            async with asyncio.timeout(timeout), db.session_factory() as session:
+                try:
+                    importer = BulkImporter(session, db.session_factory, update_parents=False)
+                    report = await importer.import_file(path, resume=attempt > 1, remove=False)
+                finally:
+                    await invalidate_counts(session)
+        except Exception as e:
+            error = f"timed out after {timeout} seconds" if isinstance(e, TimeoutError) else str(e)
+            if attempt < settings.queue.JOB_TRIES:
+                logger.warning("Retrying import chunk", import_id=import_id, chunk=index, attempt=attempt, error=error)
+                raise Retry(defer=attempt * RETRY_DELAY) from e
+            logger.exception("Import chunk failed", import_id=import_id, chunk=index, attempts=attempt, error=error)
+            counts = await _abandon_chunk(db, progress, path, index, error)
+        else:
+            counts = await progress.add_report(report, chunks_done=1, chunks_finished=1)
+
+    await _queue_next_chunk(redis, progress, total)
+    if counts["chunks_finished"] == total:
+        await redis.enqueue_job("finish_import", import_id, _job_id=f"import:{import_id}:finish")
+    return counts
+
+
+async def finish_import(ctx: dict[str, Any], import_id: str) -> dict[str, int]:
+    """Remove what the vendor file no longer has, unless a chunk failed, and delete its chunks."""
+    redis, db = ctx["redis"], ctx["db"]
+    progress = ImportProgress(redis, import_id)
+    directory = _spool(import_id)
+    try:
+        current = await progress.read()
+        if current is not None and current.chunks_failed:
+            await progress.set(status=ImportStatus.failed)
+            logger.warning("Vendor file import failed", import_id=import_id, chunks_failed=current.chunks_failed)
+            return current.counts
+
+        await progress.set(status=ImportStatus.finishing)
+        with open(directory / "manifest.json") as file:
+            keys = {name: set(slugs) for name, slugs in json.load(file).items()}
+        async with db.session_factory() as session:
+            try:
+                report = await BulkImporter(session).remove_missing(
+                    keys["vendors"], keys["product_lines"], keys["products"]
+                )
+                await session.commit()
+            finally:
+                await invalidate_counts(session)
+        counts = await progress.add_report(report)
+        await progress.set(status=ImportStatus.completed)
+        logger.info("Imported vendor file", import_id=import_id, **report.as_log())
+        return counts
+    except Exception as e:
+        await progress.set(status=ImportStatus.failed, error=str(e))
+        raise
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+async def _abandon_chunk(db, progress: ImportProgress, path: Path, index: int, error: str) -> dict[str, int]:
+    """Count the chunk at `path` as failed, and delete its checkpoint: it will not be resumed."""
+    try:
+        async with db.session_factory() as session:
+            await BulkImporter(session).discard_checkpoint(path)
+    except Exception as e:
+        # The chunk must still be counted, or the import would never end.
+        logger.warning("Could not delete the checkpoint of a failed chunk", path=str(path), error=str(e))
+    await progress.set(error=f"Chunk {index} failed: {error}")
+    return await progress.add(chunks_failed=1, chunks_finished=1)
+
+
+async def _queue_next_chunk(redis: ArqRedis, progress: ImportProgress, total: int) -> None:
+    """Queue the first chunk no job has claimed yet, if any is left."""
+    index = (await progress.add(next_chunk=1))["next_chunk"] - 1
+    if index < total:
+        job_id = f"import:{progress.import_id}:chunk:{index}"
+        await redis.enqueue_job("import_chunk", progress.import_id, index, total, _job_id=job_id)
+
+
+def _vendor_file(vendor: dict[str, Any], product_line: dict[str, Any], products: list[Any]) -> dict[str, Any]:
+    # Fields before arrays, as `read_vendor_file` requires.
+    return {**vendor, "product_lines": [{**product_line, "products": products}]}
+
+
+def _spool(import_id: str) -> Path:
+    return Path(settings.importer.SPOOL_DIR) / import_id
+
+
+def _chunk(directory: Path, index: int) -> Path:
+    return directory / f"chunk-{index:05d}.json"
+
+
+def _write_json(path: Path, data: Any) -> None:
+    with open(path, "w") as file:
+        json.dump(data, file)
+
+
+def _field(value: Any) -> str | int:
+    return value.value if isinstance(value, ImportStatus) else value
+
+
+def _text(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
@@ -0,0 +1,79 @@
+"""Where an import spends its time, and how much memory it takes.
+
+`StageTimer` adds up wall-clock time per stage of the pipeline: parsing the
+file, validating and flattening its records, resolving keys and stored rows,
+and writing. Stages nest, and time is counted to the innermost one only: the
+parsing a validation step waits for is parse time, not validation time.
+"""
+
+import sys
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TypeVar
+
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+T = TypeVar("T")
+
+PARSE, VALIDATE, RESOLVE, WRITE = "parse", "validate", "resolve", "write"
+
+
+class StageTimer:
+    """Exclusive wall-clock seconds per stage."""
+
+    def __init__(self):
+        self.seconds: dict[str, float] = defaultdict(float)
+        self._stack: list[str] = []
+        self._since = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._switch()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._switch()
+            self._stack.pop()
+
+    def timed(self, iterable: Iterable[T], name: str) -> Iterator[T]:
+        """Iterate `iterable`, counting the time spent producing each item to `name`."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def as_log(self, since: dict[str, float] | None = None) -> dict[str, float]:
+        """Seconds per stage (since an earlier copy of `seconds`), as `<stage>_seconds` log fields."""
+        since = since or {}
+        return {f"{name}_seconds": round(seconds - since.get(name, 0.0), 3) for name, seconds in self.seconds.items()}
+
+    def _switch(self) -> None:
+        now = perf_counter()
+        if self._stack:
+            self.seconds[self._stack[-1]] += now - self._since
+        self._since = now
+
+
+def per_second(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds > 0 else 0.0
+
+
+def peak_memory_mb() -> float | None:
+    """Peak resident memory of the process so far, where the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
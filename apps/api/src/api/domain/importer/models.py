@@ -0,0 +1,19 @@
+from core.models import Entity, WithTimeAuditMixin
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class ImportCheckpoint(Entity, WithTimeAuditMixin):
+    """How far the import of a vendor file has committed.
+
+    Written in the transaction of each batch, so that it never points past the
+    products actually committed, and deleted once the file is done. `offset`
+    counts the products of `product_line` (of `vendor`) read so far.
+    """
+
+    __tablename__ = "import_checkpoints"
+
+    source: Mapped[str] = mapped_column(String(1024), unique=True)
+    vendor: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    product_line: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    offset: Mapped[int] = mapped_column(default=0)
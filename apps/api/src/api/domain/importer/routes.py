@@ -0,0 +1,25 @@
+from exceptions import NotFoundException
+from fastapi import APIRouter
+from services import Queue
+from starlette.status import HTTP_200_OK, HTTP_202_ACCEPTED
+
+from .jobs import ImportProgress, enqueue_import
+from .schemas import ImportCreate, ImportRead
+
+
+import_router = APIRouter(tags=["Import"])
+
+
+@import_router.post("/imports", response_model=ImportRead, status_code=HTTP_202_ACCEPTED)
+async def create_import(data: ImportCreate):
+    """Queue the import of a vendor file from the vendor data directory, run by the import workers"""
+    return await enqueue_import(await Queue.instance().connect(), data.file)
+
+
+@import_router.get("/imports/{import_id}", response_model=ImportRead, status_code=HTTP_200_OK)
+async def get_import(import_id: str):
+    """Get the progress of an import"""
+    progress = await ImportProgress(await Queue.instance().connect(), import_id).read()
+    if progress is None:
+        raise NotFoundException(detail=f"No import {import_id!r}.")
+    return progress
@@ -0,0 +1,355 @@
+"""Vendor files flattened into rows per table, ready for multi-row statements.
+
+A vendor file nests product lines, products, swatches and variants. It is
+read as a sequence of records (the vendor, each product line, each product),
+which `chunks` groups a bounded number of products at a time and `validate`
+flattens into lists of rows per table, deriving the swatch colours of the
+whole batch from their hex colours first (`colors`). Validating is where the
+CPU goes (colour conversion, schema validation, enum normalization, digests),
+and it depends on nothing but the batch, so it can run in another process
+while earlier batches are written. A product that does not validate is rejected (`Reject`) rather
+than failing the import. Rows point at the rows they belong to by natural key (a
+slug, a tag name, a locale's language and country) rather than by ID: IDs are
+only known once the parents have been written, and `BulkWriter` fills them in
+table by table. Products, swatches and variants also carry the digest of their
+values (`content_hash`), which re-imports compare with the stored one.
+"""
+
+import hashlib
+import json
+from collections.abc import Hashable, Iterable, Iterator
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, NamedTuple, TypeVar
+
+from advanced_alchemy.utils.text import slugify
+from core.logger import get_logger
+from domain.enums import (
+    ApplicationMethodEnum,
+    ColorRangeEnum,
+    OpacityEnum,
+    PackagingTypeEnum,
+    ProductLineTypeEnum,
+    ProductTypeEnum,
+    ViscosityEnum,
+)
+from domain.product.batch import column_values
+from domain.product.models import Product
+from domain.product_line.models import ProductLine
+from domain.product_swatch.models import ProductSwatch
+from domain.product_swatch.schemas import ProductSwatchBase
+from domain.product_variant.models import ProductVariant
+from domain.product_variant.schemas import ProductVariantBase
+from domain.vendor.models import Vendor
+from domain.vendor.schemas import VendorCreate
+
+from .colors import derive_swatches
+
+
+logger = get_logger(__name__)
+
+EnumT = TypeVar("EnumT", bound=Enum)
+
+"""Kinds of record read from a vendor file, in document order: a vendor, then each of its
+product lines followed by the line's products."""
+VENDOR, PRODUCT_LINE, PRODUCT = "vendor", "product_line", "product"
+
+Record = tuple[str, dict[str, Any]]
+
+
+@dataclass
+class Row:
+    """Column values of one row, and the natural key each of its foreign keys points at."""
+
+    values: dict[str, Any]
+    refs: dict[str, Hashable] = field(default_factory=dict)
+
+
+class Position(NamedTuple):
+    """Where a vendor file has been read to: the first `offset` products of `product_line` of `vendor`."""
+
+    vendor: str | None = None
+    product_line: str | None = None
+    offset: int = 0
+
+
+class ProductItem(NamedTuple):
+    """A product record awaiting validation, and where it was read."""
+
+    vendor: str | None
+    product_line: str
+    offset: int
+    slug: str
+    data: dict[str, Any]
+
+
+@dataclass
+class Reject:
+    """A product left out of an import, and why."""
+
+    vendor: str | None
+    product_line: str
+    offset: int
+    name: str | None
+    error: str
+    slug: str | None = None
+
+
+@dataclass
+class ImportBatch:
+    """Rows for every table an import writes, in the order they must be written.
+
+    Until validated, the batch's products are `items`. `resumed` holds the
+    slugs of the products passed over up to a checkpoint, which are still the
+    file's, like those of rejected products. `repeated` counts the products
+    skipped for a slug the file already had. `corrected` holds the swatch
+    colours supplied by products that disagreed with their hex colour.
+    """
+
+    vendors: list[Row] = field(default_factory=list)
+    product_lines: list[Row] = field(default_factory=list)
+    products: list[Row] = field(default_factory=list)
+    swatches: list[Row] = field(default_factory=list)
+    variants: list[Row] = field(default_factory=list)
+    product_tags: list[Row] = field(default_factory=list)
+    product_analogous: list[Row] = field(default_factory=list)
+    items: list[ProductItem] = field(default_factory=list)
+    rejects: list[Reject] = field(default_factory=list)
+    resumed: list[str] = field(default_factory=list)
+    repeated: int = 0
+    corrected: dict[str, list[str]] = field(default_factory=dict)
+    position: Position = Position()
+
+
+def member(enum_class: type[EnumT], value: Any, default: EnumT | None = None) -> EnumT | None:
+    """The member of `enum_class` named `value`, or with `value` as its value."""
+    if isinstance(value, enum_class):
+        return value
+    if not isinstance(value, str):
+        return default
+    return enum_class.__members__.get(value) or enum_class._value2member_map_.get(value, default)
+
+
+def product_categories(item: dict[str, Any]) -> dict[str, list[Enum]]:
+    """Color ranges and product types of a product item, unknown ones dropped."""
+    color_range = [m for value in item.get("color_range") or [] if (m := member(ColorRangeEnum, value))]
+    if not color_range:
+        raise ValueError(f"Product {item.get('name')!r} has no valid color range.")
+    product_type = [m for value in item.get("product_type") or [] if (m := member(ProductTypeEnum, value))]
+    return {"color_range": color_range, "product_type": product_type or [ProductTypeEnum.Acrylic]}
+
+
+def variant_values(item: dict[str, Any]) -> dict[str, Any]:
+    """Column values of a variant item, its enums given by name or value."""
+    item = {
+        **item,
+        "packaging": member(PackagingTypeEnum, item.get("packaging"), PackagingTypeEnum.Unknown),
+        "opacity": member(OpacityEnum, item.get("opacity"), OpacityEnum.Unknown),
+        "viscosity": member(ViscosityEnum, item.get("viscosity"), ViscosityEnum.Unknown),
+        "application_method": member(
+            ApplicationMethodEnum, item.get("application_method"), ApplicationMethodEnum.Unknown
+        ),
+    }
+    return column_values(ProductVariant, ProductVariantBase.model_validate(item).model_dump())
+
+
+def locale_key(item: dict[str, Any]) -> tuple[str, str]:
+    return item.get("language_code") or "en", item.get("country_code") or "US"
+
+
+def vendor_records(data: dict[str, Any]) -> Iterator[Record]:
+    """Records of a vendor already loaded in memory, as `stream.read_vendor_file` yields them."""
+    yield VENDOR, {key: value for key, value in data.items() if key != "product_lines"}
+    for line_item in data.get("product_lines", []):
+        yield PRODUCT_LINE, {key: value for key, value in line_item.items() if key != "products"}
+        for product_item in line_item.get("products", []):
+            yield PRODUCT, product_item
+
+
+def batches(
+    records: Iterable[Record], batch_size: int | None = None, resume_from: Position | None = None
+) -> Iterator[ImportBatch]:
+    """Validated batches of `records` (see `chunks`)."""
+    for batch in chunks(records, batch_size, resume_from):
+        yield validate(batch)
+
+
+def chunks(
+    records: Iterable[Record], batch_size: int | None = None, resume_from: Position | None = None
+) -> Iterator[ImportBatch]:
+    """Group `records` into batches of at most `batch_size` products (all of them by default), yet to validate.
+
+    Products are keyed by the slug of their name, as they always have been by
+    the importer. A product repeated anywhere in the file is kept the first
+    time only, and counted in its batch's `repeated`: importing it again would
+    update the first one, and move it to the repeat's product line.
+
+    With `resume_from`, the products up to that position are passed over
+    (vendors and product lines are not, being needed by the products after
+    it). The records must be those of the file the position was taken in.
+    """
+    batch = ImportBatch()
+    vendor = product_line = None
+    offset = 0
+    product_lines: set[str] = set()
+    products = 0
+    # Every product slug of the file so far, those passed over or rejected included.
+    seen: set[str] = set()
+
+    for kind, data in records:
+        if kind == VENDOR:
+            row = vendor_row(data)
+            vendor, product_line = row.values["slug"], None
+            product_lines.clear()
+            batch.vendors.append(row)
+        elif kind == PRODUCT_LINE:
+            row = product_line_row(data, vendor)
+            product_line, offset = row.values["slug"], 0
+            if product_line in product_lines:
+                logger.warning("Skipping repeated product line", vendor=vendor, product_line=product_line)
+                product_line = None
+                continue
+            product_lines.add(product_line)
+            batch.product_lines.append(row)
+        elif product_line is not None:
+            offset += 1
+            if not isinstance(name := data.get("name"), str):
+                batch.rejects.append(Reject(vendor, product_line, offset, None, "The product has no name."))
+            elif (slug := slugify(name)) in seen:
+                logger.warning("Skipping repeated product", vendor=vendor, product_line=product_line, product=slug)
+                batch.repeated += 1
+            elif resume_from is not None:
+                seen.add(slug)
+                batch.resumed.append(slug)
+            else:
+                seen.add(slug)
+                products += 1
+                batch.items.append(ProductItem(vendor, product_line, offset, slug, data))
+                if products == batch_size:
+                    batch.position = Position(vendor, product_line, offset)
+                    yield batch
+                    batch = ImportBatch()
+                    products = 0
+        if resume_from is not None and resume_from == (vendor, product_line, offset):
+            resume_from = None
+
+    if resume_from is not None:
+        raise ValueError(f"The file has no {resume_from}; it has changed since its checkpoint was taken.")
+    if batch.vendors or batch.product_lines or batch.items or batch.rejects or batch.resumed or batch.repeated:
+        batch.position = Position(vendor, product_line, offset)
+        yield batch
+
+
+def validate(batch: ImportBatch) -> ImportBatch:
+    """Flatten the items of `batch` into rows, rejecting those that do not validate.
+
+    Only plain values go in and out, so that batches can be validated in
+    another process.
+    """
+    swatched = [item for item in batch.items if isinstance(item.data.get("swatch"), dict)]
+    derived = derive_swatches([item.data["swatch"] for item in swatched])
+    colors = dict(zip((item.slug for item in swatched), derived, strict=True))
+    for item in batch.items:
+        rows = ImportBatch()
+        swatch = colors.get(item.slug)
+        try:
+            if swatch is not None and swatch.error is not None:
+                raise ValueError(swatch.error)
+            flatten_product(rows, item.data, item.slug, item.product_line, swatch and swatch.values)
+        except (KeyError, TypeError, ValueError) as e:
+            error = f"Missing field {e}." if isinstance(e, KeyError) else str(e)
+            batch.rejects.append(Reject(*item[:3], item.data.get("name"), error, item.slug))
+            continue
+        if swatch is not None and swatch.corrected:
+            batch.corrected[item.slug] = swatch.corrected
+        for name in ("products", "swatches", "variants", "product_tags", "product_analogous"):
+            getattr(batch, name).extend(getattr(rows, name))
+    batch.items = []
+    return batch
+
+
+def vendor_row(data: dict[str, Any]) -> Row:
+    vendor = VendorCreate(
+        name=data["vendor_name"],
+        url=data["vendor_url"],
+        slug=data["slug"],
+        platform=data["platform"],
+        description=data["description"],
+        pdp_slug=data["pdp_slug"],
+        plp_slug=data["plp_slug"],
+    )
+    return Row(column_values(Vendor, vendor.model_dump()))
+
+
+def product_line_row(item: dict[str, Any], vendor: str | None) -> Row:
+    name = item["product_line_name"]
+    values = {
+        "name": name,
+        "slug": item.get("slug") or slugify(name),
+        "marketing_name": item.get("marketing_name", name),
+        "description": item.get("description", ""),
+        "vendor_slug": item.get("vendor_slug"),
+        "product_line_type": member(ProductLineTypeEnum, item.get("product_line_type"), ProductLineTypeEnum.Mixed),
+        # Restores a product line removed by an earlier import.
+        "is_deleted": False,
+        "deleted_at": None,
+    }
+    return Row(column_values(ProductLine, values), {"vendor_id": vendor})
+
+
+def flatten_product(
+    batch: ImportBatch, item: dict[str, Any], slug: str, product_line: str, colors: dict[str, Any] | None = None
+) -> None:
+    """Append the rows of a product to `batch`, its swatch with the `colors` derived from its hex colour."""
+    swatch = None
+    if isinstance(swatch_item := item.get("swatch"), dict):
+        swatch_item = {**swatch_item, **(colors or {})}
+        values = column_values(ProductSwatch, ProductSwatchBase.model_validate(swatch_item).model_dump())
+        swatch = Row({**values, "content_hash": content_hash(values)}, {"product_id": slug})
+        batch.swatches.append(swatch)
+
+    variants = []
+    for variant_item in item.get("variants", []):
+        values, locale = variant_values(variant_item), locale_key(variant_item)
+        refs = {"product_id": slug, "locale_id": locale}
+        variants.append(Row({**values, "content_hash": content_hash(values, locale)}, refs))
+    batch.variants += variants
+
+    tags = list(dict.fromkeys(item.get("tags") or []))
+    analogous = list(dict.fromkeys(item.get("analogous") or []))
+    batch.product_tags += [Row({}, {"product_id": slug, "tag_id": name}) for name in tags]
+    batch.product_analogous += [Row({}, {"product_id": slug, "analogous_id": name}) for name in analogous]
+
+    product = {
+        "name": item["name"],
+        "slug": slug,
+        "iscc_nbs_category": item.get("iscc_nbs_category"),
+        **product_categories(item),
+    }
+    product = column_values(Product, product)
+    # The product's digest covers its children, so that an unchanged product needs no look at them.
+    digest = content_hash(
+        product,
+        product_line,
+        sorted(tags),
+        sorted(analogous),
+        swatch and swatch.values["content_hash"],
+        sorted(variant.values["content_hash"] for variant in variants),
+    )
+    # Written only when new or changed, which also restores a product removed by an earlier import.
+    values = {**product, "content_hash": digest, "is_deleted": False, "deleted_at": None}
+    batch.products.append(Row(values, {"product_line_id": product_line}))
+
+
+def content_hash(*parts: Any) -> str:
+    """Digest of column values (and the natural keys they point at), compared by re-imports.
+
+    The values are serialized as canonical JSON, enums by name, so that the
+    digest of unchanged data is the same from one run to the next.
+    """
+    data = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=_plain)
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def _plain(value: Any) -> Any:
+    return value.name if isinstance(value, Enum) else str(value)
@@ -0,0 +1,35 @@
+from enum import Enum
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+
+class ImportStatus(Enum):
+    """Where a background import is at, in order."""
+
+    queued = "queued"
+    splitting = "splitting"
+    importing = "importing"
+    finishing = "finishing"
+    completed = "completed"
+    failed = "failed"
+
+
+class ImportCreate(BaseModel):
+    file: Annotated[str, Field(description="Name of a vendor file in the vendor data directory", min_length=1)]
+
+
+class ImportRead(BaseModel):
+    """Progress of a background import."""
+
+    id: Annotated[str, Field(description="ID of the import")]
+    file: Annotated[str, Field(description="The vendor file imported")]
+    status: ImportStatus
+    chunks_total: Annotated[int, Field(description="Chunks the file was split into, once split")] = 0
+    chunks_done: Annotated[int, Field(description="Chunks imported")] = 0
+    chunks_failed: Annotated[int, Field(description="Chunks that failed every attempt")] = 0
+    counts: Annotated[
+        dict[str, int],
+        Field(description="Rows written, left unchanged, removed and rejected so far", default_factory=dict),
+    ]
+    error: str | None = None
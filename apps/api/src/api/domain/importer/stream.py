@@ -0,0 +1,153 @@
+"""Incremental reading of vendor files.
+
+`json.load` holds a whole vendor dump in memory, and the objects built from it
+take several times the size of the file. `JsonStream` reads the file in fixed
+size chunks instead, walking the outer arrays and objects member by member and
+decoding only the innermost values whole, so that memory is bounded by the
+largest single product rather than by the file.
+
+A vendor's own fields, and a product line's, must come before its
+`product_lines` or `products` array, as they do in the exported vendor files:
+the vendor and product line rows are written before their children.
+"""
+
+import json
+import re
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+from .rows import PRODUCT, PRODUCT_LINE, VENDOR, Record
+
+
+"""Characters read from the file at a time."""
+CHUNK_SIZE = 1 << 16
+
+WHITESPACE = " \t\n\r"
+
+"""What may follow a decoded number in the buffer and still be part of it, once the next chunk is read."""
+NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+
+
+class JsonStream:
+    """Pull parser over a text file, decoding one value at a time."""
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.consumed = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _read(self) -> None:
+        """Append the next chunk to the buffer, dropping what has been consumed."""
+        chunk = self.file.read(self.chunk_size)
+        self.consumed += self.pos
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        self.eof = not chunk
+
+    @property
+    def offset(self) -> int:
+        """Characters read from the file before the next one."""
+        return self.consumed + self.pos
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or "" at the end of the file."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos : self.pos + 1]
+            self._read()
+
+    def expect(self, char: str) -> None:
+        if (found := self.peek()) != char:
+            raise ValueError(f"Expected {char!r} at offset {self.offset}, found {found or 'the end of the file'!r}.")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next value whole."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number cut off by the end of the buffer decodes ("12" of "123", "1" of "1.5" or
+                # "1e3"), but may go on in the next chunk.
+                cut = end == len(self.buffer) or (
+                    isinstance(value, (int, float)) and NUMBER_TAIL.match(self.buffer, end) is not None
+                )
+                if not cut or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read()
+
+    def items(self) -> Iterator[None]:
+        """Walk an array, yielding before each element; the caller consumes the element."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() != ",":
+                break
+            self.pos += 1
+        self.expect("]")
+
+    def members(self) -> Iterator[str]:
+        """Walk an object, yielding each key; the caller consumes its value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() != ",":
+                break
+            self.pos += 1
+        self.expect("}")
+
+
+def read_vendor_file(file: TextIO) -> Iterator[Record]:
+    """Records of a vendor file holding one vendor or an array of them, as they are parsed."""
+    stream = JsonStream(file)
+    if stream.peek() == "[":
+        for _ in stream.items():
+            yield from _read_vendor(stream)
+    else:
+        yield from _read_vendor(stream)
+    if stream.peek():
+        raise ValueError(f"Unexpected data after the vendors at offset {stream.offset}.")
+
+
+def _read_vendor(stream: JsonStream) -> Iterator[Record]:
+    yield from _read_parent(stream, VENDOR, "product_lines", _read_product_line)
+
+
+def _read_product_line(stream: JsonStream) -> Iterator[Record]:
+    yield from _read_parent(stream, PRODUCT_LINE, "products", lambda stream: iter([(PRODUCT, stream.value())]))
+
+
+def _read_parent(stream: JsonStream, kind: str, children: str, read_child) -> Iterator[Record]:
+    """The record of an object with an array of children, then the children's records."""
+    fields: dict[str, Any] = {}
+    done = False
+    for key in stream.members():
+        if done:
+            raise ValueError(f"The {kind} field {key!r} comes after {children!r}; it must come before.")
+        if key != children:
+            fields[key] = stream.value()
+            continue
+        yield kind, fields
+        done = True
+        for _ in stream.items():
+            yield from read_child(stream)
+    if not done:
+        yield kind, fields
@@ -0,0 +1,182 @@
+"""Multi-row statements writing the rows of an `ImportBatch`.
+
+Each table is written with one statement, and upserts return the ID of
+every row they write. The writer remembers those IDs by natural key, so the
+foreign keys of the next table are filled in memory rather than looked up row
+by row.
+
+Every statement has a `RETURNING` clause, which makes SQLAlchemy send the rows
+as pages of multi-row `VALUES` compiled once ("insertmanyvalues"). Without it
+asyncpg runs an executemany as one statement per row, and the statement-level
+catalog triggers once per row with it.
+
+Tags and analogous colors are shared by every vendor. When vendors are
+imported concurrently, each in its own transaction, the writer is given a
+session factory for them: missing names are then created in a transaction of
+their own, committed at once, instead of holding their locks (and blocking
+every other worker needing the same tag) until the whole vendor commits.
+
+Re-imports mostly find rows unchanged. Upserts leave alone the rows whose
+values are all the same, and `existing` reads what is stored for a batch's
+keys in one statement, so that the caller only writes what differs. A table
+counts as written (and its cached counts as stale) only if a statement
+actually changed one of its rows.
+"""
+
+from collections import defaultdict
+from collections.abc import Hashable, Iterable
+from typing import Any
+from uuid import UUID
+
+from domain.pagination import TRACK_WRITES, invalidate_counts, mark_written
+from domain.tag.resolver import TagResolver
+from sqlalchemy import Table, any_, bindparam, delete, func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql.elements import ColumnElement
+
+from .metrics import RESOLVE, StageTimer
+from .rows import Row
+
+
+def _table(target: Any) -> Table:
+    return target if isinstance(target, Table) else target.__table__
+
+
+def any_of(column: Any, values: Iterable) -> ColumnElement[bool]:
+    """`column = ANY(:values)`: one array parameter however many values, unlike `IN`."""
+    return column == any_(bindparam(None, list(values), type_=ARRAY(column.type)))
+
+
+class BulkWriter:
+    """Writes rows a table at a time, keeping the ID of each row written by its natural key."""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        names_session_factory: async_sessionmaker | None = None,
+        timer: StageTimer | None = None,
+    ):
+        self.session = session
+        self.names_session_factory = names_session_factory
+        # Lookups are timed as resolving, within whatever stage the caller times writes as.
+        self.timer = timer or StageTimer()
+        self.ids: dict[str, dict[Hashable, UUID]] = defaultdict(dict)
+        self.resolvers: dict[str, TagResolver] = {}
+
+    def resolve(self, target: Any, rows: Iterable[Row]) -> list[dict[str, Any]]:
+        """Values of `rows` with their foreign keys filled in.
+
+        Rows pointing at a row that was not written (e.g. the variants of a
+        product that already existed) are left out.
+        """
+        columns = _table(target).c
+        resolved = []
+        for row in rows:
+            values = dict(row.values)
+            for column, key in row.refs.items():
+                referenced = next(iter(columns[column].foreign_keys)).column.table.name
+                if (id_ := self.ids[referenced].get(key)) is None:
+                    break
+                values[column] = id_
+            else:
+                resolved.append(values)
+        return resolved
+
+    async def upsert(self, model: Any, rows: Iterable[Row], *, key: str = "slug", update: bool = True) -> dict:
+        """Insert `rows`, updating those whose `key` already exists unless `update` is false.
+
+        Returns the IDs of the rows inserted or updated by key. Existing rows
+        are updated only where a value differs; neither they nor the rows left
+        alone because `update` is false are returned, but their IDs are still
+        remembered. Unlike an update, which locks the existing row even if no
+        value differs, leaving it alone takes no lock.
+        """
+        values = self.resolve(model, rows)
+        if not values:
+            return {}
+
+        statement = pg_insert(model)
+        if update:
+            columns = sorted(values[0].keys() - {"id", key, "created_at"})
+            current, excluded = tuple_(*(model.__table__.c[column] for column in columns)), statement.excluded
+            statement = statement.on_conflict_do_update(
+                index_elements=[key],
+                set_={column: excluded[column] for column in columns} | {"updated_at": func.now()},
+                where=current.is_distinct_from(tuple_(*(excluded[column] for column in columns))),
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=[key])
+
+        result = await self._execute(statement.returning(getattr(model, key), model.id), values)
+        written = dict(result.tuples().all())
+        self.ids[model.__tablename__].update(written)
+        if written:
+            mark_written(self.session, model.__tablename__)
+        if unchanged := {row[key] for row in values} - written.keys():
+            existing = await self.existing(model, key, unchanged, key, "id")
+            self.ids[model.__tablename__].update(existing)
+        return written
+
+    async def existing(self, target: Any, column: str, keys: Iterable, *columns: str) -> list[tuple]:
+        """`columns` of the rows of `target` whose `column` is one of `keys`, sent as a single array."""
+        table = _table(target)
+        statement = select(*(table.c[name] for name in columns)).where(any_of(table.c[column], keys))
+        with self.timer.stage(RESOLVE):
+            return (await self.session.execute(statement)).tuples().all()
+
+    async def soft_delete(self, model: Any, *where: ColumnElement[bool]) -> list[UUID]:
+        """Mark the rows of `model` matching `where` as deleted; returns the IDs of those that were not already."""
+        table = model.__table__
+        statement = (
+            update(table)
+            .where(*where, table.c.is_deleted.is_not(True))
+            .values(is_deleted=True, deleted_at=func.now(), updated_at=func.now())
+            .returning(table.c.id)
+        )
+        ids = list((await self._execute(statement)).scalars().all())
+        if ids:
+            mark_written(self.session, table.name)
+        return ids
+
+    async def delete(self, target: Any, *where: ColumnElement[bool]) -> int:
+        """Delete the rows of `target` matching `where`; returns how many there were."""
+        table = _table(target)
+        if count := (await self._execute(delete(table).where(*where))).rowcount:
+            mark_written(self.session, table.name)
+        return count
+
+    async def resolve_names(self, model: Any, names: set[str]) -> None:
+        """Resolve (creating as needed) rows of a name/slug table such as tags by name.
+
+        Names resolved earlier in the import are not looked up again.
+        """
+        table = model.__tablename__
+        if not names - self.ids[table].keys():
+            return
+        with self.timer.stage(RESOLVE):
+            await self._resolve_names(model, names)
+
+    async def _resolve_names(self, model: Any, names: set[str]) -> None:
+        table = model.__tablename__
+        resolver = self.resolvers.setdefault(table, TagResolver(model))
+        if self.names_session_factory is None:
+            self.ids[table].update(await resolver.resolve(self.session, names))
+            return
+        async with self.names_session_factory() as session:
+            async with session.begin():
+                self.ids[table].update(await resolver.resolve(session, names))
+            await invalidate_counts(session)
+
+    async def insert(self, target: Any, rows: Iterable[Row]) -> int:
+        """Insert `rows` into a model's table or an association table; returns how many were inserted."""
+        values = self.resolve(target, rows)
+        if values:
+            await self._execute(insert(target).returning(*_table(target).primary_key), values)
+            mark_written(self.session, _table(target).name)
+        return len(values)
+
+    async def _execute(self, statement: Any, values: list[dict[str, Any]] | None = None) -> Any:
+        """Execute a write whose table the caller marks as written only if it changed a row."""
+        return await self.session.execute(statement.execution_options(**{TRACK_WRITES: False}), values)
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING, List
 
 from core.models import Entity
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from .locales import countries
@@ -38,3 +38,7 @@ class Locale(Entity):
         if key == "country_code" and value not in countries:
             raise ValueError(f"Invalid country code: {value}")
         return value
+
+
+# Keyset pagination seeks on (locale, id); see `domain.filters.KeysetPagination`.
+Index("ix_locales_locale_id", Locale.locale, Locale.id)
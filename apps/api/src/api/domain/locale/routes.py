@@ -1,9 +1,12 @@
+from dataclasses import replace
 from uuid import UUID
 
 from advanced_alchemy.filters import SearchFilter
 from advanced_alchemy.service import OffsetPagination
 from domain.dependencies import Services
+from domain.filters import CursorPaginatedResponse
 from fastapi import APIRouter, Query
+from schemas.base import CursorPage
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT
 from typing_extensions import Annotated
 
@@ -31,9 +34,14 @@ async def get_locale(locale_id: UUID, container: Services):
     return container.provide_locales.to_schema(locale)
 
 
-@locale_router.get("/locales", response_model=OffsetPagination[LocaleResponse], status_code=HTTP_200_OK)
+@locale_router.get(
+    "/locales",
+    response_model=OffsetPagination[LocaleResponse] | CursorPage[LocaleResponse],
+    status_code=HTTP_200_OK,
+)
 async def list_locales(
     filter_query: Annotated[LocaleFilters, Query()],
+    cursor: CursorPaginatedResponse,
     container: Services,
 ):
     filters = []
@@ -48,10 +56,15 @@ async def list_locales(
     if filter_query.display_name:
         filters.append(SearchFilter("display_name", filter_query.display_name, ignore_case=True))
 
+    if cursor is not None:
+        cursor = replace(cursor, fields=("locale", "id"))
+        results = await container.provide_locales.list(*filters, cursor)
+        return cursor.to_page(results, schema_type=LocaleResponse)
+
     try:
         results = await container.provide_locales.list(*filters)
 
-        return container.provide_locales.to_schema(results)
+        return container.provide_locales.to_schema(results, schema_type=LocaleResponse)
     except Exception as e:
         print(f"Error listing locales: {str(e)}")
         raise e
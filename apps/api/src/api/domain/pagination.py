@@ -0,0 +1,250 @@
+"""Count strategies for limit/offset list endpoints.
+
+`list_and_count` runs a `COUNT(*)` over the whole filtered set on every page,
+which is frequently more expensive than fetching the page itself. Endpoints
+using `paginate` let the client choose how the total is obtained:
+
+- ``exact``: a `COUNT(*)` per request (the previous behaviour).
+- ``cached``: an exact count cached in Redis per filter signature. The key
+  includes a generation number for every table the statement reads, and
+  those generations are bumped whenever a request writes to the table, or
+  to a table it is derived from by triggers (see `derived_table`).
+- ``estimated``: the planner's row estimate for the filtered statement,
+  flagged with `total_estimated`.
+- ``none``: no total at all, only `has_more`.
+
+All modes except ``exact`` fetch one row past the page to compute `has_more`,
+and fall back to an exact total for free on the last page.
+"""
+
+import hashlib
+from collections.abc import Iterable
+from enum import Enum
+from typing import Any
+
+from advanced_alchemy.filters import LimitOffset, PaginationFilter
+from core.config import settings
+from core.database import explain
+from core.logger import get_logger
+from exceptions import MissingClientError
+from fastapi import Depends, Query
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from schemas.base import OffsetPage, SchemaT
+from services import Cache
+from sqlalchemy import ColumnElement, Table, event, inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+from sqlalchemy.sql.util import find_tables
+from typing_extensions import Annotated
+
+
+logger = get_logger(__name__)
+
+"""Key in `Session.info` collecting the names of tables written by the session."""
+WRITTEN_TABLES_KEY = "written_tables"
+
+"""Execution option leaving a statement's table out of `WRITTEN_TABLES_KEY`: for callers that
+only know whether a statement changed any row once it has run, and then call `mark_written`."""
+TRACK_WRITES = "track_written_tables"
+
+"""Tables written by database triggers only, by the tables whose writes they follow."""
+DERIVED_TABLES: dict[str, set[str]] = {}
+
+
+class CountStrategy(Enum):
+    """How the total of a paginated list is computed."""
+
+    exact = "exact"
+    cached = "cached"
+    estimated = "estimated"
+    none = "none"
+
+
+def provide_count_strategy(
+    count: CountStrategy = Query(
+        default=CountStrategy.exact,
+        description="How to compute `total`: exact, cached, estimated, or none (only `has_more`).",
+    ),
+) -> CountStrategy:
+    return count
+
+
+CountStrategyParam = Annotated[CountStrategy, Depends(provide_count_strategy)]
+
+
+async def paginate(
+    service,
+    *filters: Any,
+    limit_offset: LimitOffset,
+    count: CountStrategy,
+    schema_type: type[SchemaT],
+    order_by: Any = None,
+    **kwargs: Any,
+) -> OffsetPage[SchemaT]:
+    """List a page of `service` and compute its total with the given strategy.
+
+    Extra keyword arguments (e.g. `load`) are passed on to the service's list methods.
+    """
+    limit, offset = limit_offset.limit, limit_offset.offset
+    total_estimated = False
+
+    if count is CountStrategy.exact:
+        results, total = await service.list_and_count(*filters, limit_offset, order_by=order_by, **kwargs)
+        items = results
+        has_more = offset + len(items) < total
+    else:
+        results = await service.list(*filters, LimitOffset(limit + 1, offset), order_by=order_by, **kwargs)
+        items = results[:limit]
+        has_more = len(results) > limit
+        total, total_estimated = await resolve_total(
+            service, *filters, count=count, offset=offset, seen=len(items), has_more=has_more
+        )
+
+    return OffsetPage[schema_type](
+        items=TypeAdapter(list[schema_type]).validate_python(items, from_attributes=True),
+        limit=limit,
+        offset=offset,
+        total=total,
+        total_estimated=total_estimated,
+        has_more=has_more,
+    )
+
+
+async def resolve_total(
+    service,
+    *filters: Any,
+    count: CountStrategy,
+    offset: int,
+    seen: int,
+    has_more: bool,
+) -> tuple[int | None, bool]:
+    """Total and whether it is estimated, for a page of `seen` rows fetched with one look-ahead row."""
+    if count is CountStrategy.exact:
+        return await service.count(*filters), False
+    if not has_more and (seen or offset == 0):
+        # The last page tells us the exact total without counting.
+        return offset + seen, False
+    if count is CountStrategy.none:
+        return None, False
+    if count is CountStrategy.estimated:
+        total = await estimate_count(service, *filters)
+        # Never report fewer rows than we have already seen.
+        return max(total, offset + seen + int(has_more)), True
+    return await cached_count(service, *filters), False
+
+
+def filtered_statement(service, *filters: Any):
+    """The service's base statement with `filters` applied, without pagination."""
+    repository = service.repository
+    statement = repository.statement
+    for filter_ in filters:
+        if isinstance(filter_, ColumnElement):
+            statement = statement.where(filter_)
+        elif not isinstance(filter_, PaginationFilter):
+            statement = filter_.append_to_statement(statement, repository.model_type)
+    return statement
+
+
+def _statement_tables(statement) -> list[str]:
+    tables = find_tables(statement, check_columns=True, include_aliases=True)
+    return sorted({table.name for table in tables if isinstance(table, Table)})
+
+
+async def estimate_count(service, *filters: Any) -> int:
+    """Estimate the number of rows matching `filters` from planner statistics."""
+    statement = filtered_statement(service, *filters)
+    plan = await explain(service.repository.session, statement)
+    return int(plan["Plan Rows"])
+
+
+async def cached_count(service, *filters: Any) -> int:
+    """Return an exact count for `filters`, cached until a counted table is written."""
+    statement = filtered_statement(service, *filters)
+
+    try:
+        client = Cache.instance().client
+        key = await generational_key(client, "count", statement)
+        if (cached := await client.get(key)) is not None:
+            return int(cached)
+    except (MissingClientError, RedisError) as e:
+        logger.debug("Count cache unavailable, counting exactly", error=str(e))
+        return await service.count(*filters)
+
+    total = await service.count(*filters)
+    try:
+        await client.set(key, total, ex=settings.redis.COUNT_CACHE_TTL)
+    except RedisError as e:
+        logger.debug("Could not cache count", error=str(e))
+    return total
+
+
+async def generational_key(client, namespace: str, statement) -> str:
+    """Cache key for a result derived from `statement`.
+
+    The key changes whenever a table the statement reads is written, so
+    entries never need to be deleted explicitly.
+    """
+    versions = await table_generations(client, _statement_tables(statement))
+    return f"{namespace}:{versions}:{_signature(statement)}"
+
+
+async def table_generations(client, tables: list[str]) -> str:
+    """The current generation of each of `tables`, as a cache key fragment."""
+    generations = await client.mget([_generation_key(table) for table in tables])
+    return ":".join(f"{table}.{generation or 0}" for table, generation in zip(tables, generations, strict=True))
+
+
+def _signature(statement) -> str:
+    compiled = statement.compile(dialect=postgresql.dialect())
+    params = sorted((k, repr(v)) for k, v in compiled.params.items())
+    return hashlib.sha1(f"{compiled}{params}".encode()).hexdigest()
+
+
+def _generation_key(table: str) -> str:
+    return f"count:generation:{table}"
+
+
+def derived_table(table: str, sources: Iterable[str]) -> None:
+    """Declare `table` as written by triggers on `sources`, so that writing those invalidates its counts."""
+    for source in sources:
+        DERIVED_TABLES.setdefault(source, set()).add(table)
+
+
+def mark_written(session, *tables: str) -> None:
+    """Record `tables` as written by the session, for statements executed with `TRACK_WRITES` off."""
+    session.info.setdefault(WRITTEN_TABLES_KEY, set()).update(tables)
+
+
+async def invalidate_counts(session) -> None:
+    """Bump the count generation of every table the session has written to."""
+    tables = session.info.pop(WRITTEN_TABLES_KEY, None)
+    if not tables:
+        return
+    tables |= {derived for table in tables for derived in DERIVED_TABLES.get(table, ())}
+    try:
+        async with Cache.instance().client.pipeline(transaction=False) as pipe:
+            for table in tables:
+                pipe.incr(_generation_key(table))
+            await pipe.execute()
+    except (MissingClientError, RedisError) as e:
+        logger.debug("Could not invalidate cached counts", tables=sorted(tables), error=str(e))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session: Session, flush_context: UOWTransaction) -> None:
+    written = session.info.setdefault(WRITTEN_TABLES_KEY, set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        mapper = inspect(instance).mapper
+        written.update(table.name for table in mapper.tables)
+        written.update(rel.secondary.name for rel in mapper.relationships if rel.secondary is not None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.execution_options.get(TRACK_WRITES, True):
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table
+        orm_execute_state.session.info.setdefault(WRITTEN_TABLES_KEY, set()).add(table.name)
+
@@ -0,0 +1,131 @@
+"""Set-based creation of many products with their swatches, variants and tags.
+
+Where `POST /products` spends a few round trips per product, swatch and
+variant, a batch costs a fixed number of statements whatever its size: two lookups
+validating product lines and locales, one upsert each for tags and analogous
+colors, then one multi-row `INSERT` per table. Products are inserted with
+`ON CONFLICT (slug) DO NOTHING RETURNING id`, so a slug that is already
+taken is reported for its item instead of failing the batch.
+"""
+
+from collections.abc import Sequence
+from enum import Enum as PyEnum
+from typing import Any
+from uuid import UUID
+
+from domain.analogous.models import Analogous
+from domain.associations import product_analogous_association, product_tag_association
+from domain.locale.models import Locale
+from domain.product_line.models import ProductLine
+from domain.product_swatch.models import ProductSwatch
+from domain.product_variant.models import ProductVariant
+from domain.tag.models import Tag
+from domain.tag.resolver import TagResolver
+from sqlalchemy import Enum, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from uuid_utils.compat import uuid7
+
+from .models import Product
+from .schemas import BatchItemStatus, ProductBatchResponse, ProductBatchResult, ProductCreate
+from .service import ProductService
+
+
+"""Most products accepted by one `POST /products:batch`."""
+MAX_BATCH_SIZE = 500
+
+
+def column_values(model: Any, data: dict[str, Any]) -> dict[str, Any]:
+    """The entries of `data` that are columns of `model`, enum values turned back into members."""
+    columns = model.__table__.c
+    values = {}
+    for name, value in data.items():
+        if name not in columns:
+            continue
+        column_type = columns[name].type
+        if isinstance(column_type, Enum) and column_type.enum_class is not None and value is not None:
+            value = column_type.enum_class(value) if not isinstance(value, PyEnum) else value
+        values[name] = value
+    return values
+
+
+async def create_product_batch(service: ProductService, items: Sequence[ProductCreate]) -> ProductBatchResponse:
+    session = service.repository.session
+    results = [ProductBatchResult(index=index, slug=item.slug) for index, item in enumerate(items)]
+
+    product_line_ids = {item.product_line_id for item in items}
+    locale_ids = {variant.locale_id for item in items for variant in item.variants}
+    existing_product_lines = set(
+        (
+            await session.scalars(
+                select(ProductLine.id).where(ProductLine.id.in_(product_line_ids), ProductLine.is_deleted.is_(False))
+            )
+        ).all()
+    )
+    existing_locales = set((await session.scalars(select(Locale.id).where(Locale.id.in_(locale_ids)))).all())
+
+    products, valid = [], []
+    slugs_seen: set[str] = set()
+    for item, result in zip(items, results, strict=True):
+        if item.product_line_id not in existing_product_lines:
+            result.errors.append(f"Product line {item.product_line_id} does not exist.")
+        if unknown := {v.locale_id for v in item.variants} - existing_locales:
+            result.errors.append(f"Locales {', '.join(map(str, sorted(unknown)))} do not exist.")
+        if not item.variants:
+            result.errors.append("Variants are required to create a product.")
+        try:
+            categories = service.get_valid_enum_fields(item.model_dump())
+        except ValueError as e:
+            result.errors.append(str(e))
+        if result.errors:
+            result.status = BatchItemStatus.invalid
+            continue
+        if item.slug in slugs_seen:
+            result.status = BatchItemStatus.conflict
+            result.errors.append(f"Slug {item.slug!r} appears earlier in the batch.")
+            continue
+        slugs_seen.add(item.slug)
+
+        result.id = uuid7()
+        products.append({**column_values(Product, item.model_dump()), **categories, "id": result.id})
+        valid.append((item, result))
+
+    tag_ids = await TagResolver(Tag).resolve(session, {tag for item, _ in valid for tag in item.tags or []})
+    analogous_ids = await TagResolver(Analogous).resolve(
+        session, {name for item, _ in valid for name in item.analogous or []}
+    )
+
+    created: set[UUID] = set()
+    if products:
+        statement = pg_insert(Product).values(products).on_conflict_do_nothing(index_elements=["slug"])
+        created = set((await session.scalars(statement.returning(Product.id))).all())
+
+    swatches, variants, tag_links, analogous_links = [], [], [], []
+    for item, result in valid:
+        if result.id not in created:
+            result.status, result.id = BatchItemStatus.conflict, None
+            result.errors.append(f"A product with slug {item.slug!r} already exists.")
+            continue
+        result.status = BatchItemStatus.created
+        swatches.append({**column_values(ProductSwatch, item.swatch.model_dump()), "product_id": result.id})
+        variants += [
+            {**column_values(ProductVariant, variant.model_dump()), "product_id": result.id}
+            for variant in item.variants
+        ]
+        tag_links += [{"product_id": result.id, "tag_id": id_} for id_ in {tag_ids[tag] for tag in item.tags or []}]
+        analogous_links += [
+            {"product_id": result.id, "analogous_id": id_}
+            for id_ in {analogous_ids[name] for name in item.analogous or []}
+        ]
+
+    # ORM bulk inserts: client-side defaults (ids, timestamps) are applied and rows go out as multi-row INSERTs.
+    for model, rows in ((ProductSwatch, swatches), (ProductVariant, variants)):
+        if rows:
+            await session.execute(insert(model), rows)
+    for table, rows in ((product_tag_association, tag_links), (product_analogous_association, analogous_links)):
+        if rows:
+            await session.execute(insert(table), rows)
+
+    return ProductBatchResponse(
+        created=sum(result.status is BatchItemStatus.created for result in results),
+        results=results,
+    )
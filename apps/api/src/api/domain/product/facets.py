@@ -0,0 +1,120 @@
+"""Facet counts for the product browse UI.
+
+Every facet is aggregated from the same filtered product set, which is
+written once as a CTE; the per-facet `GROUP BY`s are combined with
+`UNION ALL`, so all counts come back from a single statement. Results are
+cached in Redis per filter signature and invalidated by writes to any of
+the tables involved, like cached list totals.
+"""
+
+from collections import defaultdict
+from typing import Any
+
+from core.config import settings
+from core.logger import get_logger
+from domain.associations import product_tag_association
+from domain.pagination import filtered_statement, generational_key
+from domain.product_line.models import ProductLine
+from domain.product_variant.models import ProductVariant
+from domain.tag.models import Tag
+from domain.vendor.models import Vendor
+from exceptions import MissingClientError
+from redis.exceptions import RedisError
+from services import Cache
+from sqlalchemy import Select, String, cast, func, literal, null, select, union_all
+
+from .models import Product
+from .schemas import FacetValue, ProductFacetsResponse
+
+
+logger = get_logger(__name__)
+
+
+def facet_statement(filtered: Select) -> Select:
+    """Aggregate every facet of the products selected by `filtered` in one statement."""
+    products = filtered.with_only_columns(
+        Product.id, Product.color_range, Product.product_type, Product.product_line_id
+    ).cte("filtered_products")
+
+    def grouped(facet: str, value, label, count, *joins) -> Select:
+        statement = select(
+            literal(facet).label("facet"),
+            cast(value, String).label("value"),
+            cast(label, String).label("label"),
+            count.label("count"),
+        ).select_from(products)
+        for target, onclause in joins:
+            statement = statement.join(target, onclause)
+        # Nullable columns (a variant's opacity, viscosity) are no value to filter by.
+        return statement.where(value.is_not(None)).group_by(value, label)
+
+    def unnested(facet: str, column) -> Select:
+        values = select(products.c.id, func.unnest(column).label("value")).subquery()
+        # Arrays may repeat a value; count each product once.
+        count = func.count(values.c.id.distinct())
+        return select(
+            literal(facet).label("facet"),
+            cast(values.c.value, String).label("value"),
+            cast(values.c.value, String).label("label"),
+            count.label("count"),
+        ).group_by(values.c.value)
+
+    # A product has a variant per locale; count each product once.
+    per_product = func.count(products.c.id.distinct())
+    variants = (ProductVariant, (ProductVariant.product_id == products.c.id) & ProductVariant.is_deleted.is_(False))
+    line = (ProductLine, ProductLine.id == products.c.product_line_id)
+
+    return union_all(
+        select(literal("total"), null(), null(), func.count()).select_from(products),
+        unnested("color_range", products.c.color_range),
+        unnested("product_type", products.c.product_type),
+        grouped("vendor", Vendor.slug, Vendor.name, func.count(), line, (Vendor, Vendor.id == ProductLine.vendor_id)),
+        grouped("product_line", ProductLine.slug, ProductLine.name, func.count(), line),
+        grouped(
+            "tag",
+            Tag.slug,
+            Tag.name,
+            func.count(),
+            (product_tag_association, product_tag_association.c.product_id == products.c.id),
+            (Tag, Tag.id == product_tag_association.c.tag_id),
+        ),
+        grouped("opacity", ProductVariant.opacity, ProductVariant.opacity, per_product, variants),
+        grouped("viscosity", ProductVariant.viscosity, ProductVariant.viscosity, per_product, variants),
+    )
+
+
+async def product_facets(service, *filters: Any) -> ProductFacetsResponse:
+    """Facet counts for the products matching `filters`, served from the cache when possible."""
+    statement = facet_statement(filtered_statement(service, *filters))
+
+    try:
+        client = Cache.instance().client
+        key = await generational_key(client, "facets:products", statement)
+        if (cached := await client.get(key)) is not None:
+            return ProductFacetsResponse.model_validate_json(cached)
+    except (MissingClientError, RedisError) as e:
+        logger.debug("Facet cache unavailable, aggregating", error=str(e))
+        return await _aggregate(service, statement)
+
+    facets = await _aggregate(service, statement)
+    try:
+        await client.set(key, facets.model_dump_json(), ex=settings.redis.FACET_CACHE_TTL)
+    except RedisError as e:
+        logger.debug("Could not cache facets", error=str(e))
+    return facets
+
+
+async def _aggregate(service, statement) -> ProductFacetsResponse:
+    result = await service.repository.session.execute(statement)
+
+    total = 0
+    facets: dict[str, list[FacetValue]] = defaultdict(list)
+    for facet, value, label, count in result:
+        if facet == "total":
+            total = count
+        else:
+            facets[facet].append(FacetValue(value=value, label=label, count=count))
+
+    for values in facets.values():
+        values.sort(key=lambda v: (-v.count, v.label))
+    return ProductFacetsResponse(total=total, **facets)
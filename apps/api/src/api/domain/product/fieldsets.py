@@ -0,0 +1,131 @@
+"""Sparse fieldsets and relationship loading for product responses.
+
+`include=` picks which relationships are loaded (everything else is
+`noload`-ed), and `fields=` trims the serialized response down to the
+requested fields, with dotted paths reaching into relationships, e.g.
+`?fields=name,slug,swatch.hex_color` for a swatch grid.
+"""
+
+from dataclasses import dataclass
+from typing import Any, get_args
+
+from exceptions import BadRequestException
+from fastapi import Depends, Query, Response
+from pydantic import BaseModel
+from sqlalchemy.orm import joinedload, noload, selectinload
+from typing_extensions import Annotated
+
+from .models import Product
+from .schemas import ProductResponse
+
+
+"""Loader used for each relationship when it is included."""
+RELATIONSHIP_LOADERS = {
+    "swatch": joinedload,
+    "variants": selectinload,
+    "tags": selectinload,
+    "analogous": selectinload,
+}
+
+
+FieldTree = dict[str, "FieldTree | None"]
+
+
+def parse_fields(fields: str, schema: type[BaseModel]) -> FieldTree:
+    """Parse `a,b.c,b.d` into `{"a": None, "b": {"c": None, "d": None}}`, validated against `schema`."""
+    tree: FieldTree = {}
+    for path in filter(None, (p.strip() for p in fields.split(","))):
+        node, model = tree, schema
+        *parents, leaf = path.split(".")
+        for name in parents:
+            model = _nested_model(model, name, path)
+            if node.get(name, {}) is None:
+                break  # The whole relationship was already requested.
+            node = node.setdefault(name, {})
+        else:
+            if leaf not in model.model_fields:
+                raise BadRequestException(detail=f"Unknown field {path!r}.")
+            node[leaf] = None
+    return tree
+
+
+def _nested_model(model: type[BaseModel], name: str, path: str) -> type[BaseModel]:
+    if (field := model.model_fields.get(name)) is not None:
+        for candidate in (field.annotation, *get_args(field.annotation)):
+            if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+                return candidate
+    raise BadRequestException(detail=f"Unknown field {path!r}.")
+
+
+def _as_include(tree: FieldTree, schema: type[BaseModel]) -> dict[str, Any]:
+    """Translate a field tree to a pydantic `include` mapping."""
+    include: dict[str, Any] = {}
+    for name, subtree in tree.items():
+        if subtree is None:
+            include[name] = True
+            continue
+        nested = _as_include(subtree, _nested_model(schema, name, name))
+        annotation = schema.model_fields[name].annotation
+        include[name] = {"__all__": nested} if getattr(annotation, "__origin__", None) is list else nested
+    return include
+
+
+@dataclass(frozen=True)
+class ProductFieldset:
+    include: frozenset[str]
+    fields: FieldTree | None = None
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.fields is not None or self.include != frozenset(RELATIONSHIP_LOADERS)
+
+    def loader_options(self) -> list:
+        """Loader options that load only the included relationships."""
+        return [
+            loader(getattr(Product, name)) if name in self.include else noload(getattr(Product, name))
+            for name, loader in RELATIONSHIP_LOADERS.items()
+        ]
+
+    def item_include(self) -> dict[str, Any]:
+        """The pydantic `include` mapping for a single product."""
+        if self.fields is not None:
+            return _as_include(self.fields, ProductResponse)
+        excluded = set(RELATIONSHIP_LOADERS) - self.include
+        return {name: True for name in ProductResponse.model_fields if name not in excluded}
+
+    def render(self, data: BaseModel, *, page: bool = False) -> Response:
+        """Serialize a product (or a page of products) with only the requested fields."""
+        include: dict[str, Any] = self.item_include()
+        if page:
+            include = {name: True for name in type(data).model_fields} | {"items": {"__all__": include}}
+        return Response(content=data.model_dump_json(include=include), media_type="application/json")
+
+
+def provide_product_fieldset(
+    include: str | None = Query(
+        default=None,
+        description=f"Comma-separated relationships to load: {', '.join(RELATIONSHIP_LOADERS)}. Defaults to all.",
+    ),
+    fields: str | None = Query(
+        default=None,
+        description="Comma-separated fields to return. Use dots for nested fields, e.g. `name,slug,swatch.hex_color`.",
+    ),
+) -> ProductFieldset:
+    tree = parse_fields(fields, ProductResponse) if fields is not None else None
+
+    if include is None:
+        # Load what the requested fields need, or everything when no fields are given.
+        relationships = set(RELATIONSHIP_LOADERS) if tree is None else set()
+    else:
+        relationships = {name.strip() for name in include.split(",") if name.strip()}
+        if unknown := relationships - set(RELATIONSHIP_LOADERS):
+            raise BadRequestException(
+                detail=f"Cannot include {', '.join(sorted(unknown))}. Choose from {', '.join(RELATIONSHIP_LOADERS)}."
+            )
+    if tree is not None:
+        relationships |= set(tree) & set(RELATIONSHIP_LOADERS)
+
+    return ProductFieldset(include=frozenset(relationships), fields=tree)
+
+
+ProductFieldsetParam = Annotated[ProductFieldset, Depends(provide_product_fieldset)]
@@ -2,13 +2,15 @@ from collections.abc import Hashable
 from typing import TYPE_CHECKING
 
 from advanced_alchemy.utils.text import slugify
+from core.database import has_pg_trgm
 from core.models import Entity, WithFullTimeAuditMixin, WithUniqueSlugMixin
 from domain.associations import (
     product_analogous_association,
     product_tag_association,
 )
 from domain.enums import ColorRangeEnum, ProductTypeEnum
-from sqlalchemy import ARRAY, UUID, ColumnElement, Enum, ForeignKey
+from sqlalchemy import UUID, ColumnElement, Computed, Enum, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
@@ -30,19 +32,35 @@ class Product(Entity, WithFullTimeAuditMixin, WithUniqueSlugMixin):
     color_range: Mapped[list["ColorRangeEnum"]] = mapped_column(ARRAY(Enum(ColorRangeEnum, inherit_schema=True)))
     product_type: Mapped[list["ProductTypeEnum"]] = mapped_column(ARRAY(Enum(ProductTypeEnum, inherit_schema=True)))
 
+    # Digest of the product as last imported, children included; see `domain.importer.rows.content_hash`.
+    content_hash: Mapped[str | None] = mapped_column(String(32), nullable=True)
+
+    # Full-text document for `/api/search`, maintained by Postgres. The 'simple' configuration
+    # avoids stemming, which does more harm than good on paint names.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(iscc_nbs_category, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
     # Relationships
     product_line: Mapped["ProductLine"] = relationship(back_populates="products")
-    swatch: Mapped["ProductSwatch"] = relationship(back_populates="product", cascade="all, delete-orphan")
+    swatch: Mapped["ProductSwatch"] = relationship(
+        back_populates="product", cascade="all, delete-orphan", lazy="joined"
+    )
     variants: Mapped[list["ProductVariant"]] = relationship(
-        back_populates="product", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="product", cascade="all, delete-orphan", lazy="selectin", order_by="ProductVariant.id"
     )
 
     # Many-to-many relationships
     tags: Mapped[list["Tag"]] = relationship(
-        secondary=product_tag_association, back_populates="products", lazy="selectin"
+        secondary=product_tag_association, back_populates="products", lazy="selectin", order_by="Tag.name"
     )
     analogous: Mapped[list["Analogous"]] = relationship(
-        secondary=product_analogous_association, back_populates="products", lazy="selectin"
+        secondary=product_analogous_association, back_populates="products", lazy="selectin", order_by="Analogous.name"
     )
 
     @classmethod
@@ -58,3 +76,33 @@ class Product(Entity, WithFullTimeAuditMixin, WithUniqueSlugMixin):
     ) -> ColumnElement[bool]:
         """SQL filter for finding existing records."""
         return cls.slug == slugify(name)
+
+
+# Keyset pagination seeks on (name, id); see `domain.filters.KeysetPagination`. Partial, like the
+# service's base statement: soft-deleted rows never take part in listings.
+Index("ix_products_active_name_id", Product.name, Product.id, postgresql_where=Product.is_deleted.is_(False))
+
+# Relationship loads and the catalog triggers look products up by product line, deleted or not.
+Index("ix_products_product_line_id", Product.product_line_id)
+
+# Sync queries read rows changed since a timestamp, deleted ones included.
+Index("ix_products_updated_at", Product.updated_at, Product.id)
+
+# Category browsing: `&&` / `@>` on the enum arrays; see `domain.filters.ArrayFilter`.
+Index("ix_products_color_range", Product.color_range, postgresql_using="gin")
+Index("ix_products_product_type", Product.product_type, postgresql_using="gin")
+
+# Search: full-text on the document, trigrams for typo-tolerant and `ILIKE '%...%'` name matching.
+Index("ix_products_search_vector", Product.search_vector, postgresql_using="gin")
+Index(
+    "ix_products_name_trgm",
+    Product.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+).ddl_if(callable_=has_pg_trgm)
+Index(
+    "ix_products_iscc_nbs_category_trgm",
+    Product.iscc_nbs_category,
+    postgresql_using="gin",
+    postgresql_ops={"iscc_nbs_category": "gin_trgm_ops"},
+).ddl_if(callable_=has_pg_trgm)
@@ -0,0 +1,258 @@
+"""Render product responses as JSON inside Postgres.
+
+With `?render=database`, product endpoints skip ORM hydration and pydantic
+validation: a single statement builds each product's document with
+`json_build_object` / `json_agg`, nested swatch, variants, tags and
+analogous colors included, and the documents are joined into the response
+body without being parsed.
+
+Documents follow the field order of the response schemas and reproduce
+their serialization: timestamps as `datetime.isoformat(" ")`, floats as
+Python prints them, enums by value and the swatch colours as CSS strings.
+"""
+
+import json
+from datetime import datetime
+from enum import Enum as PyEnum
+from typing import Any
+
+from domain.analogous.models import Analogous
+from domain.analogous.schemas import AnalogousResponse
+from domain.associations import product_analogous_association, product_tag_association
+from domain.filters import KeysetPagination, encode_cursor
+from domain.pagination import CountStrategy, filtered_statement, resolve_total
+from domain.product_swatch.models import ProductSwatch
+from domain.product_swatch.schemas import ProductSwatchResponse
+from domain.product_variant.models import ProductVariant
+from domain.product_variant.schemas import ProductVariantResponse
+from domain.tag.models import Tag
+from domain.tag.schemas import TagResponse
+from fastapi import Depends, Query, Response
+from pydantic import BaseModel
+from sqlalchemy import JSON, Enum, String, Text, case, cast, func, literal, literal_column, null, select
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import Annotated
+
+from .fieldsets import ProductFieldset
+from .models import Product
+from .schemas import ProductResponse
+
+
+class Renderer(PyEnum):
+    """Where product responses are serialized."""
+
+    python = "python"
+    database = "database"
+
+
+def provide_renderer(
+    render: Renderer = Query(
+        default=Renderer.python,
+        description="`database` builds the JSON in Postgres instead of in the API process.",
+    ),
+) -> Renderer:
+    return render
+
+
+RendererParam = Annotated[Renderer, Depends(provide_renderer)]
+
+
+EMPTY_ARRAY = literal_column("'[]'::json")
+
+
+def isoformat(value):
+    """`datetime.isoformat(" ")` of a UTC timestamp; microseconds are left out when zero."""
+    utc = func.timezone("UTC", value)
+    microseconds = func.to_char(utc, ".US", type_=String)
+    return (
+        func.to_char(utc, "YYYY-MM-DD HH24:MI:SS", type_=String)
+        + case((microseconds == ".000000", ""), else_=microseconds)
+        + "+00:00"
+    )
+
+
+def float_text(value):
+    """`str(float)`: Postgres prints integral floats without the trailing `.0` Python keeps."""
+    text = cast(value, Text)
+    return case(((value == func.trunc(value)) & (func.abs(value) < 1e16), text + ".0"), else_=text)
+
+
+def css_function(name: str, array):
+    """`name(a, b, c)` from a float array, as the swatch response formats its colours."""
+    items = func.unnest(array).table_valued("value", with_ordinality="position").render_derived()
+    joined = (
+        select(func.string_agg(float_text(items.c.value), aggregate_order_by(literal(", "), items.c.position)))
+        .select_from(items)
+        .scalar_subquery()
+    )
+    return literal(f"{name}(") + joined + ")"
+
+
+def enum_value(column, enum_class: type[PyEnum]):
+    """Postgres stores enum member names; responses use their values."""
+    if all(member.name == member.value for member in enum_class):
+        return column
+    return case({member.name: member.value for member in enum_class}, value=cast(column, Text))
+
+
+def enum_array(column, enum_class: type[PyEnum]):
+    """An array of enum members as a JSON array of their values, in order."""
+    if all(member.name == member.value for member in enum_class):
+        return column
+    items = func.unnest(column).table_valued("value", with_ordinality="position").render_derived()
+    values = (
+        select(func.json_agg(aggregate_order_by(enum_value(items.c.value, enum_class), items.c.position)))
+        .select_from(items)
+        .scalar_subquery()
+    )
+    # json_agg of no rows is NULL; an empty array stays one.
+    return case((column.is_(None), null()), else_=func.coalesce(values, EMPTY_ARRAY))
+
+
+def column_value(column):
+    """JSON value of a mapped column, serialized the way the response schemas do."""
+    column_type = column.type
+    if isinstance(column_type, Enum) and column_type.enum_class is not None:
+        return enum_value(column, column_type.enum_class)
+    if isinstance(column_type, ARRAY) and isinstance(column_type.item_type, Enum):
+        return enum_array(column, column_type.item_type.enum_class)
+    if column_type.python_type is datetime:
+        return isoformat(column)
+    if column_type.python_type is float:
+        # Keep the text form Python would print; a `json` value is emitted verbatim.
+        return cast(float_text(column), JSON)
+    return column
+
+
+def json_object(schema: type[BaseModel], model: Any, overrides: dict[str, Any] | None = None):
+    """`json_build_object` with the fields of `schema`, in order, read from `model`'s columns."""
+    overrides = overrides or {}
+    columns = model.__table__.c
+    arguments = []
+    for name in schema.model_fields:
+        if name in overrides:
+            value = overrides[name]
+        elif name in columns:
+            value = column_value(getattr(model, name))
+        else:
+            value = null()
+        if value is not None:
+            arguments += [literal(name), value]
+    return func.json_build_object(*arguments)
+
+
+def _swatch():
+    document = json_object(
+        ProductSwatchResponse,
+        ProductSwatch,
+        {
+            "rgb_color": css_function("rgb", ProductSwatch.rgb_color),
+            "oklch_color": css_function("oklch", ProductSwatch.oklch_color),
+            "gradient_start": css_function("oklch", ProductSwatch.gradient_start),
+            "gradient_end": css_function("oklch", ProductSwatch.gradient_end),
+        },
+    )
+    return select(document).where(ProductSwatch.product_id == Product.id).limit(1).scalar_subquery()
+
+
+def _variants():
+    document = json_agg(json_object(ProductVariantResponse, ProductVariant), ProductVariant.id)
+    return select(document).where(ProductVariant.product_id == Product.id).scalar_subquery()
+
+
+def _tags():
+    association = product_tag_association
+    document = json_agg(json_object(TagResponse, Tag), Tag.name)
+    return (
+        select(document)
+        .join(association, association.c.tag_id == Tag.id)
+        .where(association.c.product_id == Product.id)
+        .scalar_subquery()
+    )
+
+
+def _analogous():
+    association = product_analogous_association
+    document = json_agg(json_object(AnalogousResponse, Analogous), Analogous.name)
+    return (
+        select(document)
+        .join(association, association.c.analogous_id == Analogous.id)
+        .where(association.c.product_id == Product.id)
+        .scalar_subquery()
+    )
+
+
+def json_agg(document, order_by):
+    """`json_agg` that yields `[]` rather than NULL for no rows, like an empty relationship."""
+    return func.coalesce(func.json_agg(aggregate_order_by(document, order_by)), EMPTY_ARRAY)
+
+
+RELATIONSHIP_DOCUMENTS = {
+    "swatch": _swatch,
+    "variants": _variants,
+    "tags": _tags,
+    "analogous": _analogous,
+}
+
+
+def product_document(fieldset: ProductFieldset):
+    """A product's response document as text; relationships outside `fieldset.include` are left out."""
+    overrides = {
+        name: document() if name in fieldset.include else None for name, document in RELATIONSHIP_DOCUMENTS.items()
+    }
+    return cast(json_object(ProductResponse, Product, overrides), Text)
+
+
+def supports(fieldset: ProductFieldset) -> bool:
+    """Whether the database can render `fieldset`; `fields=` trimming is only done in Python."""
+    return fieldset.fields is None
+
+
+async def render_product(session: AsyncSession, product_id, fieldset: ProductFieldset) -> str | None:
+    statement = select(product_document(fieldset)).where(Product.id == product_id, Product.is_deleted.is_(False))
+    return (await session.execute(statement)).scalar_one_or_none()
+
+
+async def render_product_page(
+    service,
+    *filters: Any,
+    fieldset: ProductFieldset,
+    limit_offset,
+    count: CountStrategy,
+    cursor: KeysetPagination | None = None,
+) -> Response:
+    """A page of products, serialized like `OffsetPage` or `CursorPage` of `ProductResponse`."""
+    statement = filtered_statement(service, *filters).with_only_columns(
+        product_document(fieldset).label("document"), Product.name, Product.id
+    )
+    # Both paths fetch one look-ahead row to know whether another page follows.
+    if cursor is not None:
+        statement = cursor.append_to_statement(statement, Product)
+        limit = cursor.limit
+    else:
+        limit, offset = limit_offset.limit, limit_offset.offset
+        statement = statement.order_by(Product.name, Product.id).limit(limit + 1).offset(offset)
+
+    rows = (await service.repository.session.execute(statement)).all()
+    items, has_more = rows[:limit], len(rows) > limit
+
+    if cursor is not None:
+        next_cursor = None
+        if has_more and items:
+            next_cursor = encode_cursor([getattr(items[-1], name) for name in cursor.fields])
+        meta = {"limit": limit, "next_cursor": next_cursor, "has_more": has_more}
+    else:
+        total, total_estimated = await resolve_total(
+            service, *filters, count=count, offset=offset, seen=len(items), has_more=has_more
+        )
+        meta = {
+            "limit": limit,
+            "offset": offset,
+            "total": total,
+            "total_estimated": total_estimated,
+            "has_more": has_more,
+        }
+
+    body = '{"items":[' + ",".join(row.document for row in items) + "]," + json.dumps(meta, separators=(",", ":"))[1:]
+    return Response(content=body, media_type="application/json")
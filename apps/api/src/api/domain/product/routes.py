@@ -1,18 +1,29 @@
 from uuid import UUID
 
 from advanced_alchemy.filters import SearchFilter
-from advanced_alchemy.service import OffsetPagination
-from advanced_alchemy.utils.text import slugify
+from domain.analogous.models import Analogous
+from domain.batch_get import BatchGetIds, batch_get
 from domain.dependencies import Services
-from domain.filters import PaginatedResponse
+from domain.filters import ArrayFilter, CursorPaginatedResponse, PaginatedResponse
 from domain.helpers import as_dict
-from fastapi import APIRouter, HTTPException, Query
-from starlette.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_404_NOT_FOUND
+from domain.pagination import CountStrategyParam, paginate
+from domain.tag.models import Tag
+from domain.tag.resolver import TagResolver
+from fastapi import APIRouter, Body, HTTPException, Query, Response
+from schemas.base import BatchGetResponse, CursorPage, OffsetPage
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_404_NOT_FOUND
 from typing_extensions import Annotated
 
+from . import rendering
+from .batch import MAX_BATCH_SIZE, create_product_batch
+from .facets import product_facets
+from .fieldsets import ProductFieldsetParam
 from .models import Product
+from .rendering import Renderer, RendererParam
 from .schemas import (
+    ProductBatchResponse,
     ProductCreate,
+    ProductFacetsResponse,
     ProductFilters,
     ProductResponse,
     ProductUpdate,
@@ -26,6 +37,28 @@ from .schemas import (
 product_router = APIRouter(tags=["Product"])
 
 
+def _product_filters(filter_query: ProductFilters) -> list:
+    """Translate the query-string filters of the product list into repository filters."""
+    filters = []
+    if filter_query.id:
+        filters.append(Product.id == filter_query.id)
+    if filter_query.name:
+        filters.append(SearchFilter("name", filter_query.name, ignore_case=True))
+    if filter_query.slug:
+        filters.append(SearchFilter("slug", filter_query.slug, ignore_case=True))
+    if filter_query.iscc_nbs_category:
+        filters.append(SearchFilter("iscc_nbs_category", filter_query.iscc_nbs_category, ignore_case=True))
+    if filter_query.color_range:
+        filters.append(ArrayFilter("color_range", filter_query.color_range, filter_query.category_match))
+    if filter_query.product_type:
+        filters.append(ArrayFilter("product_type", filter_query.product_type, filter_query.category_match))
+    if filter_query.tag:
+        filters.append(Product.tags.any(name=filter_query.tag))
+    if filter_query.analogous:
+        filters.append(Product.analogous.any(name=filter_query.analogous))
+    return filters
+
+
 @product_router.post("/products", response_model=ProductResponse, status_code=HTTP_201_CREATED)
 async def create_product(
     container: Services,
@@ -36,13 +69,6 @@ async def create_product(
     model = as_dict(data)
     product = await container.provide_products.to_model(model)
 
-    tags: list[str] = []
-    analogous_tags: list[str] = []
-
-    if isinstance(data, dict):
-        tags = data.pop("tags", [])
-        analogous_tags = data.pop("analogous", [])
-
     # Add relationships
     if swatch := model.get("swatch", None) is None:
         raise HTTPException(
@@ -55,20 +81,17 @@ async def create_product(
             detail="Variants are required to create a product.",
         )
 
-    if tags:
-        product_tags = []
-        for tag in tags:
-            tag_model = await container.provide_tags.get_or_upsert(name=tag, slug=slugify(tag))
-            product_tags.append(tag_model)
-        product.tags.extend(product_tags)
-
-    if analogous_tags:
-        product_analogous_tags = []
-        for tag in product_analogous_tags:
-            tag_model = await container.provide_analogous.get_or_upsert(name=tag, slug=slugify(tag))
-            product_analogous_tags.append(tag_model)
+    # All of the product's tags are resolved with at most two statements, then loaded with one.
+    session = container.provide_products.repository.session
+    if data.tags:
+        tag_ids = await TagResolver(Tag).resolve(session, data.tags)
+        product.tags.extend(await container.provide_tags.list(Tag.id.in_(set(tag_ids.values()))))
 
-        product.analogous.extend(product_analogous_tags)
+    if data.analogous:
+        analogous_ids = await TagResolver(Analogous).resolve(session, data.analogous)
+        product.analogous.extend(
+            await container.provide_analogous.list(Analogous.id.in_(set(analogous_ids.values())))
+        )
 
     swatch = as_dict(swatch)
 
@@ -88,45 +111,92 @@ async def create_product(
     return container.provide_products.to_schema(product)
 
 
+@product_router.post("/products:batch", response_model=ProductBatchResponse, status_code=HTTP_200_OK)
+async def create_products_batch(
+    container: Services,
+    items: Annotated[list[ProductCreate], Body(min_length=1, max_length=MAX_BATCH_SIZE)],
+):
+    """Create many products, with their swatches, variants and tags, in one transaction"""
+    return await create_product_batch(container.provide_products, items)
+
+
+@product_router.get("/products/facets", response_model=ProductFacetsResponse)
+async def get_product_facets(container: Services, filter_query: Annotated[ProductFilters, Query()]):
+    """Count products per color range, product type, vendor, product line, tag, opacity and viscosity"""
+    return await product_facets(container.provide_products, *_product_filters(filter_query))
+
+
+@product_router.get("/products:batchGet", response_model=BatchGetResponse[ProductResponse])
+async def batch_get_products(ids: BatchGetIds, container: Services, fieldset: ProductFieldsetParam):
+    """Get many products by ID, e.g. a saved list or a comparison"""
+    response = await batch_get(
+        container.provide_products,
+        ids,
+        schema_type=ProductResponse,
+        namespace=f"products:{','.join(sorted(fieldset.include))}",
+        relationships=fieldset.include,
+        load=fieldset.loader_options(),
+    )
+    if fieldset.is_sparse:
+        return fieldset.render(response, page=True)
+    return response
+
+
 @product_router.get("/products/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: UUID, container: Services):
+async def get_product(product_id: UUID, container: Services, fieldset: ProductFieldsetParam, render: RendererParam):
     """Get a product by ID"""
-    product = await container.provide_products.get(product_id)
+    if render is Renderer.database and rendering.supports(fieldset):
+        document = await rendering.render_product(container.session, product_id, fieldset)
+        if document is None:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=f"Product with ID {product_id} not found")
+        return Response(content=document, media_type="application/json")
+
+    product = await container.provide_products.get(product_id, load=fieldset.loader_options())
+    if fieldset.is_sparse:
+        return fieldset.render(ProductResponse.model_validate(product))
     return container.provide_products.to_schema(product)
 
 
-@product_router.get("/products", response_model=OffsetPagination[ProductResponse])
+@product_router.get("/products", response_model=OffsetPage[ProductResponse] | CursorPage[ProductResponse])
 async def list_products(
     container: Services,
     filter_query: Annotated[ProductFilters, Query()],
     limit_offset: PaginatedResponse,
+    cursor: CursorPaginatedResponse,
+    count: CountStrategyParam,
+    fieldset: ProductFieldsetParam,
+    render: RendererParam,
 ):
     """List products with filtering"""
+    filters = _product_filters(filter_query)
+
+    if render is Renderer.database and rendering.supports(fieldset):
+        return await rendering.render_product_page(
+            container.provide_products,
+            *filters,
+            fieldset=fieldset,
+            limit_offset=limit_offset,
+            count=count,
+            cursor=cursor,
+        )
 
-    filters = []
-    if filter_query.id:
-        filters.append(Product.id == filter_query.id)
-    if filter_query.name:
-        filters.append(SearchFilter("name", filter_query.name, ignore_case=True))
-    if filter_query.slug:
-        filters.append(SearchFilter("slug", filter_query.slug, ignore_case=True))
-    if filter_query.iscc_nbs_category:
-        filters.append(SearchFilter("iscc_nbs_category", filter_query.iscc_nbs_category, ignore_case=True))
-    if filter_query.color_range:
-        filters.append(SearchFilter("color_range", filter_query.color_range.value, ignore_case=True))
-    if filter_query.product_type:
-        filters.append(SearchFilter("product_type", filter_query.product_type.value, ignore_case=True))
-    if filter_query.tag:
-        filters.append(Product.tags.any(name=filter_query.tag))
-    if filter_query.analogous:
-        filters.append(Product.analogous.any(name=filter_query.analogous))
+    if cursor is not None:
+        results = await container.provide_products.list(*filters, cursor, load=fieldset.loader_options())
+        page = cursor.to_page(results, schema_type=ProductResponse)
+    else:
+        page = await paginate(
+            container.provide_products,
+            *filters,
+            limit_offset=limit_offset,
+            count=count,
+            schema_type=ProductResponse,
+            order_by=Product.name.asc(),
+            load=fieldset.loader_options(),
+        )
 
-    results, total = await container.provide_products.list_and_count(
-        *filters,
-        limit_offset=limit_offset,
-        order_by=Product.name.asc(),
-    )
-    return container.provide_products.to_schema(results, total, filters=[limit_offset])
+    if fieldset.is_sparse:
+        return fieldset.render(page, page=True)
+    return page
 
 
 @product_router.patch("/products/{product_id}", response_model=ProductResponse)
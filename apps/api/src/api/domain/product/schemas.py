@@ -1,21 +1,21 @@
-from typing import TYPE_CHECKING, Annotated
+from enum import Enum
+from typing import Annotated
 from uuid import UUID
 
+from domain.analogous.schemas import AnalogousResponse
 from domain.enums import ColorRangeEnum, ProductTypeEnum
-from pydantic import BaseModel, Field
+from domain.filters import ArrayMatch
+from domain.helpers import split_comma_separated
+from domain.product_swatch.schemas import ProductSwatchCreate, ProductSwatchResponse
+from domain.product_variant.schemas import ProductVariantCreate, ProductVariantResponse
+from domain.tag.schemas import TagResponse
+from pydantic import BaseModel, Field, field_validator
 from schemas.mixins import (
     SoftDeletionSchema,
     TimestampSchema,
 )
 
 
-if TYPE_CHECKING:
-    from domain.analogous.schemas import AnalogousResponse
-    from domain.product_swatch.schemas import ProductSwatchCreate, ProductSwatchResponse
-    from domain.product_variant.schemas import ProductVariantCreate, ProductVariantResponse
-    from domain.tag.schemas import TagResponse
-
-
 class ProductBase(BaseModel):
     name: Annotated[str, Field(description="Product name")]
     iscc_nbs_category: Annotated[
@@ -76,20 +76,81 @@ class ProductResponse(ProductBase, TimestampSchema, SoftDeletionSchema):
         str, Field(description="Unique slug for the product", examples=["nighthaunt-gloom", "screaming-skull"])
     ]
     product_line_id: Annotated[UUID, Field(description="ID of the product line")]
-    swatch: Annotated["ProductSwatchResponse", Field(description="Product swatch information")]
-    variants: Annotated[list["ProductVariantResponse"], Field(description="Product variants")]
+    swatch: Annotated["ProductSwatchResponse | None", Field(description="Product swatch information", default=None)]
+    variants: Annotated[list["ProductVariantResponse"], Field(description="Product variants", default_factory=list)]
     tags: Annotated[list["TagResponse"], Field(description="Tags", default_factory=list)]
     analogous: Annotated[list["AnalogousResponse"], Field(description="Analogous colors", default_factory=list)]
 
 
+class BatchItemStatus(Enum):
+    created = "created"
+    invalid = "invalid"
+    conflict = "conflict"
+
+
+class ProductBatchResult(BaseModel):
+    index: Annotated[int, Field(description="Position of the item in the request")]
+    slug: Annotated[str, Field(description="Slug of the item")]
+    status: Annotated[
+        BatchItemStatus,
+        Field(
+            description="`invalid` items failed validation, `conflict` items have a slug in use",
+            default=BatchItemStatus.invalid,
+        ),
+    ]
+    id: Annotated[UUID | None, Field(description="ID of the created product", default=None)]
+    errors: Annotated[list[str], Field(description="Why the item was not created", default_factory=list)]
+
+
+class ProductBatchResponse(BaseModel):
+    created: Annotated[int, Field(description="Number of products created")]
+    results: Annotated[list[ProductBatchResult], Field(description="One result per item, in request order")]
+
+
 class ProductFilters(BaseModel):
     id: Annotated[UUID | None, Field(description="Filter by product ID", default=None)]
     name: Annotated[str | None, Field(description="Filter by name", default=None)]
     slug: Annotated[
         str | None, Field(description="Filter by slug", examples=["nighthaunt-gloom", "screaming-skull"], default=None)
     ]
-    product_type: Annotated[ProductTypeEnum | None, Field(description="Filter by product type", default=None)]
-    color_range: Annotated[ColorRangeEnum | None, Field(description="Filter by color range ID", default=None)]
+    product_type: Annotated[
+        list[ProductTypeEnum] | None,
+        Field(description="Filter by product types, comma-separated", examples=["Metallic,Wash"], default=None),
+    ]
+    color_range: Annotated[
+        list[ColorRangeEnum] | None,
+        Field(description="Filter by color ranges, comma-separated", examples=["Red,Orange"], default=None),
+    ]
+    category_match: Annotated[
+        ArrayMatch,
+        Field(
+            description="Whether products need `any` or `all` of the given product types and color ranges",
+            default=ArrayMatch.any,
+        ),
+    ]
     tag: Annotated[str | None, Field(description="Filter by tag", default=None)]
     analogous: Annotated[str | None, Field(description="Filter by analogous color tag", default=None)]
     iscc_nbs_category: Annotated[str | None, Field(description="Filter by ISCC NBS category", default=None)]
+
+    @field_validator("product_type", "color_range", mode="before")
+    @classmethod
+    def split_values(cls, value):
+        """Accept both `?color_range=Red,Orange` and `?color_range=Red&color_range=Orange`."""
+        return split_comma_separated(value)
+
+
+class FacetValue(BaseModel):
+    value: Annotated[str, Field(description="Value to filter by: an enum value or a slug")]
+    label: Annotated[str, Field(description="Display name of the value")]
+    count: Annotated[int, Field(description="Number of matching products with this value")]
+
+
+class ProductFacetsResponse(BaseModel):
+    total: Annotated[int, Field(description="Number of products matching the filters")]
+    color_range: Annotated[list[FacetValue], Field(default_factory=list)]
+    product_type: Annotated[list[FacetValue], Field(default_factory=list)]
+    vendor: Annotated[list[FacetValue], Field(default_factory=list)]
+    product_line: Annotated[list[FacetValue], Field(default_factory=list)]
+    tag: Annotated[list[FacetValue], Field(default_factory=list)]
+    opacity: Annotated[list[FacetValue], Field(default_factory=list)]
+    viscosity: Annotated[list[FacetValue], Field(default_factory=list)]
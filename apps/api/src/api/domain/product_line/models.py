@@ -5,7 +5,7 @@ from uuid import UUID
 from advanced_alchemy.utils.text import slugify
 from core.models import Entity, WithFullTimeAuditMixin, WithUniqueSlugMixin
 from domain.enums import ProductLineTypeEnum
-from sqlalchemy import ColumnElement, Enum, ForeignKey, String, Text
+from sqlalchemy import ColumnElement, Enum, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
@@ -53,3 +53,15 @@ class ProductLine(Entity, WithFullTimeAuditMixin, WithUniqueSlugMixin):
         if slug:
             return cls.slug == slug
         return cls.slug == slugify(name)
+
+
+# Offset listings sort on (name, id); soft-deleted rows are never listed.
+Index(
+    "ix_product_lines_active_name_id",
+    ProductLine.name,
+    ProductLine.id,
+    postgresql_where=ProductLine.is_deleted.is_(False),
+)
+# `vendor.product_lines` loads and the `vendor_id` filter, deleted rows included for the former.
+Index("ix_product_lines_vendor_id", ProductLine.vendor_id)
+Index("ix_product_lines_updated_at", ProductLine.updated_at, ProductLine.id)
@@ -1,10 +1,11 @@
 from uuid import UUID
 
 from advanced_alchemy.filters import SearchFilter
-from advanced_alchemy.service import OffsetPagination
 from domain.dependencies import Services
 from domain.filters import PaginatedResponse
+from domain.pagination import CountStrategyParam, paginate
 from fastapi import APIRouter, Query
+from schemas.base import OffsetPage
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT
 from typing_extensions import Annotated
 
@@ -43,11 +44,12 @@ async def get_product_line(
 
 
 @product_line_router.get(
-    "/product-lines", response_model=OffsetPagination[ProductLineResponse], status_code=HTTP_200_OK
+    "/product-lines", response_model=OffsetPage[ProductLineResponse], status_code=HTTP_200_OK
 )
 async def list_product_lines(
     filter_query: Annotated[ProductLineFilters, Query()],
     limit_offset: PaginatedResponse,
+    count: CountStrategyParam,
     container: Services,
 ):
     """List product lines with filtering"""
@@ -62,12 +64,13 @@ async def list_product_lines(
     if filter_query.vendor_id:
         filters.append(ProductLine.vendor_id == filter_query.vendor_id)
 
-    results, total = await container.provide_product_lines.list_and_count(*filters, limit_offset)
-
-    return container.provide_product_lines.to_schema(
-        results,
-        total=total,
-        filters=[limit_offset],
+    return await paginate(
+        container.provide_product_lines,
+        *filters,
+        limit_offset=limit_offset,
+        count=count,
+        schema_type=ProductLineResponse,
+        order_by=ProductLine.name.asc(),
     )
 
 
@@ -1,8 +1,8 @@
 from typing import TYPE_CHECKING
 
-from core.models import Entity
+from core.models import Entity, WithTimeAuditMixin
 from domain.enums import OverlayEnum
-from sqlalchemy import ARRAY, UUID, Enum, Float, ForeignKey, String
+from sqlalchemy import ARRAY, UUID, Enum, Float, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
@@ -10,7 +10,7 @@ if TYPE_CHECKING:
     from domain.product.models import Product
 
 
-class ProductSwatch(Entity):
+class ProductSwatch(Entity, WithTimeAuditMixin):
     __tablename__ = "product_swatches"
 
     # Relationships
@@ -23,3 +23,13 @@ class ProductSwatch(Entity):
     gradient_start: Mapped[list[float]] = mapped_column(ARRAY(Float))
     gradient_end: Mapped[list[float]] = mapped_column(ARRAY(Float))
     overlay: Mapped[str | None] = mapped_column(Enum(OverlayEnum), default=OverlayEnum.Unknown)
+
+    # Digest of the swatch as last imported; see `domain.importer.rows.content_hash`.
+    content_hash: Mapped[str | None] = mapped_column(String(32), default=None)
+
+
+# A product has one swatch (`Product.swatch` is scalar); this also backs the lookup by product.
+Index("uq_product_swatches_product_id", ProductSwatch.product_id, unique=True)
+
+# Sync reads swatches changed since a watermark; see `domain.sync`.
+Index("ix_product_swatches_updated_at", ProductSwatch.updated_at, ProductSwatch.id)
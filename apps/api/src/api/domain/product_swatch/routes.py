@@ -1,7 +1,9 @@
 from uuid import UUID
 
+from domain.batch_get import BatchGetIds, batch_get
 from domain.dependencies import Services
 from fastapi import APIRouter
+from schemas.base import BatchGetResponse
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT
 
 from .models import ProductSwatch
@@ -25,6 +27,19 @@ async def create_product_swatch(
     return container.provide_product_swatches.to_schema(product_swatch)
 
 
+@product_swatch_router.get(
+    "/product-swatch:batchGet", response_model=BatchGetResponse[ProductSwatchResponse], status_code=HTTP_200_OK
+)
+async def batch_get_product_swatches(
+    ids: BatchGetIds,
+    container: Services,
+):
+    """Get many product swatches by ID"""
+    return await batch_get(
+        container.provide_product_swatches, ids, schema_type=ProductSwatchResponse, namespace="product_swatches"
+    )
+
+
 @product_swatch_router.get(
     "/product-swatch/{product_swatch_id}", response_model=ProductSwatchResponse, status_code=HTTP_200_OK
 )
@@ -1,8 +1,9 @@
-from typing import Annotated
+from typing import Annotated, Any
 from uuid import UUID
 
 from domain.enums import OverlayEnum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+from utils.color.formatters import format_color
 
 
 class ProductSwatchBase(BaseModel):
@@ -45,6 +46,18 @@ class ProductSwatchResponse(BaseModel):
     gradient_end: Annotated[str, Field(description="Formatted OKLCH color for SVG gradient's ending stop color value")]
     overlay: Annotated[OverlayEnum | None, Field(description="Overlay effect", default=OverlayEnum.Unknown)]
 
+    @field_validator("rgb_color", mode="before")
+    @classmethod
+    def format_rgb(cls, value: Any) -> Any:
+        """Format the stored RGB channels as a CSS color when read from the model."""
+        return format_color(value, "rgb") if isinstance(value, list) else value
+
+    @field_validator("oklch_color", "gradient_start", "gradient_end", mode="before")
+    @classmethod
+    def format_oklch(cls, value: Any) -> Any:
+        """Format stored OKLCH coordinates as a CSS color when read from the model."""
+        return format_color(value, "oklch") if isinstance(value, list) else value
+
     class Config:
         from_attributes = True
         use_enum_values = True
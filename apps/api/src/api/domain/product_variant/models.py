@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING
 
 from core.models import Entity, WithFullTimeAuditMixin
 from domain.enums import ApplicationMethodEnum, OpacityEnum, PackagingTypeEnum, ViscosityEnum
-from sqlalchemy import UUID, Boolean, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy import UUID, Boolean, Enum, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.mutable import MutableList
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -47,3 +47,12 @@ class ProductVariant(Entity, WithFullTimeAuditMixin):
     opacity: Mapped[Enum | None] = mapped_column(Enum(OpacityEnum), default=OpacityEnum.Unknown)
     viscosity: Mapped[Enum | None] = mapped_column(Enum(ViscosityEnum), default=ViscosityEnum.Unknown)
     vendor_product_id: Mapped[str | None] = mapped_column(String(100), default=None)
+
+    # Digest of the variant as last imported; see `domain.importer.rows.content_hash`.
+    content_hash: Mapped[str | None] = mapped_column(String(32), default=None)
+
+
+# Variants are read per product, and per product and locale for localized prices. Not partial:
+# `Product.variants` loads soft-deleted variants too.
+Index("ix_product_variants_product_id_locale_id", ProductVariant.product_id, ProductVariant.locale_id)
+Index("ix_product_variants_updated_at", ProductVariant.updated_at, ProductVariant.id)
@@ -1,8 +1,10 @@
 from uuid import UUID
 
+from domain.batch_get import BatchGetIds, batch_get
 from domain.dependencies import Services
 from domain.helpers import as_dict
 from fastapi import APIRouter
+from schemas.base import BatchGetResponse
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
@@ -57,6 +59,21 @@ async def create_product_variant(
     return container.provide_product_variants.to_schema(product_variant)
 
 
+@product_variant_router.get(
+    "/product-variants:batchGet",
+    response_model=BatchGetResponse[ProductVariantResponse],
+    status_code=HTTP_200_OK,
+)
+async def batch_get_product_variants(
+    ids: BatchGetIds,
+    container: Services,
+):
+    """Get many product variants by ID"""
+    return await batch_get(
+        container.provide_product_variants, ids, schema_type=ProductVariantResponse, namespace="product_variants"
+    )
+
+
 @product_variant_router.get(
     "/product-variants/{product_variant_id}",
     response_model=ProductVariantResponse,
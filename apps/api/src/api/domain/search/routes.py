@@ -0,0 +1,35 @@
+from domain.dependencies import Services
+from exceptions import BadRequestException
+from fastapi import APIRouter, Query
+from starlette.status import HTTP_200_OK
+
+from .schemas import SearchResponse, SearchType
+
+
+search_router = APIRouter(tags=["Search"])
+
+
+@search_router.get("/search", response_model=SearchResponse, status_code=HTTP_200_OK)
+async def search(
+    container: Services,
+    q: str = Query(min_length=1, max_length=100, description="Text to look for in names"),
+    types: str | None = Query(
+        default=None,
+        description=f"Comma-separated types to search: {', '.join(t.value for t in SearchType)}. Defaults to all.",
+    ),
+    limit: int = Query(ge=1, default=10, le=50),
+):
+    """Search products, tags, vendors and analogous colors by name"""
+    selected = list(SearchType)
+    if types is not None:
+        names = {name.strip() for name in types.split(",") if name.strip()}
+        choices = [t.value for t in SearchType]
+        if unknown := names - set(choices):
+            raise BadRequestException(
+                detail=f"Cannot search {', '.join(sorted(unknown))}. Choose from {', '.join(choices)}."
+            )
+        selected = [t for t in SearchType if t.value in names]
+
+    query = q.strip()
+    items = await container.provide_search.search(query, selected, limit) if query and selected else []
+    return SearchResponse(query=query, items=items)
@@ -0,0 +1,30 @@
+from enum import Enum
+from typing import Annotated
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class SearchType(Enum):
+    """Kinds of records `/api/search` can return."""
+
+    product = "product"
+    tag = "tag"
+    vendor = "vendor"
+    analogous = "analogous"
+
+
+class SearchResult(BaseModel):
+    type: Annotated[SearchType, Field(description="Kind of record matched")]
+    id: Annotated[UUID, Field(description="Unique identifier of the record")]
+    name: Annotated[str, Field(description="Name of the record")]
+    slug: Annotated[str, Field(description="Unique identifier slug of the record")]
+    score: Annotated[float, Field(description="Relevance, from 0 to 1; higher is better")]
+
+    class Config:
+        from_attributes = True
+
+
+class SearchResponse(BaseModel):
+    query: Annotated[str, Field(description="The search query")]
+    items: Annotated[list[SearchResult], Field(description="Matches across all types, best first")]
@@ -0,0 +1,102 @@
+"""Name search across products, tags, vendors and analogous colors.
+
+Names are matched with `pg_trgm` when the extension is installed: the
+trigram GIN indexes answer both typo-tolerant similarity (`%>`) and
+substring (`ILIKE '%...%'`) matches. Products are also matched against
+their full-text `search_vector` with a prefix query, so `cad re` finds
+"Cadmium Red". Without `pg_trgm` the full-text match still uses its index
+and the other names fall back to plain substring matching.
+
+Every type contributes its best matches to a single `UNION ALL`, which is
+ordered by a score between 0 and 1.
+"""
+
+import re
+from collections.abc import Iterable
+
+from core.logger import get_logger
+from domain.analogous.models import Analogous
+from domain.product.models import Product
+from domain.tag.models import Tag
+from domain.vendor.models import Vendor
+from sqlalchemy import Float, Select, case, cast, func, literal, literal_column, or_, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .schemas import SearchResult, SearchType
+
+
+logger = get_logger(__name__)
+
+"""Normalization flag making `ts_rank` return `rank / (rank + 1)`, i.e. a value between 0 and 1."""
+TS_RANK_UNIT_RANGE = 32
+
+SEARCH_MODELS = {
+    SearchType.product: Product,
+    SearchType.tag: Tag,
+    SearchType.vendor: Vendor,
+    SearchType.analogous: Analogous,
+}
+
+_pg_trgm_installed: bool | None = None
+
+
+async def pg_trgm_installed(session: AsyncSession) -> bool:
+    """Whether `pg_trgm` is installed in the database, checked once per process."""
+    global _pg_trgm_installed
+    if _pg_trgm_installed is None:
+        result = await session.execute(text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"))
+        _pg_trgm_installed = bool(result.scalar())
+        if not _pg_trgm_installed:
+            logger.info("pg_trgm is not installed, name search falls back to substring matching")
+    return _pg_trgm_installed
+
+
+def prefix_tsquery(query: str) -> str | None:
+    """Turn free text into a `to_tsquery` expression matching every word as a prefix."""
+    terms = re.findall(r"\w+", query.lower())
+    return " & ".join(f"{term}:*" for term in terms) or None
+
+
+class SearchService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def search(self, query: str, types: Iterable[SearchType], limit: int) -> list[SearchResult]:
+        trigrams = await pg_trgm_installed(self.session)
+        selects = [self._select(type_, query, trigrams, limit) for type_ in types]
+
+        matches = union_all(*selects).subquery("matches")
+        statement = select(matches).order_by(matches.c.score.desc(), matches.c.name).limit(limit)
+        result = await self.session.execute(statement)
+        return [SearchResult.model_validate(row, from_attributes=True) for row in result]
+
+    def _select(self, type_: SearchType, query: str, trigrams: bool, limit: int) -> Select:
+        model = SEARCH_MODELS[type_]
+        conditions, scores = [], []
+
+        if trigrams:
+            conditions += [model.name.op("%>")(query), model.name.icontains(query, autoescape=True)]
+            scores += [func.similarity(model.name, query), func.word_similarity(query, model.name)]
+        else:
+            conditions.append(model.name.icontains(query, autoescape=True))
+            # How much of the name the query covers, halved unless the name starts with it.
+            coverage = cast(func.length(query), Float) / func.greatest(func.length(model.name), 1)
+            scores.append(case((model.name.istartswith(query, autoescape=True), coverage), else_=coverage / 2))
+
+        if model is Product and (tsquery := prefix_tsquery(query)) is not None:
+            ts_query = func.to_tsquery(literal_column("'simple'::regconfig"), tsquery)
+            conditions.append(Product.search_vector.op("@@")(ts_query))
+            scores.append(func.ts_rank(Product.search_vector, ts_query, TS_RANK_UNIT_RANGE))
+
+        score = (func.greatest(*scores) if len(scores) > 1 else scores[0]).label("score")
+        statement = select(
+            literal(type_.value).label("type"),
+            model.id.label("id"),
+            model.name.label("name"),
+            model.slug.label("slug"),
+            score,
+        ).where(or_(*conditions))
+        if hasattr(model, "is_deleted"):
+            statement = statement.where(model.is_deleted.is_(False))
+        # Each type only needs to contribute as many rows as can make the final cut.
+        return statement.order_by(score.desc()).limit(limit)
@@ -4,11 +4,14 @@ from injector import Module as ServiceProvider
 from sqlalchemy import select
 
 from .analogous.service import AnalogousService
+from .catalog.service import ProductCatalogService
 from .locale.service import LocaleService
 from .product.service import ProductService
 from .product_line.service import ProductLineService
 from .product_swatch.service import ProductSwatchService
 from .product_variant.service import ProductVariantService
+from .search.service import SearchService
+from .sync.service import SyncService
 from .tag.service import TagService
 from .user.service import UserService
 from .vendor.service import VendorService
@@ -24,6 +27,10 @@ class ServicesContainer(ServiceProvider):
 
         return AnalogousService(session=self.session, statement=select(model_type))
 
+    @cached_property
+    def provide_catalog(self):
+        return ProductCatalogService(session=self.session)
+
     @cached_property
     def provide_locales(self):
         return LocaleService(session=self.session)
@@ -55,6 +62,14 @@ class ServicesContainer(ServiceProvider):
 
         return ProductVariantService(session=self.session, statement=select(model).where(model.is_deleted.is_(False)))
 
+    @cached_property
+    def provide_search(self):
+        return SearchService(session=self.session)
+
+    @cached_property
+    def provide_sync(self):
+        return SyncService(session=self.session)
+
     @cached_property
     def provide_tags(self):
         return TagService(session=self.session)
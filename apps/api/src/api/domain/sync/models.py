@@ -0,0 +1,26 @@
+from datetime import datetime
+from uuid import UUID
+
+from advanced_alchemy.types import DateTimeUTC
+from core.models import Entity
+from sqlalchemy import Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import triggers  # noqa: F401 - registers the tombstone triggers with the metadata
+
+
+class SyncTombstone(Entity):
+    """A hard-deleted row, kept so that delta sync can tell clients to drop it.
+
+    Rows are written only by the triggers in `domain.sync.triggers`.
+    """
+
+    __tablename__ = "sync_tombstones"
+
+    entity: Mapped[str] = mapped_column(String(50))
+    entity_id: Mapped[UUID] = mapped_column()
+    deleted_at: Mapped[datetime] = mapped_column(DateTimeUTC(timezone=True))
+
+
+# Sync seeks on (deleted_at, id) like it does on (updated_at, id) for the synced tables.
+Index("ix_sync_tombstones_deleted_at", SyncTombstone.deleted_at, SyncTombstone.id)
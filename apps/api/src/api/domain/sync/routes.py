@@ -0,0 +1,21 @@
+from domain.dependencies import Services
+from fastapi import APIRouter, Query
+from starlette.status import HTTP_200_OK
+
+from .schemas import SyncResponse
+
+
+sync_router = APIRouter(tags=["Sync"])
+
+
+@sync_router.get("/sync", response_model=SyncResponse, status_code=HTTP_200_OK)
+async def sync(
+    container: Services,
+    since: str | None = Query(
+        default=None,
+        description="`next_cursor` of the previous sync. Leave out to download everything.",
+    ),
+    limit: int = Query(ge=1, default=200, le=1000, description="Most rows returned per type"),
+):
+    """Vendors, product lines, tags, products, swatches and variants changed or deleted since the cursor"""
+    return await container.provide_sync.changes(since, limit)
@@ -0,0 +1,64 @@
+from datetime import datetime
+from enum import Enum
+from typing import Annotated
+from uuid import UUID
+
+from domain.product.schemas import ProductRead
+from domain.product_line.schemas import ProductLineRead
+from domain.product_swatch.schemas import ProductSwatchRead
+from domain.product_variant.schemas import ProductVariantRead
+from domain.tag.schemas import TagRead
+from domain.vendor.schemas import VendorRead
+from pydantic import BaseModel, Field
+from schemas.mixins import TimestampSchema
+
+
+class SyncEntity(Enum):
+    """What delta sync returns, in the order it is returned."""
+
+    vendors = "vendors"
+    product_lines = "product_lines"
+    tags = "tags"
+    products = "products"
+    swatches = "swatches"
+    variants = "variants"
+
+
+class SyncProduct(ProductRead):
+    tag_ids: Annotated[list[UUID], Field(description="IDs of the product's tags", default_factory=list)]
+
+
+class SyncProductSwatch(ProductSwatchRead, TimestampSchema):
+    pass
+
+
+class SyncTag(TagRead, TimestampSchema):
+    pass
+
+
+class Tombstone(BaseModel):
+    entity: Annotated[SyncEntity, Field(description="Kind of the deleted row")]
+    id: Annotated[UUID, Field(description="ID of the deleted row")]
+    deleted_at: Annotated[datetime, Field(description="When the row was deleted")]
+
+    class Config:
+        from_attributes = True
+
+
+class SyncResponse(BaseModel):
+    """Rows created, updated or soft-deleted since the cursor, and rows deleted outright.
+
+    Soft-deleted rows come back with `is_deleted` set, as rows deleted outright do
+    in `deleted`; clients drop both. A type may come back empty while `has_more`
+    is set because another type filled its batch.
+    """
+
+    vendors: Annotated[list[VendorRead], Field(default_factory=list)]
+    product_lines: Annotated[list[ProductLineRead], Field(default_factory=list)]
+    tags: Annotated[list[SyncTag], Field(default_factory=list)]
+    products: Annotated[list[SyncProduct], Field(default_factory=list)]
+    swatches: Annotated[list[SyncProductSwatch], Field(default_factory=list)]
+    variants: Annotated[list[ProductVariantRead], Field(default_factory=list)]
+    deleted: Annotated[list[Tombstone], Field(default_factory=list)]
+    next_cursor: Annotated[str, Field(description="Pass as `since` to get what changes after this response")]
+    has_more: Annotated[bool, Field(description="Whether more changes are waiting; call again with `next_cursor`")]
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+from core.config import settings
+from domain.associations import product_tag_association
+from domain.filters import KeysetPagination, decode_cursor, encode_cursor
+from domain.product.models import Product
+from domain.product_line.models import ProductLine
+from domain.product_swatch.models import ProductSwatch
+from domain.product_variant.models import ProductVariant
+from domain.tag.models import Tag
+from domain.vendor.models import Vendor
+from exceptions import BadRequestException
+from sqlalchemy import UUID, Column, DateTime, Integer, String, func, select, table
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
+
+from .models import SyncTombstone
+from .schemas import SyncEntity, SyncProduct, SyncResponse
+
+
+"""Model read for each synced entity."""
+SYNC_MODELS = {
+    SyncEntity.vendors: Vendor,
+    SyncEntity.product_lines: ProductLine,
+    SyncEntity.tags: Tag,
+    SyncEntity.products: Product,
+    SyncEntity.swatches: ProductSwatch,
+    SyncEntity.variants: ProductVariant,
+}
+
+"""Sessions of the server, for the start of their transaction (NULL when idle)."""
+pg_stat_activity = table(
+    "pg_stat_activity",
+    Column("pid", Integer),
+    Column("datname", String),
+    Column("backend_type", String),
+    Column("xact_start", DateTime(timezone=True)),
+)
+
+"""Cursor positions, one (timestamp, id) pair per stream: each entity, then the tombstones."""
+STREAMS = [*(entity.value for entity in SYNC_MODELS), "deleted"]
+
+
+def decode_sync_cursor(cursor: str | None) -> dict[str, list[Any] | None]:
+    """Positions of a cursor produced by `encode_sync_cursor`; none at all for a first sync."""
+    if not cursor:
+        return dict.fromkeys(STREAMS)
+    try:
+        values = decode_cursor(cursor)
+    except ValueError as e:
+        raise BadRequestException(detail=str(e)) from e
+    if len(values) != 2 * len(STREAMS):
+        raise BadRequestException(detail="Invalid sync cursor.")
+    pairs = [values[i : i + 2] for i in range(0, len(values), 2)]
+    return {stream: pair if pair[0] is not None else None for stream, pair in zip(STREAMS, pairs, strict=True)}
+
+
+def encode_sync_cursor(positions: dict[str, list[Any] | None]) -> str:
+    return encode_cursor([value for stream in STREAMS for value in (positions[stream] or [None, None])])
+
+
+def _tag_ids():
+    association = product_tag_association
+    subquery = select(association.c.tag_id).where(association.c.product_id == Product.id).scalar_subquery()
+    return func.array(subquery, type_=ARRAY(UUID)).label("tag_ids")
+
+
+class SyncService:
+    """Changes since a watermark, read in (updated_at, id) order off the `ix_<table>_updated_at` indexes."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def changes(self, since: str | None, limit: int) -> SyncResponse:
+        positions = decode_sync_cursor(since)
+        horizon = await self._horizon()
+        changes: dict[str, list[Any]] = {}
+        has_more = False
+
+        for entity, model in SYNC_MODELS.items():
+            statement = select(model).options(noload("*"))
+            if model is Product:
+                statement = statement.add_columns(_tag_ids())
+            rows, more = await self._seek(statement, model, "updated_at", positions[entity.value], horizon, limit)
+            if rows:
+                last = rows[-1][0]
+                positions[entity.value] = [last.updated_at, last.id]
+            if model is Product:
+                changes[entity.value] = [
+                    SyncProduct.model_validate(product).model_copy(update={"tag_ids": tag_ids or []})
+                    for product, tag_ids in rows
+                ]
+            else:
+                changes[entity.value] = [row[0] for row in rows]
+            has_more = has_more or more
+
+        tombstones, more = await self._seek(
+            select(SyncTombstone), SyncTombstone, "deleted_at", positions["deleted"], horizon, limit
+        )
+        if tombstones:
+            last = tombstones[-1][0]
+            positions["deleted"] = [last.deleted_at, last.id]
+
+        return SyncResponse.model_validate(
+            {
+                **changes,
+                "deleted": [
+                    {"entity": tombstone.entity, "id": tombstone.entity_id, "deleted_at": tombstone.deleted_at}
+                    for (tombstone,) in tombstones
+                ],
+                "next_cursor": encode_sync_cursor(positions),
+                "has_more": has_more or more,
+            },
+            from_attributes=True,
+        )
+
+    async def _horizon(self) -> datetime:
+        """The time before which every row has committed, or never will.
+
+        Writers stamp rows with their transaction's start time or later
+        (`now()`, `statement_timestamp()`), and may commit long after it: an
+        import or a catalog refresh can run for minutes. Rows stamped before
+        the oldest transaction still in flight began are all committed, so
+        that rows committed later are never behind a watermark clients have
+        moved past. Other sessions' transactions are only visible to the same
+        role (or one with `pg_read_all_stats`).
+
+        Only client sessions of this database can write its rows; autovacuum,
+        WAL senders and other databases are left out. Transactions older than
+        `SYNC_MAX_TRANSACTION_SECONDS` (a session left idle in a transaction)
+        are left out too, so the horizon is never further behind than that.
+        """
+        activity = pg_stat_activity.c
+        max_age = timedelta(seconds=settings.api.SYNC_MAX_TRANSACTION_SECONDS)
+        statement = select(func.least(func.statement_timestamp(), func.min(activity.xact_start))).where(
+            activity.xact_start.is_not(None),
+            activity.xact_start > func.statement_timestamp() - max_age,
+            activity.pid != func.pg_backend_pid(),
+            activity.datname == func.current_database(),
+            activity.backend_type == "client backend",
+        )
+        oldest = (await self.session.execute(statement)).scalar_one()
+        return oldest - timedelta(seconds=settings.api.SYNC_CLOCK_SKEW_SECONDS)
+
+    async def _seek(self, statement, model, timestamp: str, after: list[Any] | None, horizon: datetime, limit: int):
+        """Up to `limit` rows past `after` in (timestamp, id) order, and whether more follow."""
+        statement = statement.where(getattr(model, timestamp) < horizon)
+        statement = KeysetPagination(limit=limit, after=after, fields=(timestamp, "id")).append_to_statement(
+            statement, model
+        )
+        rows = (await self.session.execute(statement)).all()
+        return rows[:limit], len(rows) > limit
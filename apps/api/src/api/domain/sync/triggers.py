@@ -0,0 +1,76 @@
+"""Triggers recording what delta sync cannot see in the synced tables themselves.
+
+Soft deletes show up as changed rows (`is_deleted` set, `updated_at` bumped),
+but hard-deleted rows are gone: `sync_record_deletes()` writes a tombstone to
+`sync_tombstones` for each of them. Adding or removing a product's tags only
+touches `product_tag_association`, which has no timestamp, so
+`sync_touch_products()` bumps `updated_at` of the products involved.
+"""
+
+from advanced_alchemy.base import orm_registry
+from sqlalchemy import DDL, event
+
+
+# TG_ARGV[0] is the entity name tombstones are recorded under.
+RECORD_DELETES_FUNCTION = """
+CREATE OR REPLACE FUNCTION sync_record_deletes() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO sync_tombstones (id, entity, entity_id, deleted_at)
+  SELECT gen_random_uuid(), TG_ARGV[0], old_rows.id, statement_timestamp() FROM old_rows;
+  RETURN NULL;
+END;
+$$;
+"""
+
+TOUCH_PRODUCTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION sync_touch_products() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    UPDATE products SET updated_at = statement_timestamp() WHERE id IN (SELECT product_id FROM new_rows);
+  ELSE
+    UPDATE products SET updated_at = statement_timestamp() WHERE id IN (SELECT product_id FROM old_rows);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+"""
+
+"""Synced tables and the entity name their tombstones are recorded under."""
+TOMBSTONE_SOURCES = {
+    "products": "products",
+    "product_lines": "product_lines",
+    "product_swatches": "swatches",
+    "product_variants": "variants",
+    "vendors": "vendors",
+    "tags": "tags",
+}
+
+
+def trigger_statements() -> list[str]:
+    """Statements (re)creating the sync triggers."""
+    statements = []
+    for table, entity in TOMBSTONE_SOURCES.items():
+        name = f"sync_{table}_delete"
+        statements += [
+            f"DROP TRIGGER IF EXISTS {name} ON {table}",
+            f"CREATE TRIGGER {name} AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION sync_record_deletes('{entity}')",
+        ]
+    for operation, referencing in (("INSERT", "NEW TABLE AS new_rows"), ("DELETE", "OLD TABLE AS old_rows")):
+        name = f"sync_product_tag_association_{operation.lower()}"
+        statements += [
+            f"DROP TRIGGER IF EXISTS {name} ON product_tag_association",
+            f"CREATE TRIGGER {name} AFTER {operation} ON product_tag_association REFERENCING {referencing} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION sync_touch_products()",
+        ]
+    return statements
+
+
+def ddl_statements() -> list[str]:
+    """Statements (re)creating the sync functions and triggers, as `create_all` and migrations run them."""
+    return [RECORD_DELETES_FUNCTION, TOUCH_PRODUCTS_FUNCTION, *trigger_statements()]
+
+
+for statement in ddl_statements():
+    ddl = DDL(statement.replace("%", "%%")).execute_if(dialect="postgresql")
+    event.listen(orm_registry.metadata, "after_create", ddl)
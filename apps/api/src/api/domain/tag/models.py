@@ -2,9 +2,10 @@ from collections.abc import Hashable
 from typing import TYPE_CHECKING
 
 from advanced_alchemy.utils.text import slugify
-from core.models import Entity, WithUniqueSlugMixin
+from core.database import has_pg_trgm
+from core.models import Entity, WithTimeAuditMixin, WithUniqueSlugMixin
 from domain.associations import product_tag_association
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.elements import ColumnElement
 
@@ -13,7 +14,7 @@ if TYPE_CHECKING:
     from domain.product.models import Product
 
 
-class Tag(Entity, WithUniqueSlugMixin):
+class Tag(Entity, WithTimeAuditMixin, WithUniqueSlugMixin):
     __tablename__ = "tags"
 
     name: Mapped[str] = mapped_column(String(100), nullable=False, unique=True, index=True)
@@ -37,3 +38,16 @@ class Tag(Entity, WithUniqueSlugMixin):
     ) -> ColumnElement[bool]:
         """SQL filter for finding existing records."""
         return cls.slug == slugify(name)
+
+
+# Keyset pagination seeks on (name, id); see `domain.filters.KeysetPagination`.
+Index("ix_tags_name_id", Tag.name, Tag.id)
+Index("ix_tags_updated_at", Tag.updated_at, Tag.id)
+
+# Trigrams back `/api/search` as well as `ILIKE '%...%'` filters on the name.
+Index(
+    "ix_tags_name_trgm",
+    Tag.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+).ddl_if(callable_=has_pg_trgm)
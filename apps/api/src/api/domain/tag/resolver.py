@@ -0,0 +1,60 @@
+"""Batched resolution of tag names to IDs.
+
+Tags and analogous colors are identified by the slug of their name (see
+`Tag.unique_hash`). Rather than one `get_or_upsert` per name, a resolver
+takes every name of a batch at once: one `INSERT ... ON CONFLICT DO NOTHING
+RETURNING` creates the missing rows and returns their IDs, and one `SELECT`
+finds the rows that already existed. IDs are kept by slug for the resolver's
+lifetime, so a name seen before costs no statement at all.
+
+A resolver should live no longer than the unit of work it serves (a request,
+an import): a tag deleted meanwhile would otherwise still be resolved.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+from uuid import UUID
+
+from advanced_alchemy.utils.text import slugify
+from domain.pagination import TRACK_WRITES, mark_written
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid_utils.compat import uuid7
+
+from .models import Tag
+
+
+class TagResolver:
+    """Resolves names of a name/slug table (tags by default, or analogous colors) to IDs, creating missing rows."""
+
+    def __init__(self, model: Any = Tag):
+        self.model = model
+        self.ids: dict[str, UUID] = {}
+
+    async def resolve(self, session: AsyncSession, names: Iterable[str]) -> dict[str, UUID]:
+        """IDs of `names` by name."""
+        slugs = {name: slugify(name) for name in names}
+        if missing := {slug: name for name, slug in slugs.items() if slug not in self.ids}:
+            await self._load(session, missing)
+        return {name: self.ids[slug] for name, slug in slugs.items()}
+
+    async def _load(self, session: AsyncSession, missing: dict[str, str]) -> None:
+        model = self.model
+        # Rows go in slug order, so that concurrent inserts of overlapping names lock them in the same order.
+        rows = [{"id": uuid7(), "name": missing[slug], "slug": slug} for slug in sorted(missing)]
+        statement = pg_insert(model).on_conflict_do_nothing().returning(model.slug, model.id)
+        created = (await session.execute(statement.execution_options(**{TRACK_WRITES: False}), rows)).tuples().all()
+        if created:
+            mark_written(session, model.__tablename__)
+        self.ids.update(created)
+        if not (existing := missing.keys() - self.ids.keys()):
+            return
+
+        # Existing rows match on either unique column, like `get_or_upsert(name=..., slug=...)`.
+        names = [missing[slug] for slug in existing]
+        statement = select(model.id, model.name, model.slug).where(or_(model.name.in_(names), model.slug.in_(existing)))
+        by_name, by_slug = {}, {}
+        for id_, name, slug in (await session.execute(statement)).tuples():
+            by_name[name], by_slug[slug] = id_, id_
+        self.ids.update({slug: by_slug.get(slug) or by_name[missing[slug]] for slug in existing})
@@ -1,10 +1,11 @@
 from uuid import UUID
 
 from advanced_alchemy.filters import SearchFilter
-from advanced_alchemy.service import OffsetPagination
 from domain.dependencies import Services
-from domain.filters import PaginatedResponse
+from domain.filters import CursorPaginatedResponse, PaginatedResponse
+from domain.pagination import CountStrategyParam, paginate
 from fastapi import APIRouter, Query
+from schemas.base import CursorPage, OffsetPage
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT
 from typing_extensions import Annotated
 
@@ -34,10 +35,16 @@ async def get_tag(tag_id: UUID, container: Services):
     return container.provide_tags.to_schema(tag)
 
 
-@tag_router.get("/tags", response_model=OffsetPagination[TagResponse], status_code=HTTP_200_OK)
+@tag_router.get(
+    "/tags",
+    response_model=OffsetPage[TagResponse] | CursorPage[TagResponse],
+    status_code=HTTP_200_OK,
+)
 async def list_tags(
     filter_query: Annotated[TagFilters, Query()],
     limit_offset: PaginatedResponse,
+    cursor: CursorPaginatedResponse,
+    count: CountStrategyParam,
     container: Services,
 ):
     """List all tags"""
@@ -51,9 +58,17 @@ async def list_tags(
     if filter_query.type:
         filters.append(SearchFilter("type", filter_query.type, ignore_case=True))
 
-    results, total = await container.provide_tags.list_and_count(*filters, limit_offset)
-
-    return container.provide_tags.to_schema(results, total, filters=[limit_offset])
+    if cursor is not None:
+        results = await container.provide_tags.list(*filters, cursor)
+        return cursor.to_page(results, schema_type=TagResponse)
+
+    return await paginate(
+        container.provide_tags,
+        *filters,
+        limit_offset=limit_offset,
+        count=count,
+        schema_type=TagResponse,
+    )
 
 
 @tag_router.patch("/tags/{tag_id}", response_model=TagResponse, status_code=HTTP_200_OK)
@@ -9,6 +9,7 @@ from .http_exceptions import (
     CustomException,
     DuplicateValueException,
     ForbiddenException,
+    NotFoundException,
     RateLimitException,
     UnauthorizedException,
     UnprocessableEntityException,
@@ -24,6 +25,7 @@ __all__ = [
     "ForbiddenException",
     "InvalidRequestError",
     "MissingClientError",
+    "NotFoundException",
     "RateLimitException",
     "UnauthorizedException",
     "UnprocessableEntityException",
@@ -1,8 +1,14 @@
 from domain.analogous.routes import analogous_router
+from domain.catalog.routes import catalog_router
+from domain.export.routes import export_router
+from domain.importer.routes import import_router
 from domain.locale.routes import locale_router
+from domain.product.routes import product_router
 from domain.product_line.routes import product_line_router
 from domain.product_swatch.routes import product_swatch_router
 from domain.product_variant.routes import product_variant_router
+from domain.search.routes import search_router
+from domain.sync.routes import sync_router
 from domain.tag.routes import tag_router
 from domain.vendor.routes import vendor_router
 from fastapi import APIRouter
@@ -21,10 +27,16 @@ def include_routers():
     """Function to include all routers."""
     routers = [
         analogous_router,
+        catalog_router,
+        export_router,
+        import_router,
         locale_router,
+        product_router,
         product_line_router,
         product_swatch_router,
         product_variant_router,
+        search_router,
+        sync_router,
         tag_router,
         vendor_router,
     ]
@@ -5,6 +5,7 @@ from typing import (
     TypeVar,
     Union,
 )
+from uuid import UUID
 
 from pydantic import BaseModel, StrictInt, StrictStr, conint
 from typing_extensions import TypeAlias
@@ -14,6 +15,9 @@ from typing_extensions import TypeAlias
 SchemaT = TypeVar("SchemaT")
 
 __all__ = [
+    "BatchGetResponse",
+    "CursorPage",
+    "OffsetPage",
     "Page",
     "PageResponse",
     "FilterParams",
@@ -86,6 +90,60 @@ class CursorResponse(BaseModel, Generic[SchemaT]):
         return self.page > 1
 
 
+class CursorPage(BaseModel, Generic[SchemaT]):
+    """
+    A page of a keyset (cursor) paginated query.
+
+    PARAMS:
+    -------
+    items: The items in the page.
+    limit: The maximum number of items in a page.
+    next_cursor: Opaque cursor to request the following page, if any.
+    has_more: True if there is a next page.
+    """
+
+    items: Sequence[SchemaT]
+    limit: int
+    next_cursor: str | None = None
+    has_more: bool = False
+
+
+class OffsetPage(BaseModel, Generic[SchemaT]):
+    """
+    A page of a limit/offset paginated query.
+
+    PARAMS:
+    -------
+    items: The items in the page.
+    limit: The maximum number of items in a page.
+    offset: The number of items skipped before this page.
+    total: The total items in all the pages, or None if it was not counted.
+    total_estimated: True if `total` comes from planner statistics.
+    has_more: True if there is a next page.
+    """
+
+    items: Sequence[SchemaT]
+    limit: int
+    offset: int
+    total: int | None = None
+    total_estimated: bool = False
+    has_more: bool = False
+
+
+class BatchGetResponse(BaseModel, Generic[SchemaT]):
+    """
+    The rows requested by a list of IDs.
+
+    PARAMS:
+    -------
+    items: The rows found, in the order their IDs were requested.
+    missing: The requested IDs that do not exist.
+    """
+
+    items: Sequence[SchemaT]
+    missing: list[UUID] = []
+
+
 class FilterParams(BaseModel):
     """Base filter parameters"""
 
@@ -35,6 +35,12 @@ class Queue:
         self._pool = await create_pool(RedisSettings(host=settings.queue.HOST, port=settings.queue.PORT))
         return self._pool
 
+    async def connect(self) -> "ArqRedis":
+        """The pool, created on first use by processes that do not create it at startup."""
+        if self._pool is None:
+            await self.create_pool()
+        return self.pool
+
     async def close_pool(self) -> None:
         await self._pool.aclose()  # type: ignore
 
@@ -0,0 +1,67 @@
+"""Colour conversions of many colours at once, as NumPy arrays of one colour per row.
+
+The vectorized counterparts of `formatters.hex_to_rgb` and `formatters.to_oklch`,
+with the same matrices, for converting a whole batch of colours in a few array
+operations instead of a Python loop per colour.
+"""
+
+import re
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+
+HEX_COLOR = re.compile(r"#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})")
+
+"""Linear sRGB to LMS cone responses, then cube-rooted LMS to OKLab (Björn Ottosson)."""
+LINEAR_RGB_TO_LMS = np.array(
+    [
+        [0.4122214708, 0.5363325363, 0.0514459929],
+        [0.2119034982, 0.6806995451, 0.1073969566],
+        [0.0883024619, 0.2817188376, 0.6299787005],
+    ]
+)
+LMS_TO_OKLAB = np.array(
+    [
+        [0.2104542553, 0.7936177850, -0.0040720468],
+        [1.9779984951, -2.4285922050, 0.4505937099],
+        [0.0259040371, 0.7827717662, -0.8086757660],
+    ]
+)
+
+
+def hex_to_rgb_array(colors: Sequence[Any]) -> tuple[np.ndarray, np.ndarray]:
+    """RGB channels of `#RGB` or `#RRGGBB` colours, as an n×3 array of integers, and which are valid.
+
+    Colours that are not such strings are black in the array, and false in the mask.
+    """
+    valid = np.zeros(len(colors), dtype=bool)
+    digits = []
+    for i, color in enumerate(colors):
+        match = HEX_COLOR.fullmatch(color) if isinstance(color, str) else None
+        value = match.group(1) if match else "000000"
+        digits.append(value if len(value) == 6 else "".join(digit * 2 for digit in value))
+        valid[i] = match is not None
+    rgb = np.frombuffer(bytes.fromhex("".join(digits)), dtype=np.uint8).reshape(-1, 3)
+    return rgb.astype(np.int64), valid
+
+
+def rgb_to_hex_array(rgb: np.ndarray) -> list[str]:
+    """`#rrggbb` strings of an n×3 array of RGB channels."""
+    return ["#" + bytes(value).hex() for value in np.asarray(rgb, dtype=np.uint8).reshape(-1, 3)]
+
+
+def rgb_to_oklab_array(rgb: np.ndarray) -> np.ndarray:
+    """OKLab coordinates (L, a, b) of an n×3 array of RGB channels in [0, 255]."""
+    srgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3) / 255.0
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    return np.cbrt(linear @ LINEAR_RGB_TO_LMS.T) @ LMS_TO_OKLAB.T
+
+
+def rgb_to_oklch_array(rgb: np.ndarray) -> np.ndarray:
+    """OKLCH coordinates (lightness in [0, 1], chroma, hue in degrees) of an n×3 array of RGB channels."""
+    lab = rgb_to_oklab_array(rgb)
+    chroma = np.hypot(lab[:, 1], lab[:, 2])
+    hue = np.degrees(np.arctan2(lab[:, 2], lab[:, 1])) % 360
+    return np.column_stack([lab[:, 0], chroma, hue])
@@ -410,7 +410,8 @@ def format_color(color: Any, format: str = "hex") -> str:
     Format a color value to a specific format (hex, rgb, oklch).
 
     Args:
-        color: The color value to format.
+        color: The color value to format. For "oklch", floats that are valid OKLCH
+            coordinates (as swatches store them) are formatted as they are.
         format: The desired format ("hex", "rgb", "oklch").
 
     Returns:
@@ -424,7 +425,8 @@ def format_color(color: Any, format: str = "hex") -> str:
         rgb = ensure_rgb(color)
         return f"rgb({', '.join(map(str, rgb))})"
     elif format == "oklch":
-        oklch = to_oklch(color)
+        is_coordinates = isinstance(color, (list, tuple)) and all(isinstance(n, float) for n in color)
+        oklch = color if is_coordinates and is_oklch(color) else to_oklch(color)
         return f"oklch({', '.join(map(str, oklch))})"
     else:
         raise ValueError(f"Unsupported color format: {format}")
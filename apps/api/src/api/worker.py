@@ -0,0 +1,55 @@
+"""Arq worker for background jobs.
+
+Run from this directory with `arq worker.WorkerSettings`. Workers of vendor
+imports must share the spool directory (`IMPORT_SPOOL_DIR`) with each other.
+"""
+
+from typing import Any
+
+import redis.asyncio as redis
+from arq import func
+from arq.connections import RedisSettings
+from core.config import settings
+from core.database import DB
+from core.logger import get_logger, setup_logging
+from domain.importer.jobs import CHUNK_TIMEOUT_GRACE, finish_import, import_chunk, import_vendor_file
+from services import Cache
+
+
+setup_logging(json_logs=settings.logger.LOG_JSON_FORMAT, log_level=settings.logger.LOG_LEVEL)
+
+logger = get_logger(__name__)
+
+
+async def startup(ctx: dict[str, Any]) -> None:
+    ctx["db"] = DB.instance()
+    # Writes bump the cached counts of the API, in the cache it reads them from.
+    cache = Cache.instance()
+    cache.pool = redis.ConnectionPool.from_url(settings.redis.REDIS_URL)
+    cache.client = redis.Redis.from_pool(cache.pool)
+    logger.info("Worker started")
+
+
+async def shutdown(ctx: dict[str, Any]) -> None:
+    await Cache.instance().client.aclose()
+    await ctx["db"].engine.dispose()
+
+
+class WorkerSettings:
+    functions = [
+        import_vendor_file,
+        # Chunks time out on their own first, and have one more try than other jobs to record
+        # the failure of a last attempt cut short: the next chunks are queued only then.
+        func(
+            import_chunk,
+            timeout=settings.importer.CHUNK_TIMEOUT + CHUNK_TIMEOUT_GRACE,
+            max_tries=settings.queue.JOB_TRIES + 1,
+        ),
+        finish_import,
+    ]
+    redis_settings = RedisSettings(host=settings.queue.HOST, port=settings.queue.PORT)
+    max_jobs = settings.queue.MAX_JOBS
+    job_timeout = settings.queue.JOB_TIMEOUT
+    max_tries = settings.queue.JOB_TRIES
+    on_startup = startup
+    on_shutdown = shutdown
@@ -1,11 +1,139 @@
 #!/usr/bin/env python
 """
 Script to generate SQL statements from JSON data.
+
+Vendor files are streamed and validated like `import_data.py` does (see
+`domain.importer`), and written out as SQL files in three steps:
+
+- `0-setup.sql` creates staging tables, unlogged, one per table imported;
+- `1-data-NNNN.sql` loads a chunk of products into them, as a `COPY ... FROM
+  STDIN` data stream or as multi-row `INSERT`s (`--format values`); chunks do
+  not depend on each other and can be loaded in parallel;
+- `2-merge.sql` merges the staging tables into the real ones in one
+  transaction, a set-based statement per table, and drops them.
+
+Rows in the staging tables point at their parents by natural key (a slug, a
+tag name, a locale's language and country), which the merge joins on. Like
+the importer, it updates only rows whose values differ, restores removed
+rows, replaces the swatch, variants, tags and analogous colors of the merged
+products, and leaves alone a product whose slug belongs to another vendor. It
+does not remove products missing from the files, and does not invalidate
+cached list counts, which expire on their own.
+
+Usage:
+
+    python generate_sql.py vendor-data/citadel.json -o import_data
+    psql -f import_data/0-setup.sql
+    ls import_data/1-data-*.sql | xargs -P 4 -n 1 psql -q -f
+    psql -f import_data/2-merge.sql
 """
 
+import argparse
 import json
 import sys
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from enum import Enum
 from pathlib import Path
+from typing import Any, TextIO
+
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from advanced_alchemy.utils.text import slugify
+from domain.associations import product_analogous_association, product_tag_association
+from domain.importer.rows import ImportBatch, Row, chunks, validate
+from domain.importer.stream import read_vendor_file
+from domain.product.models import Product
+from domain.product_line.models import ProductLine
+from domain.product_swatch.models import ProductSwatch
+from domain.product_variant.models import ProductVariant
+from domain.vendor.models import Vendor
+from sqlalchemy import Column, MetaData, String, Table, Uuid
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from uuid_utils.compat import uuid7
+
+
+"""Products per data file."""
+DEFAULT_CHUNK_SIZE = 5000
+
+"""Files this script writes, removed from the output directory before it writes them again."""
+GENERATED_FILES = ("0-setup.sql", "1-data-*.sql", "2-merge.sql")
+
+"""Rows per `INSERT` with `--format values`."""
+VALUES_PAGE_SIZE = 1000
+
+"""Columns the database fills in, rather than the staged rows."""
+GENERATED_COLUMNS = {"id", "sa_orm_sentinel", "created_at", "updated_at", "search_vector"}
+
+"""Values restoring a row removed by an earlier import, for tables the importer restores rows of."""
+RESTORED = {"is_deleted": False, "deleted_at": None}
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+@dataclass
+class Stage:
+    """A staging table: the rows of an `ImportBatch` attribute, and the natural keys they point at.
+
+    Rows of model tables are staged with their values; links to names (tags,
+    analogous colors) with the name only, for the merge to create.
+    """
+
+    batch: str
+    model: Any
+    keys: dict[str, Any]
+    key_values: Callable[[Row], tuple]
+    restores: bool = False
+    columns: list[str] = field(init=False, default_factory=list)
+
+    def __post_init__(self):
+        if self.model is None:
+            return
+        table = self.model.__table__
+        foreign_keys = {column.name for column in table.columns if column.foreign_keys}
+        skipped = GENERATED_COLUMNS | foreign_keys | (set() if self.restores else RESTORED.keys())
+        self.columns = [column.name for column in table.columns if column.name not in skipped]
+
+    @property
+    def name(self) -> str:
+        return f"import_stage_{self.batch}"
+
+    def table(self) -> Table:
+        key_columns = [Column(name, type_) for name, type_ in self.keys.items()]
+        value_columns = [Column(name, self.model.__table__.c[name].type) for name in self.columns]
+        return Table(self.name, MetaData(), Column("id", Uuid), *key_columns, *value_columns, prefixes=["UNLOGGED"])
+
+    def rows(self, batch: ImportBatch) -> Iterator[list[Any]]:
+        defaults = RESTORED if self.restores else {}
+        for row in getattr(batch, self.batch):
+            values = [row.values.get(name, defaults.get(name)) for name in self.columns]
+            yield [uuid7(), *self.key_values(row), *values]
+
+
+def name_link(column: str) -> Callable[[Row], tuple]:
+    """Key values of a product's link to a name: the product, and the name with its slug."""
+    return lambda row: (row.refs["product_id"], row.refs[column], slugify(row.refs[column]))
+
+
+NAME_KEYS = {"product_key": String, "name": String, "slug": String}
+
+STAGES = [
+    Stage("vendors", Vendor, {}, lambda row: ()),
+    Stage("product_lines", ProductLine, {"vendor_key": String}, lambda row: (row.refs["vendor_id"],), True),
+    Stage("products", Product, {"product_line_key": String}, lambda row: (row.refs["product_line_id"],), True),
+    Stage("swatches", ProductSwatch, {"product_key": String}, lambda row: (row.refs["product_id"],)),
+    Stage(
+        "variants",
+        ProductVariant,
+        {"product_key": String, "language_code": String, "country_code": String},
+        lambda row: (row.refs["product_id"], *row.refs["locale_id"]),
+        True,
+    ),
+    Stage("product_tags", None, NAME_KEYS, name_link("tag_id")),
+    Stage("product_analogous", None, NAME_KEYS, name_link("analogous_id")),
+]
 
 
 def sanitize_string(s):
@@ -17,18 +145,18 @@ def sanitize_string(s):
     return f"'{s_str.replace("'", "''")}'"
 
 
-def sanitize_array(arr):
-    """Sanitize an array for SQL."""
-    if arr is None or len(arr) == 0:
-        return "NULL"
-    # Handle arrays of different types
-    sanitized = []
-    for item in arr:
-        if isinstance(item, (int, float)):
-            sanitized.append(str(item))
+def array_literal(values: list) -> str:
+    """A Postgres array literal (`{...}`), which converts to an array of any element type."""
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            elements.append(str(value))
         else:
-            sanitized.append(sanitize_string(item))
-    return f"ARRAY[{', '.join(sanitized)}]"
+            text = value.name if isinstance(value, Enum) else str(value)
+            elements.append('"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(elements) + "}"
 
 
 def sanitize_value(value):
@@ -39,250 +167,210 @@ def sanitize_value(value):
         return "TRUE" if value else "FALSE"
     if isinstance(value, (int, float)):
         return str(value)
+    if isinstance(value, Enum):
+        # Enums are stored by member name.
+        return sanitize_string(value.name)
     if isinstance(value, list):
-        return sanitize_array(value)
+        return sanitize_string(array_literal(value))
     if isinstance(value, dict):
         return sanitize_string(json.dumps(value))
     return sanitize_string(str(value))
 
 
-def generate_vendor_sql(vendor):
-    """Generate SQL for a vendor."""
-    fields = [
-        "vendor_name",
-        "vendor_url",
-        "slug",
-        "platform",
-        "description",
-        "pdp_slug",
-        "plp_slug",
-    ]
-    values = [sanitize_value(vendor.get(field)) for field in fields]
-
-    sql = f"""
--- Insert vendor: {vendor["vendor_name"]}
-INSERT INTO vendors (
-    vendor_name, vendor_url, slug, platform, description, pdp_slug, plp_slug
-) VALUES (
-    {", ".join(values)}
-) ON CONFLICT (slug) DO UPDATE SET
-    vendor_name = EXCLUDED.vendor_name,
-    vendor_url = EXCLUDED.vendor_url,
-    platform = EXCLUDED.platform,
-    description = EXCLUDED.description,
-    pdp_slug = EXCLUDED.pdp_slug,
-    plp_slug = EXCLUDED.plp_slug
-RETURNING id;
-"""
-    return sql
-
-
-def generate_product_line_sql(product_line, vendor_slug):
-    """Generate SQL for a product line."""
-    fields = [
-        "product_line_name",
-        "marketing_name",
-        "slug",
-        "vendor_slug",
-        "product_line_type",
-        "description",
-    ]
-    values = [sanitize_value(product_line.get(field)) for field in fields]
-
-    sql = f"""
--- Insert product line: {product_line["product_line_name"]}
-INSERT INTO product_lines (
-    product_line_name, marketing_name, slug, vendor_slug, product_line_type, description, vendor_id
-) VALUES (
-    {", ".join(values)},
-    (SELECT id FROM vendors WHERE slug = {sanitize_value(vendor_slug)})
-) ON CONFLICT (slug) DO UPDATE SET
-    product_line_name = EXCLUDED.product_line_name,
-    marketing_name = EXCLUDED.marketing_name,
-    vendor_slug = EXCLUDED.vendor_slug,
-    product_line_type = EXCLUDED.product_line_type,
-    description = EXCLUDED.description,
-    vendor_id = EXCLUDED.vendor_id
-RETURNING id;
-"""
-    return sql
-
-
-def generate_product_sql(product, product_line_slug):
-    """Generate SQL for a product."""
-    fields = [
-        "name",
-        "product_type",
-        "tags",
-        "color_range",
-        "analogous",
-        "iscc_nbs_category",
-    ]
-    values = [sanitize_value(product.get(field)) for field in fields]
-
-    # Handle swatch separately
-    swatch = product.get("swatch", {})
-    swatch_fields = [
-        "hex_color",
-        "rgb_color",
-        "oklch_color",
-        "gradient_start",
-        "gradient_end",
-        "overlay",
-    ]
-    swatch_values = [sanitize_value(swatch.get(field)) for field in swatch_fields]
-
-    sql = f"""
--- Insert product: {product["name"]}
-WITH product_insert AS (
-    INSERT INTO products (
-        name, product_type, tags, color_range, analogous, iscc_nbs_category, product_line_id
-    ) VALUES (
-        {", ".join(values)},
-        (SELECT id FROM product_lines WHERE slug = {sanitize_value(product_line_slug)})
-    ) ON CONFLICT (name, product_line_id) DO UPDATE SET
-        product_type = EXCLUDED.product_type,
-        tags = EXCLUDED.tags,
-        color_range = EXCLUDED.color_range,
-        analogous = EXCLUDED.analogous,
-        iscc_nbs_category = EXCLUDED.iscc_nbs_category
-    RETURNING id
-)
-INSERT INTO product_swatches (
-    hex_color, rgb_color, oklch_color, gradient_start, gradient_end, overlay, product_id
-) VALUES (
-    {", ".join(swatch_values)},
-    (SELECT id FROM product_insert)
-) ON CONFLICT (product_id) DO UPDATE SET
-    hex_color = EXCLUDED.hex_color,
-    rgb_color = EXCLUDED.rgb_color,
-    oklch_color = EXCLUDED.oklch_color,
-    gradient_start = EXCLUDED.gradient_start,
-    gradient_end = EXCLUDED.gradient_end,
-    overlay = EXCLUDED.overlay;
-"""
-    return sql
-
-
-def generate_variant_sql(variant, product_name, product_line_slug):
-    """Generate SQL for a product variant."""
-    fields = [
-        "display_name",
-        "marketing_name",
-        "sku",
-        "vendor_color_range",
-        "vendor_product_type",
-        "opacity",
-        "viscosity",
-        "discontinued",
-        "image_url",
-        "packaging",
-        "volume_ml",
-        "volume_oz",
-        "price",
-        "currency_code",
-        "currency_symbol",
-        "country_code",
-        "product_url",
-        "language_code",
-        "product_line",
-        "application_method",
-        "vendor_product_id",
+def copy_value(value) -> str:
+    """A value in the text format of `COPY`."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, Enum):
+        value = value.name
+    elif isinstance(value, list):
+        value = array_literal(value)
+    elif isinstance(value, dict):
+        value = json.dumps(value)
+    return str(value).translate(COPY_ESCAPES)
+
+
+def column_list(stage: Stage) -> str:
+    return ", ".join(column.name for column in stage.table().columns)
+
+
+def write_setup(file: TextIO) -> None:
+    file.write("-- Auto-generated staging tables for importing data\n\n")
+    for stage in STAGES:
+        file.write(f"DROP TABLE IF EXISTS {stage.name};\n")
+        file.write(f"{str(CreateTable(stage.table()).compile(dialect=postgresql.dialect())).strip()};\n\n")
+
+
+def write_chunk(file: TextIO, batch: ImportBatch, data_format: str) -> None:
+    """Stage the rows of `batch`, in a transaction of its own."""
+    file.write("-- Auto-generated staging rows for importing data\n\nBEGIN;\n\n")
+    for stage in STAGES:
+        rows = stage.rows(batch)
+        if data_format == "copy":
+            first = next(rows, None)
+            if first is None:
+                continue
+            file.write(f"COPY {stage.name} ({column_list(stage)}) FROM STDIN;\n")
+            for row in (first, *rows):
+                file.write("\t".join(map(copy_value, row)) + "\n")
+            file.write("\\.\n\n")
+            continue
+        page = []
+        for row in (*rows, None):
+            if row is not None:
+                page.append(f"({', '.join(map(sanitize_value, row))})")
+            if page and (row is None or len(page) == VALUES_PAGE_SIZE):
+                file.write(f"INSERT INTO {stage.name} ({column_list(stage)}) VALUES\n")
+                file.write(",\n".join(page) + ";\n\n")
+                page = []
+    file.write("COMMIT;\n")
+
+
+def _set(columns: list[str]) -> str:
+    return ", ".join(f"{column} = excluded.{column}" for column in columns)
+
+
+def _differs(columns: list[str], target: str = "t", source: str = "excluded") -> str:
+    current = ", ".join(f"{target}.{column}" for column in columns)
+    incoming = ", ".join(f"{source}.{column}" for column in columns)
+    return f"({current}) IS DISTINCT FROM ({incoming})"
+
+
+def _selected(columns: list[str], source: str = "s") -> str:
+    return ", ".join(f"{source}.{column}" for column in columns)
+
+
+def merge_sql() -> str:
+    """Statements merging the staging tables into the real ones, a set-based statement per table."""
+    vendors, lines, products, swatches, variants, tags, analogous = STAGES
+    lines_columns = ["vendor_id", *lines.columns]
+    products_columns = ["product_line_id", *products.columns]
+    variant_key = "(t.product_id, t.locale_id, t.sku) = (v.product_id, v.locale_id, v.sku)"
+    statements = [
+        *(f"ANALYZE {stage.name}" for stage in STAGES),
+        f"""INSERT INTO vendors AS t (id, {", ".join(vendors.columns)})
+SELECT DISTINCT ON (s.slug) s.id, {_selected(vendors.columns)} FROM {vendors.name} s ORDER BY s.slug
+ON CONFLICT (slug) DO UPDATE SET {_set(vendors.columns)}, updated_at = now()
+WHERE {_differs(vendors.columns)}""",
+        f"""INSERT INTO product_lines AS t (id, {", ".join(lines_columns)})
+SELECT DISTINCT ON (s.slug) s.id, v.id, {_selected(lines.columns)}
+FROM {lines.name} s JOIN vendors v ON v.slug = s.vendor_key ORDER BY s.slug
+ON CONFLICT (slug) DO UPDATE SET {_set(lines_columns)}, updated_at = now()
+WHERE {_differs(lines_columns)}""",
+        # A slug of another vendor's product is left alone, as the importer does.
+        f"""INSERT INTO products AS t (id, {", ".join(products_columns)})
+SELECT DISTINCT ON (s.slug) s.id, pl.id, {_selected(products.columns)}
+FROM {products.name} s JOIN product_lines pl ON pl.slug = s.product_line_key ORDER BY s.slug
+ON CONFLICT (slug) DO UPDATE SET {_set(products_columns)}, updated_at = now()
+WHERE {_differs(products_columns)}
+AND (SELECT vendor_id FROM product_lines WHERE id = t.product_line_id)
+  = (SELECT vendor_id FROM product_lines WHERE id = excluded.product_line_id)""",
+        # The products merged: those now in the product line they were staged in.
+        f"""CREATE TEMPORARY TABLE import_merged_products ON COMMIT DROP AS
+SELECT DISTINCT p.id, p.slug FROM {products.name} s JOIN products p ON p.slug = s.slug
+JOIN product_lines pl ON pl.id = p.product_line_id AND pl.slug = s.product_line_key""",
+        "ANALYZE import_merged_products",
+        f"""INSERT INTO product_swatches AS t (id, product_id, {", ".join(swatches.columns)})
+SELECT DISTINCT ON (mp.id) s.id, mp.id, {_selected(swatches.columns)}
+FROM {swatches.name} s JOIN import_merged_products mp ON mp.slug = s.product_key ORDER BY mp.id
+ON CONFLICT (product_id) DO UPDATE SET {_set(swatches.columns)}, updated_at = now()
+WHERE {_differs(swatches.columns)}""",
+        f"""DELETE FROM product_swatches t USING import_merged_products mp
+WHERE t.product_id = mp.id AND NOT EXISTS (SELECT 1 FROM {swatches.name} s WHERE s.product_key = mp.slug)""",
+        # Variants are matched by product, locale and SKU; one of several with the same key is kept.
+        f"""CREATE TEMPORARY TABLE import_merged_variants ON COMMIT DROP AS
+SELECT DISTINCT ON (mp.id, l.id, s.sku) s.id, mp.id AS product_id, l.id AS locale_id, {_selected(variants.columns)}
+FROM {variants.name} s JOIN import_merged_products mp ON mp.slug = s.product_key
+JOIN locales l ON l.language_code = s.language_code AND l.country_code = s.country_code
+ORDER BY mp.id, l.id, s.sku""",
+        "ANALYZE import_merged_variants",
+        f"""UPDATE product_variants t SET {", ".join(f"{c} = v.{c}" for c in variants.columns)}, updated_at = now()
+FROM import_merged_variants v WHERE {variant_key} AND {_differs(variants.columns, source="v")}""",
+        f"""INSERT INTO product_variants (id, product_id, locale_id, {", ".join(variants.columns)})
+SELECT v.id, v.product_id, v.locale_id, {_selected(variants.columns, "v")} FROM import_merged_variants v
+WHERE NOT EXISTS (SELECT 1 FROM product_variants t WHERE {variant_key})""",
+        f"""UPDATE product_variants t SET is_deleted = TRUE, deleted_at = now(), updated_at = now()
+FROM import_merged_products mp WHERE t.product_id = mp.id AND t.is_deleted IS NOT TRUE
+AND NOT EXISTS (SELECT 1 FROM import_merged_variants v WHERE {variant_key})""",
     ]
-    values = [sanitize_value(variant.get(field)) for field in fields]
-
-    sql = f"""
--- Insert variant: {variant["display_name"]}
-INSERT INTO product_variants (
-    display_name, marketing_name, sku, vendor_color_range, vendor_product_type, 
-    opacity, viscosity, discontinued, image_url, packaging, 
-    volume_ml, volume_oz, price, currency_code, currency_symbol, 
-    country_code, product_url, language_code, product_line, application_method, 
-    vendor_product_id, product_id
-) VALUES (
-    {", ".join(values)},
-    (SELECT p.id FROM products p
-     JOIN product_lines pl ON p.product_line_id = pl.id
-     WHERE p.name = {sanitize_value(product_name)}
-     AND pl.slug = {sanitize_value(product_line_slug)})
-) ON CONFLICT (sku) DO UPDATE SET
-    display_name = EXCLUDED.display_name,
-    marketing_name = EXCLUDED.marketing_name,
-    vendor_color_range = EXCLUDED.vendor_color_range,
-    vendor_product_type = EXCLUDED.vendor_product_type,
-    opacity = EXCLUDED.opacity,
-    viscosity = EXCLUDED.viscosity,
-    discontinued = EXCLUDED.discontinued,
-    image_url = EXCLUDED.image_url,
-    packaging = EXCLUDED.packaging,
-    volume_ml = EXCLUDED.volume_ml,
-    volume_oz = EXCLUDED.volume_oz,
-    price = EXCLUDED.price,
-    currency_code = EXCLUDED.currency_code,
-    currency_symbol = EXCLUDED.currency_symbol,
-    country_code = EXCLUDED.country_code,
-    product_url = EXCLUDED.product_url,
-    language_code = EXCLUDED.language_code,
-    product_line = EXCLUDED.product_line,
-    application_method = EXCLUDED.application_method,
-    vendor_product_id = EXCLUDED.vendor_product_id;
-"""
-    return sql
-
-
-def process_json_data(json_data):
-    """Process JSON data and generate SQL statements."""
-    sql_statements = []
-
-    for vendor in json_data:
-        # Generate vendor SQL
-        sql_statements.append(generate_vendor_sql(vendor))
-
-        # Process product lines
-        for product_line in vendor.get("product_lines", []):
-            sql_statements.append(
-                generate_product_line_sql(product_line, vendor["slug"])
-            )
-
-            # Process products
-            for product in product_line.get("products", []):
-                sql_statements.append(
-                    generate_product_sql(product, product_line["slug"])
-                )
-
-                # Process variants
-                for variant in product.get("variants", []):
-                    sql_statements.append(
-                        generate_variant_sql(
-                            variant, product["name"], product_line["slug"]
-                        )
+    for stage, names, association, column in (
+        (tags, "tags", product_tag_association, "tag_id"),
+        (analogous, "analogous", product_analogous_association, "analogous_id"),
+    ):
+        statements += [
+            f"""INSERT INTO {names} (id, name, slug)
+SELECT DISTINCT ON (s.slug) s.id, s.name, s.slug FROM {stage.name} s ORDER BY s.slug
+ON CONFLICT DO NOTHING""",
+            f"""DELETE FROM {association.name} a USING import_merged_products mp
+WHERE a.product_id = mp.id AND NOT EXISTS (
+  SELECT 1 FROM {stage.name} s JOIN {names} n ON n.slug = s.slug WHERE s.product_key = mp.slug AND n.id = a.{column}
+)""",
+            f"""INSERT INTO {association.name} (product_id, {column})
+SELECT DISTINCT mp.id, n.id FROM {stage.name} s
+JOIN import_merged_products mp ON mp.slug = s.product_key JOIN {names} n ON n.slug = s.slug
+ON CONFLICT DO NOTHING""",
+        ]
+    statements += [f"DROP TABLE {stage.name}" for stage in STAGES]
+    return "-- Auto-generated merge of the staged rows\n\nBEGIN;\n\n" + ";\n\n".join(statements) + ";\n\nCOMMIT;\n"
+
+
+def generate(paths: list[Path], output: Path, chunk_size: int, data_format: str) -> tuple[int, int]:
+    """Write the SQL files for `paths` to the `output` directory; returns the data files and products rejected."""
+    output.mkdir(parents=True, exist_ok=True)
+    # Data files of an earlier, larger run would be loaded along with this one's; other files are left alone.
+    for pattern in GENERATED_FILES:
+        for stale in output.glob(pattern):
+            stale.unlink()
+    with open(output / "0-setup.sql", "w") as file:
+        write_setup(file)
+
+    chunk = rejected = 0
+    for path in paths:
+        with open(path) as source:
+            for batch in chunks(read_vendor_file(source), chunk_size):
+                batch = validate(batch)
+                for reject in batch.rejects:
+                    print(
+                        f"Rejected {reject.name!r} ({path}, {reject.product_line} #{reject.offset}): {reject.error}",
+                        file=sys.stderr,
                     )
+                rejected += len(batch.rejects)
+                chunk += 1
+                with open(output / f"1-data-{chunk:04d}.sql", "w") as file:
+                    write_chunk(file, batch, data_format)
 
-    return sql_statements
+    with open(output / "2-merge.sql", "w") as file:
+        file.write(merge_sql())
+    return chunk, rejected
 
 
 def main():
     """Main function."""
-    if len(sys.argv) < 2:
-        print("Usage: python generate_sql.py <json_file>")
-        sys.exit(1)
-
-    json_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else "import_data.sql"
+    parser = argparse.ArgumentParser(description="Generate SQL files loading vendor files through staging tables.")
+    parser.add_argument("json_files", nargs="+", type=Path, help="Vendor files, each one vendor or an array of them.")
+    parser.add_argument(
+        "-o", "--output", type=Path, default=Path("import_data"), help="Directory to write to (default: import_data)."
+    )
+    parser.add_argument(
+        "--format",
+        choices=["copy", "values"],
+        default="copy",
+        dest="data_format",
+        help="Stage rows with COPY data streams or multi-row INSERTs (default: copy).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Products per data file (default: {DEFAULT_CHUNK_SIZE}).",
+    )
+    args = parser.parse_args()
 
     try:
-        with open(json_file, "r") as f:
-            json_data = json.load(f)
-
-        sql_statements = process_json_data(json_data)
-
-        with open(output_file, "w") as f:
-            f.write("-- Auto-generated SQL statements for importing data\n\n")
-            f.write("BEGIN;\n\n")
-            f.write("\n".join(sql_statements))
-            f.write("\n\nCOMMIT;\n")
-
-        print(f"SQL statements generated successfully and saved to {output_file}")
+        chunk_count, rejected = generate(args.json_files, args.output, args.chunk_size, args.data_format)
+        print(f"SQL generated successfully in {args.output}: {chunk_count} data files, {rejected} products rejected")
 
     except Exception as e:
         print(f"Error: {e}")
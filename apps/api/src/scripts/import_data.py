@@ -1,237 +1,222 @@
+import argparse
 import json
+import multiprocessing
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict
 from pathlib import Path
-from typing import Any, TypeVar
-from uuid import UUID
+from time import perf_counter
 
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 import asyncio
 
-from advanced_alchemy.base import ModelProtocol
-from advanced_alchemy.utils.text import slugify
-from api.core.database import DB
-from api.core.logger import get_logger, settings, setup_logging
-from api.domain.analogous import (
-    Analogous,
-)
-from api.domain.enums import ProductLineTypeEnum
-from api.domain.locale import provide_locales_service
-from api.domain.product import (
-    provide_products_service,
-)
-from api.domain.product_line import (
-    ProductLineCreate,
-    provide_product_lines_service,
-)
-from api.domain.product_swatch import (
-    ProductSwatchCreate,
-    provide_product_swatches_service,
-)
-from api.domain.product_variant import (
-    ProductVariantCreate,
-    provide_product_variants_service,
-)
-from api.domain.tag import Tag
-from api.domain.vendor import (
-    VendorCreate,
-    provide_vendors_service,
-)
-from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import DB
+from core.logger import get_logger, settings, setup_logging
+from domain.importer.engine import DEFAULT_BATCH_SIZE, BulkImporter, ImportReport, import_file_in_session
+from domain.importer.metrics import peak_memory_mb
+from domain.locale.service import LocaleService
+from domain.pagination import invalidate_counts
 
 
 setup_logging(json_logs=settings.logger.LOG_JSON_FORMAT, log_level=settings.logger.LOG_LEVEL)
 logger = get_logger(__name__)
 
 
-T = TypeVar("T", bound=ModelProtocol)
+async def create_locales(session) -> None:
+    locale_service = LocaleService(session=session)
+    if not await locale_service.count():
+        locales = await locale_service.create_all()
+        logger.info("Locales created", count=len(locales))
 
 
-async def import_vendor(session: AsyncSession, data: dict[str, Any]):
-    locale_id: UUID | None = None
+def validation_pool(validators: int) -> ProcessPoolExecutor | nullcontext:
+    """Processes validating batches ahead of the writes, or none to validate them in the importing process."""
+    if not validators:
+        return nullcontext()
+    # Spawned rather than forked, so that they do not share the parent's engine and connections.
+    return ProcessPoolExecutor(max_workers=validators, mp_context=multiprocessing.get_context("spawn"))
 
-    async for vendor_service in provide_vendors_service(session):
-        vendor_data = VendorCreate(
-            name=data["vendor_name"],
-            url=data["vendor_url"],
-            slug=data["slug"],
-            platform=data["platform"],
-            description=data["description"],
-            pdp_slug=data["pdp_slug"],
-            plp_slug=data["plp_slug"],
-        )
-        vendor = await vendor_service.create(data=vendor_data)
 
-        async for product_line_service in provide_product_lines_service(session):
-            for product_line_item in data.get("product_lines", []):
-                product_line_type = ProductLineTypeEnum.__members__.get(
-                    product_line_item.get("product_line_type", "Mixed"), ProductLineTypeEnum.Mixed
-                )
-                product_line_name = product_line_item["product_line_name"]
-
-                product_line_model = ProductLineCreate(
-                    **{
-                        "description": product_line_item.get("description", ""),
-                        "marketing_name": product_line_item.get("marketing_name", product_line_name),
-                        "name": product_line_name,
-                        "slug": product_line_item.get("slug", slugify(product_line_name)),
-                        "vendor_slug": product_line_item.get("vendor_slug", None),
-                        "product_line_type": product_line_type,
-                        "vendor_id": vendor.id,
-                    }
-                )
-                product_line = await product_line_service.create(data=product_line_model)
-
-                if not product_line:
-                    raise ValueError(f"Failed to create or retrieve product line: {product_line_name}")
-
-                async for product_service in provide_products_service(session):
-                    for product_item in product_line_item.get("products", []):
-                        product_name = product_item["name"]
-                        enum_fields = product_service.get_valid_enum_fields(product_item)
-
-                        product_model = await product_service.to_model(
-                            {
-                                "name": product_name,
-                                "description": product_item.get("description", ""),
-                                "iscc_nbs_category": product_item["iscc_nbs_category"],
-                                "product_line_id": product_line.id,
-                                "slug": slugify(product_name),
-                                **enum_fields,
-                            }
-                        )
-
-                        product_tags = product_item.get("tags", [])
-                        if len(product_tags):
-                            product_model.tags.extend(
-                                [
-                                    await Tag.as_unique_async(
-                                        session,
-                                        name=tag_item,
-                                        slug=slugify(tag_item),
-                                    )
-                                    for tag_item in product_tags
-                                ]
-                            )
-
-                        analogous_tags = product_item.get("analogous", [])
-                        if len(analogous_tags) > 0:
-                            product_model.analogous.extend(
-                                [
-                                    await Analogous.as_unique_async(
-                                        session,
-                                        name=tag_item,
-                                        slug=slugify(tag_item),
-                                    )
-                                    for tag_item in analogous_tags
-                                ]
-                            )
-
-                        product = await product_service.create(data=product_model)
-
-                        async for swatch_service in provide_product_swatches_service(session):
-                            if isinstance(product_swatch := product_item.get("swatch", None), dict):
-                                swatch_data = ProductSwatchCreate(
-                                    product_id=product.id,
-                                    **product_swatch,
-                                )
-                                await swatch_service.create(data=swatch_data)
-
-                        async for variant_service in provide_product_variants_service(session):
-                            for variant_item in product_item.get("variants", []):
-                                if locale_id is None:
-                                    async for locale_service in provide_locales_service(session):
-                                        current_locale = await locale_service.get_one(
-                                            language_code=variant_item.get("language_code", "en"),
-                                            country_code=variant_item.get("country_code", "US"),
-                                        )
-                                        if current_locale:
-                                            locale_id = current_locale.id
-                                if locale_id is None:
-                                    raise ValueError(
-                                        "Locale ID is not set. Ensure that locales are created before variants."
-                                    )
-                                variant_service.set_valid_enum_fields(variant_item)
-                                variant = ProductVariantCreate(
-                                    **variant_item,
-                                    product_id=product.id,
-                                    locale_id=locale_id,
-                                )
-                                await variant_service.create(data=variant)
-
-
-async def import_data(data):
+async def import_data(
+    paths: list[Path], batch_size: int = DEFAULT_BATCH_SIZE, resume: bool = False, validators: int = 1
+) -> ImportReport:
+    """Import every file in one session, committing a batch of products at a time.
+
+    A failure rolls back the current batch only; with `resume`, each file is
+    picked up after the last batch committed.
+    """
     db = DB.instance()
 
     async with db.session_factory() as session:
         try:
-            session.begin()
-
             # await db.drop_all()
             await db.create_all()
-
-            async for locale_service in provide_locales_service(session):
-                locales = await locale_service.create_all()
-                print(f"Locales created: {len(locales)}")
-
-            print("Starting vendor creation...", type(data))
-
-            if isinstance(data, list):
-                for vendor_data in data:
-                    print("Processing data...", vendor_data.get("vendor_name", "Unknown Vendor"))
-                    await import_vendor(session, vendor_data)
-            elif isinstance(data, dict):
-                print("Processing data...", data.get("vendor_name", "Unknown Vendor"))
-                await import_vendor(session, data)
-            else:
-                raise ValueError("Data must be a dictionary or a list of dictionaries.")
-            print("Data import completed successfully.")
-
+            await create_locales(session)
             await session.commit()
+
+            with validation_pool(validators) as pool:
+                importer = BulkImporter(session, validators=pool)
+                report, started = ImportReport(), perf_counter()
+                for path in paths:
+                    report += await importer.import_file(path, batch_size, resume=resume)
+
+            seconds = perf_counter() - started
+            logger.info(
+                "Data import completed",
+                **report.as_log(),
+                seconds=round(seconds, 3),
+                **report.rates(seconds),
+                **importer.timer.as_log(),
+                peak_memory_mb=peak_memory_mb(),
+            )
+            return report
         except Exception as e:
-            print(f"Error during vendor creation: {e}")
+            logger.error("Error during import", error=str(e))
             await session.rollback()
-            await db.engine.dispose()
             raise
         finally:
+            await invalidate_counts(session)
             await session.close()
             await db.engine.dispose()
 
 
-async def setup_and_import():
-    """Set up database and import data."""
-    # Allow specifying the JSON file path as a command-line argument
-    if len(sys.argv) > 1:
-        json_path = sys.argv[1]
-    else:
-        json_path = f"{Path(__file__).parent.parent.parent.parent.parent}/vendor-data/"
+def import_file(path: Path, batch_size: int, resume: bool, validators: int) -> ImportReport:
+    """Import one vendor file in a worker process, with a database engine and validators of the worker's own."""
 
-    """Import data from JSON file."""
-    # logger.info(f"Importing data from {json_path}.")
+    async def run() -> ImportReport:
+        db = DB.instance()
+        try:
+            with validation_pool(validators) as pool:
+                return await import_file_in_session(
+                    db.session_factory, path, batch_size, resume=resume, validators=pool
+                )
+        finally:
+            await db.engine.dispose()
 
-    paths = Path(json_path).glob("*.json")
-    vendors = []
+    return asyncio.run(run())
 
-    for path in paths:
-        if not path.is_file():
-            print(f"Skipping non-file path: {path}")
-            continue
 
-        print(f"Importing data from {path}...")
-        if not path.exists():
-            print(f"File not found: {path}")
-            continue
+async def import_data_concurrently(
+    paths: list[Path], batch_size: int, workers: int, resume: bool = False, validators: int = 1
+) -> ImportReport:
+    """Import each file in a session of its own, `workers` files at a time.
 
-        # Read JSON file
-        with open(path, "r") as file:
-            data = json.load(file)
+    Files are imported by a pool of processes, each with its own connection,
+    so that flattening rows uses as many cores as the database does. Locales
+    are created up front; tags and analogous colors are created by whichever
+    worker first needs them (see `domain.importer.writer`). Products are not:
+    a file with a product slug another worker has inserted waits for that
+    worker to commit. A failed file stops at its last committed batch, and does
+    not stop the others.
+    """
+    db = DB.instance()
+    async with db.session_factory() as session:
+        try:
+            await db.create_all()
+            await create_locales(session)
+            await session.commit()
+        finally:
+            await invalidate_counts(session)
+    await db.engine.dispose()
+
+    loop = asyncio.get_running_loop()
+    report, failed, started = ImportReport(), [], perf_counter()
+    # Spawned rather than forked, so that workers do not share the parent's engine and connections.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            path: loop.run_in_executor(pool, import_file, path, batch_size, resume, validators) for path in paths
+        }
+        for path, future in futures.items():
+            try:
+                report += await future
+            except Exception as e:
+                logger.error("Error during import", path=str(path), error=str(e))
+                failed.append(path)
+
+    seconds = perf_counter() - started
+    logger.info(
+        "Data import completed",
+        files=len(paths),
+        failed=len(failed),
+        **report.as_log(),
+        seconds=round(seconds, 3),
+        **report.rates(seconds),
+    )
+    if failed:
+        raise RuntimeError(f"Could not import {', '.join(map(str, failed))}.")
+    return report
+
+
+def write_rejects(report: ImportReport, path: Path) -> None:
+    """Write the products `report` rejected to `path`, one JSON object per line."""
+    with open(path, "w") as file:
+        for reject in report.rejects:
+            file.write(json.dumps(asdict(reject)) + "\n")
+    logger.info("Rejected products written", path=str(path), count=len(report.rejects))
+
+
+def vendor_files(json_path: Path) -> list[Path]:
+    """The vendor file at `json_path`, or the `*.json` files in it if it is a directory."""
+    if json_path.is_dir():
+        return sorted(path for path in json_path.glob("*.json") if path.is_file())
+    if not json_path.is_file():
+        raise FileNotFoundError(f"File not found: {json_path}")
+    return [json_path]
 
-            if data:
-                vendors.append(data)
 
-    if len(vendors):
-        await import_data(vendors)
+async def setup_and_import():
+    """Set up database and import data."""
+    parser = argparse.ArgumentParser(description="Import vendor files, streaming them in batches of products.")
+    parser.add_argument(
+        "json_path",
+        nargs="?",
+        type=Path,
+        default=Path(__file__).parent.parent.parent.parent.parent / "vendor-data",
+        help="A vendor file, or a directory of them (default: vendor-data).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Products written per batch (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Files imported at once, each in its own process (default: 1).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Pick each file up after the last batch an earlier, failed import committed.",
+    )
+    parser.add_argument(
+        "--validators",
+        type=int,
+        default=1,
+        help="Processes validating batches while earlier ones are written, per importing process (default: 1; "
+        "0 validates in the importing process).",
+    )
+    parser.add_argument(
+        "--rejects",
+        type=Path,
+        help="Write the products that did not validate to this file, one JSON object per line.",
+    )
+    args = parser.parse_args()
+
+    if not (paths := vendor_files(args.json_path)):
+        return
+    if args.workers > 1:
+        workers = min(args.workers, len(paths))
+        report = await import_data_concurrently(paths, args.batch_size, workers, args.resume, args.validators)
+    else:
+        report = await import_data(paths, args.batch_size, args.resume, args.validators)
+    if args.rejects:
+        write_rejects(report, args.rejects)
 
 
 if __name__ == "__main__":
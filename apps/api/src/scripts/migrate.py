@@ -0,0 +1,53 @@
+"""
+Write the psql script bringing a database created before the latest schema changes up to date.
+
+New databases get every table, index, function and trigger from
+`DB.create_all()`. Databases created earlier are upgraded by the SQL files of
+`sql/migrations`, in the order of their names. Every migration is idempotent,
+so the whole script can be run again, e.g. after fixing what stopped it:
+
+    python src/scripts/migrate.py migrate.sql
+    psql -v ON_ERROR_STOP=1 -d coloragent -f migrate.sql
+
+The functions and triggers of a migration are not in its file: they are
+defined once, in the module whose `ddl_statements()` `create_all` runs too (see
+`TRIGGERS`), and written before the file, which may use them. The script is
+not one transaction: `0004_indexes.sql` builds its indexes CONCURRENTLY.
+"""
+
+import sys
+from pathlib import Path
+
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+from collections.abc import Callable
+
+from domain.catalog import triggers as catalog_triggers
+from domain.sync import triggers as sync_triggers
+
+
+MIGRATIONS_DIR = Path(__file__).parents[2] / "sql" / "migrations"
+
+"""Migrations and the statements creating their functions and triggers, written before their file."""
+TRIGGERS: dict[str, Callable[[], list[str]]] = {
+    "0003_product_catalog": catalog_triggers.ddl_statements,
+    "0005_sync": sync_triggers.ddl_statements,
+}
+
+
+def migration_script(path: Path) -> str:
+    """The SQL of the migration file `path`, preceded by its functions and triggers."""
+    statements = [statement.strip().rstrip(";") + ";" for statement in TRIGGERS.get(path.stem, list)()]
+    return "\n\n".join([f"-- {path.name}", *statements, path.read_text()])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output", type=Path, help="The psql script to write.")
+    parser.add_argument("--from", dest="start", help="Skip the migrations named before this one, e.g. 0005.")
+    args = parser.parse_args()
+    paths = [path for path in sorted(MIGRATIONS_DIR.glob("*.sql")) if args.start is None or path.name >= args.start]
+    args.output.write_text("\n".join(migration_script(path) for path in paths))
+    print(f"Wrote {len(paths)} migrations to {args.output}")
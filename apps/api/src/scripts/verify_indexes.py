@@ -0,0 +1,236 @@
+"""
+Check with EXPLAIN that the queries behind each route use the indexes meant for them.
+
+Statements are built the way the routes build them, from the same services and
+filters, and explained without being run. On a small or freshly seeded database
+the planner rightly prefers sequential scans, so they are discouraged with
+`enable_seqscan = off` unless `--as-planned` is given; the check is then whether
+a usable index exists, not whether it wins on this data. Run it against an
+analyzed database with some volume: with a few dozen rows a full scan of the
+primary key still beats a selective index.
+
+Exits with status 1 when a query does not use its index.
+"""
+
+import sys
+from pathlib import Path
+
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+from core.database import DB, explain
+from core.logger import get_logger
+from domain.catalog.models import ProductCatalog
+from domain.enums import ColorRangeEnum
+from domain.filters import ArrayFilter, ArrayMatch, KeysetPagination
+from domain.pagination import filtered_statement
+from domain.product.models import Product
+from domain.product_line.models import ProductLine
+from domain.product_swatch.models import ProductSwatch
+from domain.product_variant.models import ProductVariant
+from domain.search.schemas import SearchType
+from domain.search.service import pg_trgm_installed
+from domain.services import ServicesContainer
+from domain.sync.models import SyncTombstone
+from domain.tag.models import Tag
+from domain.vendor.models import Vendor
+from sqlalchemy import select, text
+
+
+logger = get_logger(__name__)
+
+SAMPLE_ID = UUID("01900000-0000-7000-8000-000000000000")
+SINCE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+PAGE = 20
+
+
+@dataclass
+class Check:
+    route: str
+    indexes: set[str]
+    build: Callable[[ServicesContainer], Any]
+    needs_trigrams: bool = False
+
+
+def _sync(model) -> Any:
+    return select(model).where(model.updated_at > SINCE).order_by(model.updated_at, model.id).limit(PAGE + 1)
+
+
+CHECKS = [
+    Check(
+        "GET /products",
+        {"ix_products_active_name_id"},
+        lambda c: filtered_statement(c.provide_products).order_by(Product.name, Product.id).limit(PAGE + 1),
+    ),
+    Check(
+        "GET /products?cursor=",
+        {"ix_products_active_name_id"},
+        lambda c: KeysetPagination(PAGE, ["M", str(SAMPLE_ID)]).append_to_statement(
+            filtered_statement(c.provide_products), Product
+        ),
+    ),
+    Check(
+        "GET /products?color_range=",
+        {"ix_products_color_range"},
+        lambda c: filtered_statement(
+            c.provide_products, ArrayFilter("color_range", [ColorRangeEnum.Red], ArrayMatch.all)
+        ),
+    ),
+    Check(
+        "GET /products?tag=",
+        {"ix_product_tag_association_tag_id"},
+        lambda c: filtered_statement(c.provide_products, Product.tags.any(name="Metallic")),
+    ),
+    Check(
+        "GET /products (variants)",
+        {"ix_product_variants_product_id_locale_id"},
+        lambda c: select(ProductVariant).where(ProductVariant.product_id.in_([SAMPLE_ID])),
+    ),
+    Check(
+        "GET /products (swatch)",
+        {"uq_product_swatches_product_id"},
+        lambda c: select(ProductSwatch).where(ProductSwatch.product_id.in_([SAMPLE_ID])),
+    ),
+    Check(
+        "GET /product-variants?product_id=",
+        {"ix_product_variants_product_id_locale_id"},
+        lambda c: filtered_statement(c.provide_product_variants, ProductVariant.product_id == SAMPLE_ID),
+    ),
+    Check(
+        "GET /product-variants (by locale)",
+        {"ix_product_variants_product_id_locale_id"},
+        lambda c: filtered_statement(
+            c.provide_product_variants,
+            ProductVariant.product_id == SAMPLE_ID,
+            ProductVariant.locale_id == SAMPLE_ID,
+        ),
+    ),
+    Check(
+        "GET /product-swatch?product_id=",
+        {"uq_product_swatches_product_id"},
+        lambda c: filtered_statement(c.provide_product_swatches, ProductSwatch.product_id == SAMPLE_ID),
+    ),
+    Check(
+        "GET /vendor",
+        {"ix_vendors_active_name_id"},
+        lambda c: filtered_statement(c.provide_vendors).order_by(Vendor.name).limit(PAGE + 1),
+    ),
+    Check(
+        "GET /vendor?cursor=",
+        {"ix_vendors_active_name_id"},
+        lambda c: KeysetPagination(PAGE, ["M", str(SAMPLE_ID)]).append_to_statement(
+            filtered_statement(c.provide_vendors), Vendor
+        ),
+    ),
+    Check(
+        "GET /vendor (product lines)",
+        {"ix_product_lines_vendor_id"},
+        lambda c: select(ProductLine).where(ProductLine.vendor_id.in_([SAMPLE_ID])),
+    ),
+    Check(
+        "GET /product-lines",
+        {"ix_product_lines_active_name_id"},
+        lambda c: filtered_statement(c.provide_product_lines).order_by(ProductLine.name).limit(PAGE + 1),
+    ),
+    Check(
+        "GET /product-lines?vendor_id=",
+        {"ix_product_lines_vendor_id"},
+        lambda c: filtered_statement(c.provide_product_lines, ProductLine.vendor_id == SAMPLE_ID),
+    ),
+    Check(
+        "GET /product-lines (products)",
+        {"ix_products_product_line_id"},
+        lambda c: select(Product).where(Product.product_line_id.in_([SAMPLE_ID])),
+    ),
+    Check(
+        "GET /catalog",
+        {"ix_product_catalog_name_id"},
+        lambda c: filtered_statement(c.provide_catalog).order_by(ProductCatalog.name).limit(PAGE + 1),
+    ),
+    Check(
+        "GET /catalog?vendor=",
+        {"ix_product_catalog_vendor_slug"},
+        lambda c: filtered_statement(c.provide_catalog, ProductCatalog.vendor_slug == "citadel"),
+    ),
+    Check(
+        "GET /search?types=product",
+        {"ix_products_name_trgm", "ix_products_search_vector"},
+        lambda c: c.provide_search._select(SearchType.product, "blue", True, PAGE),
+        needs_trigrams=True,
+    ),
+    Check("sync products", {"ix_products_updated_at"}, lambda c: _sync(Product)),
+    Check("sync vendors", {"ix_vendors_updated_at"}, lambda c: _sync(Vendor)),
+    Check("sync product lines", {"ix_product_lines_updated_at"}, lambda c: _sync(ProductLine)),
+    Check("sync product variants", {"ix_product_variants_updated_at"}, lambda c: _sync(ProductVariant)),
+    Check("sync tags", {"ix_tags_updated_at"}, lambda c: _sync(Tag)),
+    Check("sync swatches", {"ix_product_swatches_updated_at"}, lambda c: _sync(ProductSwatch)),
+    Check(
+        "sync tombstones",
+        {"ix_sync_tombstones_deleted_at"},
+        lambda c: select(SyncTombstone)
+        .where(SyncTombstone.deleted_at > SINCE)
+        .order_by(SyncTombstone.deleted_at, SyncTombstone.id)
+        .limit(PAGE + 1),
+    ),
+]
+
+
+def index_names(plan: dict[str, Any]) -> Iterator[str]:
+    """Names of the indexes read anywhere in a JSON plan."""
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from index_names(child)
+
+
+async def verify_indexes(as_planned: bool = False) -> bool:
+    db = DB.instance()
+    failures = 0
+
+    async with db.session_factory() as session:
+        try:
+            if not as_planned:
+                # Rolled back with the transaction below.
+                await session.execute(text("SET LOCAL enable_seqscan = off"))
+            trigrams = await pg_trgm_installed(session)
+            container = ServicesContainer(session)
+            for check in CHECKS:
+                if check.needs_trigrams and not trigrams:
+                    print(f"SKIP  {check.route}: pg_trgm is not installed")
+                    continue
+
+                plan = await explain(session, check.build(container))
+
+                used = set(index_names(plan))
+                if used & check.indexes:
+                    print(f"PASS  {check.route}: {', '.join(sorted(used & check.indexes))}")
+                else:
+                    failures += 1
+                    found = ", ".join(sorted(used)) or plan["Node Type"]
+                    print(f"FAIL  {check.route}: expected {' or '.join(sorted(check.indexes))}, got {found}")
+        finally:
+            await session.rollback()
+            await db.engine.dispose()
+
+    if failures:
+        logger.error(f"{failures} of {len(CHECKS)} queries do not use their index")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--as-planned",
+        action="store_true",
+        help="Leave sequential scans enabled and report what the planner picks on the current data.",
+    )
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(verify_indexes(as_planned=args.as_planned)) else 1)
@@ -0,0 +1,51 @@
+"""Tests for the vectorized colour conversions."""
+
+import numpy as np
+import pytest
+from utils.color.arrays import hex_to_rgb_array, rgb_to_hex_array, rgb_to_oklab_array, rgb_to_oklch_array
+from utils.color.formatters import to_oklab, to_oklch
+
+
+def test_hex_to_rgb_array():
+    rgb, valid = hex_to_rgb_array(["#ff8000", "00FF7f", "#fff", "abc"])
+
+    assert rgb.tolist() == [[255, 128, 0], [0, 255, 127], [255, 255, 255], [170, 187, 204]]
+    assert valid.tolist() == [True, True, True, True]
+
+
+@pytest.mark.parametrize(
+    "color", ["#ggg", "#12345", "#1234567", "#ff 000", " #ff0000", "", None, 0xFF0000, [255, 0, 0]]
+)
+def test_invalid_hex_is_black_and_invalid(color):
+    rgb, valid = hex_to_rgb_array(["#ffffff", color])
+
+    assert rgb.tolist() == [[255, 255, 255], [0, 0, 0]]
+    assert valid.tolist() == [True, False]
+
+
+def test_no_colors():
+    rgb, valid = hex_to_rgb_array([])
+
+    assert rgb.shape == (0, 3)
+    assert valid.shape == (0,)
+
+
+def test_rgb_to_hex_array_round_trips():
+    colors = ["#000000", "#ffffff", "#0a7f3c", "#c0ffee"]
+
+    assert rgb_to_hex_array(hex_to_rgb_array(colors)[0]) == colors
+
+
+@pytest.mark.parametrize("rgb", [(0, 0, 0), (255, 255, 255), (255, 0, 0), (10, 127, 60), (128, 128, 128), (3, 5, 250)])
+def test_conversions_match_the_scalar_ones(rgb):
+    assert rgb_to_oklab_array(np.array([rgb]))[0] == pytest.approx(to_oklab(rgb), abs=1e-12)
+    # The hue of a grey is rounding noise, and differs in the last digits.
+    assert rgb_to_oklch_array(np.array([rgb]))[0] == pytest.approx(to_oklch(rgb), abs=1e-5)
+
+
+def test_oklch_hue_is_in_degrees_from_0_to_360():
+    rgb, _ = hex_to_rgb_array(["#ff0000", "#00ff00", "#0000ff", "#a00054", "#9b0050"])
+    hues = rgb_to_oklch_array(rgb)[:, 2]
+
+    assert np.all((hues >= 0) & (hues < 360))
+    assert hues[3] > 359 and hues[4] < 1
@@ -0,0 +1,112 @@
+"""Tests for product facet counts, against the configured database."""
+
+import pytest
+import pytest_asyncio
+from core.config import settings
+from domain.locale.models import Locale
+from domain.product.facets import _aggregate, facet_statement
+from domain.product.models import Product
+from domain.product.service import ProductService
+from domain.product_line.models import ProductLine
+from domain.product_variant.models import ProductVariant
+from domain.vendor.models import Vendor
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from src.api.main import app  # noqa: F401  (maps every model)
+from uuid_utils.compat import uuid7
+
+
+@pytest_asyncio.fixture
+async def session():
+    """A session whose writes are rolled back, or a skip when the database is unreachable."""
+    engine = create_async_engine(settings.db.DB_URL, poolclass=NullPool)
+    try:
+        connection = await engine.connect()
+    except (OSError, DBAPIError) as e:
+        await engine.dispose()
+        pytest.skip(f"Database unavailable: {e}")
+    transaction = await connection.begin()
+    try:
+        yield AsyncSession(bind=connection)
+    finally:
+        await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
+
+
+async def _product(session: AsyncSession, **variant) -> Product:
+    ids = {name: uuid7() for name in ("vendor", "line", "product", "locale")}
+    await session.execute(
+        insert(Vendor).values(
+            id=ids["vendor"],
+            name="Facet Test Vendor",
+            slug="facet-test-vendor",
+            url="",
+            platform="",
+            description="",
+            pdp_slug="",
+            plp_slug="",
+        )
+    )
+    await session.execute(
+        insert(ProductLine).values(
+            id=ids["line"],
+            vendor_id=ids["vendor"],
+            name="Facet Test Line",
+            slug="facet-test-line",
+            marketing_name="",
+            product_line_type="Mixed",
+        )
+    )
+    await session.execute(
+        insert(Product).values(
+            id=ids["product"],
+            product_line_id=ids["line"],
+            name="Facet Test Paint",
+            slug="facet-test-paint",
+            color_range=[],
+            product_type=[],
+        )
+    )
+    await session.execute(
+        insert(Locale).values(
+            id=ids["locale"],
+            country_name="Testland",
+            country_code="ZZ",
+            currency_code="ZZZ",
+            currency_symbol="z",
+            language_code="zz",
+            locale="zz_ZZ",
+        )
+    )
+    values = {
+        "display_name": "",
+        "marketing_name": "",
+        "sku": "facet-test",
+        "image_url": "",
+        "packaging": "Pot",
+        "price": 100,
+        "product_url": "",
+        "vendor_color_range": [],
+        "vendor_product_type": [],
+        **variant,
+    }
+    await session.execute(
+        insert(ProductVariant).values(id=uuid7(), product_id=ids["product"], locale_id=ids["locale"], **values)
+    )
+    return ids["product"]
+
+
+@pytest.mark.asyncio
+async def test_facets_leave_out_null_variant_values(session):
+    product_id = await _product(session, opacity=None, viscosity="Low")
+    statement = facet_statement(select(Product).where(Product.id == product_id))
+
+    facets = await _aggregate(ProductService(session=session), statement)
+
+    assert facets.total == 1
+    assert facets.opacity == []
+    assert [(v.value, v.count) for v in facets.viscosity] == [("Low", 1)]
+    assert [v.value for v in facets.vendor] == ["facet-test-vendor"]
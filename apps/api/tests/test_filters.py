@@ -0,0 +1,98 @@
+"""Tests for keyset (cursor) pagination."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+from domain.catalog.models import ProductCatalog
+from domain.filters import KeysetPagination, decode_cursor, encode_cursor, provide_cursor_pagination
+from exceptions import BadRequestException
+from fastapi.exceptions import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from src.api.main import app  # noqa: F401  (maps every model)
+
+
+ID = UUID("01900000-0000-7000-8000-000000000001")
+
+
+class Item(BaseModel):
+    name: str
+    id: UUID
+
+
+def test_cursor_round_trip():
+    updated_at = datetime(2025, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)
+    cursor = encode_cursor(['Crimson, "deep"', ID, updated_at, 42, None])
+
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert decode_cursor(cursor) == ['Crimson, "deep"', str(ID), str(updated_at), 42, None]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        "bm90IGpzb24",  # not JSON
+        "__8",  # not UTF-8
+        "eyJhIjogMX0",  # a JSON object, not a list
+    ],
+)
+def test_malformed_cursors(cursor):
+    with pytest.raises(ValueError, match="Malformed cursor"):
+        decode_cursor(cursor)
+
+
+def sql(pagination: KeysetPagination) -> str:
+    statement = pagination.append_to_statement(select(ProductCatalog), ProductCatalog)
+    compiled = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return " ".join(str(compiled).split())
+
+
+def test_first_page_orders_and_fetches_one_more_row():
+    statement = sql(KeysetPagination(limit=10))
+
+    assert "WHERE" not in statement
+    assert statement.endswith("ORDER BY product_catalog.name, product_catalog.id LIMIT 11")
+
+
+def test_next_page_seeks_past_the_cursor():
+    statement = sql(KeysetPagination(limit=10, after=decode_cursor(encode_cursor(["Red", ID]))))
+
+    assert f"WHERE (product_catalog.name, product_catalog.id) > ('Red', '{ID}')" in statement
+
+
+@pytest.mark.parametrize("after", [["Red"], ["Red", "not a uuid"]])
+def test_cursor_of_another_sort_order_or_type_is_a_bad_request(after):
+    with pytest.raises(BadRequestException):
+        sql(KeysetPagination(limit=10, after=after))
+
+
+def test_to_page_trims_the_look_ahead_row():
+    rows = [SimpleNamespace(name=f"Paint {i}", id=UUID(int=i)) for i in range(3)]
+
+    page = KeysetPagination(limit=2).to_page(rows, schema_type=Item)
+
+    assert [item.name for item in page.items] == ["Paint 0", "Paint 1"]
+    assert page.has_more
+    assert decode_cursor(page.next_cursor) == ["Paint 1", str(UUID(int=1))]
+
+
+def test_last_page_has_no_cursor():
+    page = KeysetPagination(limit=2).to_page([SimpleNamespace(name="Paint", id=ID)], schema_type=Item)
+
+    assert not page.has_more
+    assert page.next_cursor is None
+
+
+def test_provide_cursor_pagination():
+    limit_offset = SimpleNamespace(limit=5, offset=0)
+
+    assert provide_cursor_pagination(limit_offset, None) is None
+    assert provide_cursor_pagination(limit_offset, "") == KeysetPagination(limit=5)
+    assert provide_cursor_pagination(limit_offset, encode_cursor(["Red", ID])).after == ["Red", str(ID)]
+    with pytest.raises(HTTPException) as error:
+        provide_cursor_pagination(limit_offset, "!!")
+    assert error.value.status_code == 400
@@ -0,0 +1,212 @@
+"""Tests for the SQL files of `generate_sql.py`, the merge against the configured database."""
+
+import io
+import re
+from enum import Enum
+
+import pytest
+import pytest_asyncio
+from core.config import settings
+from domain.importer.rows import PRODUCT, PRODUCT_LINE, VENDOR, chunks, validate
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from src.api.main import app  # noqa: F401  (maps every model)
+from src.scripts.generate_sql import array_literal, copy_value, merge_sql, write_chunk, write_setup
+
+
+class Finish(Enum):
+    MATTE = "matte finish"
+
+
+@pytest.mark.parametrize(
+    ("value", "copied"),
+    [
+        (None, "\\N"),
+        (True, "t"),
+        (False, "f"),
+        (12.5, "12.5"),
+        ("tab\there", "tab\\there"),
+        ("new\nline\r", "new\\nline\\r"),
+        ("back\\slash", "back\\\\slash"),
+        ('it\'s "quoted"', 'it\'s "quoted"'),
+        (Finish.MATTE, "MATTE"),
+        ({"a": "b\tc"}, '{"a": "b\\\\tc"}'),
+    ],
+)
+def test_copy_value(value, copied):
+    assert copy_value(value) == copied
+
+
+@pytest.mark.parametrize(
+    ("values", "literal"),
+    [
+        ([], "{}"),
+        ([1, 2.5, None], "{1,2.5,NULL}"),
+        ([Finish.MATTE, "Red"], '{"MATTE","Red"}'),
+        (['say "hi"', "a\\b", "a,b", "NULL"], '{"say \\"hi\\"","a\\\\b","a,b","NULL"}'),
+    ],
+)
+def test_array_literal(values, literal):
+    assert array_literal(values) == literal
+
+
+def test_arrays_are_escaped_for_copy_after_quoting():
+    assert copy_value(["a\\b", "tab\t"]) == '{"a\\\\\\\\b","tab\\t"}'
+
+
+def test_merge_is_one_transaction_that_drops_the_staging_tables():
+    sql = merge_sql()
+
+    assert sql.split("\n\n")[1] == "BEGIN;" and sql.endswith("COMMIT;\n")
+    assert sql.index("INSERT INTO vendors") < sql.index("INSERT INTO product_lines") < sql.index("INSERT INTO products")
+    assert sql.index("DROP TABLE import_stage_vendors") > sql.index("INSERT INTO product_analogous_association")
+
+
+def test_merge_leaves_products_of_other_vendors_alone():
+    products = re.search(r"INSERT INTO products AS t .*?;", merge_sql(), re.DOTALL).group()
+
+    assert "(SELECT vendor_id FROM product_lines WHERE id = t.product_line_id)" in products
+    assert "= (SELECT vendor_id FROM product_lines WHERE id = excluded.product_line_id)" in products
+
+
+def test_merge_removes_variants_no_longer_staged():
+    assert (
+        "UPDATE product_variants t SET is_deleted = TRUE, deleted_at = now(), updated_at = now()\n"
+        "FROM import_merged_products mp WHERE t.product_id = mp.id AND t.is_deleted IS NOT TRUE\n"
+        "AND NOT EXISTS (SELECT 1 FROM import_merged_variants v WHERE "
+        "(t.product_id, t.locale_id, t.sku) = (v.product_id, v.locale_id, v.sku))"
+    ) in merge_sql()
+
+
+@pytest.mark.parametrize(
+    ("association", "column"),
+    [("product_tag_association", "tag_id"), ("product_analogous_association", "analogous_id")],
+)
+def test_merge_replaces_the_links_of_merged_products(association, column):
+    sql = merge_sql()
+
+    assert f"DELETE FROM {association} a USING import_merged_products mp" in sql
+    assert f"INSERT INTO {association} (product_id, {column})" in sql
+
+
+def vendor_file(vendor: str, sku: str, tags: list[str]) -> list[tuple[str, dict]]:
+    variant = {
+        "display_name": "Gen Red",
+        "marketing_name": "Gen Red",
+        "sku": sku,
+        "vendor_color_range": ["Red"],
+        "vendor_product_type": ["Base"],
+        "image_url": "",
+        "packaging": "Pot",
+        "price": 100,
+        "currency_code": "ZZZ",
+        "currency_symbol": "z",
+        "country_code": "ZZ",
+        "language_code": "zz",
+        "product_url": "",
+    }
+    return [
+        (
+            VENDOR,
+            {
+                "vendor_name": vendor,
+                "vendor_url": "",
+                "slug": vendor,
+                "platform": "",
+                "description": "",
+                "pdp_slug": "",
+                "plp_slug": "",
+            },
+        ),
+        (PRODUCT_LINE, {"product_line_name": f"{vendor} line"}),
+        (
+            PRODUCT,
+            {
+                "name": "Gen Red",
+                "color_range": ["Red"],
+                "product_type": ["Base"],
+                "swatch": {"hex_color": "#ff0000"},
+                "variants": [variant],
+                "tags": tags,
+            },
+        ),
+    ]
+
+
+def generated(records: list[tuple[str, dict]]) -> str:
+    """The setup, data and merge files of `records` (data as `INSERT`s), without their transactions."""
+    file = io.StringIO()
+    write_setup(file)
+    [batch] = chunks(records)
+    batch = validate(batch)
+    assert batch.rejects == []
+    write_chunk(file, batch, "values")
+    file.write(merge_sql())
+    # Dropped on commit otherwise.
+    file.write("DROP TABLE import_merged_products, import_merged_variants;\n")
+    return file.getvalue().replace("BEGIN;\n", "").replace("COMMIT;\n", "")
+
+
+@pytest_asyncio.fixture
+async def connection():
+    """A driver connection in a transaction that is rolled back, or a skip when the database is unreachable."""
+    engine = create_async_engine(settings.db.DB_URL, poolclass=NullPool)
+    try:
+        connection = await engine.connect()
+    except (OSError, DBAPIError) as e:
+        await engine.dispose()
+        pytest.skip(f"Database unavailable: {e}")
+    transaction = await connection.begin()
+    try:
+        await connection.execute(
+            text(
+                "INSERT INTO locales (id, country_name, country_code, currency_code, currency_symbol, language_code, "
+                "locale) VALUES (gen_random_uuid(), 'Testland', 'ZZ', 'ZZZ', 'z', 'zz', 'zz_ZZ')"
+            )
+        )
+        yield (await connection.get_raw_connection()).driver_connection
+    finally:
+        await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_copy_values_load_unchanged(connection):
+    await connection.execute("CREATE TEMPORARY TABLE copied (s text, a text[], n int)")
+    values = ["tab\t, new\nline\r, back\\slash, 'quotes\"", ["a\\b", 'say "hi"', None, "NULL", "x,y"], None]
+    data = "\t".join(map(copy_value, values)) + "\n"
+
+    await connection.copy_to_table("copied", source=io.BytesIO(data.encode()))
+
+    assert list(await connection.fetchrow("SELECT * FROM copied")) == values
+
+
+PRODUCT_STATE = """
+SELECT v.slug, array_agg(DISTINCT pv.sku || ':' || pv.is_deleted), array_agg(DISTINCT t.name)
+FROM products p JOIN product_lines pl ON pl.id = p.product_line_id JOIN vendors v ON v.id = pl.vendor_id
+JOIN product_variants pv ON pv.product_id = p.id
+LEFT JOIN product_tag_association a ON a.product_id = p.id LEFT JOIN tags t ON t.id = a.tag_id
+WHERE p.slug = 'gen-red' GROUP BY v.slug
+"""
+
+
+async def product_state(connection) -> list:
+    """The vendor of the merged product, its variants with whether they are deleted, and its tags."""
+    return list(await connection.fetchrow(PRODUCT_STATE))
+
+
+@pytest.mark.asyncio
+async def test_merge(connection):
+    await connection.execute(generated(vendor_file("gen-vendor", "gen-1", ["Gen Matte"])))
+    assert await product_state(connection) == ["gen-vendor", ["gen-1:false"], ["Gen Matte"]]
+
+    # A re-import replaces the variants and tags.
+    await connection.execute(generated(vendor_file("gen-vendor", "gen-2", ["Gen Gloss"])))
+    assert await product_state(connection) == ["gen-vendor", ["gen-1:true", "gen-2:false"], ["Gen Gloss"]]
+
+    # Another vendor's product of the same slug is left alone.
+    await connection.execute(generated(vendor_file("gen-other", "gen-3", ["Gen Other"])))
+    assert await product_state(connection) == ["gen-vendor", ["gen-1:true", "gen-2:false"], ["Gen Gloss"]]
@@ -0,0 +1,124 @@
+"""Tests for the swatch colours derived from their hex colour."""
+
+import numpy as np
+import pytest
+from domain.importer.colors import _round, derive_swatches
+
+
+RED = {"hex_color": "#ff0000", "rgb_color": [255, 0, 0], "oklch_color": [0.628, 0.2577, 29.23]}
+
+
+def derive(**swatch):
+    [derived] = derive_swatches([swatch])
+    return derived
+
+
+def test_derives_every_color_from_the_hex_color():
+    derived = derive(hex_color="#FF0000")
+
+    assert derived.error is None
+    assert derived.corrected == []
+    assert derived.values == {
+        "hex_color": "#ff0000",
+        "rgb_color": [255, 0, 0],
+        "oklch_color": [0.628, 0.2577, 29.23],
+        "gradient_start": [0.628, 0.2577, 29.23],
+        "gradient_end": [0.628, 0.2577, 29.23],
+    }
+
+
+def test_three_digit_hex():
+    assert derive(hex_color="#f00").values == derive(hex_color="#ff0000").values
+
+
+@pytest.mark.parametrize(
+    ("hex_color", "error"),
+    [
+        ("#ff00zz", "Invalid hex color '#ff00zz'."),
+        ("#ff00", "Invalid hex color '#ff00'."),
+        (None, "The swatch has no hex color."),
+    ],
+)
+def test_invalid_hex_is_an_error(hex_color, error):
+    assert derive(hex_color=hex_color) == ({}, [], error)
+
+
+def test_errors_leave_the_other_swatches_alone():
+    derived = derive_swatches([{"hex_color": "nope"}, RED])
+
+    assert derived[0].error is not None
+    assert derived[1].values["rgb_color"] == [255, 0, 0]
+
+
+def test_no_swatches():
+    assert derive_swatches([]) == []
+
+
+def test_supplied_colors_within_rounding_are_kept():
+    assert derive(**RED, gradient_start=[0.6282, 0.2575, 29.9]).corrected == []
+
+
+def test_supplied_colors_that_disagree_are_corrected():
+    derived = derive(hex_color="#ff0000", rgb_color=[250, 0, 0], oklch_color=[0.628, 0.2577, 31.0])
+
+    assert derived.corrected == ["rgb_color", "oklch_color"]
+    assert derived.values["rgb_color"] == [255, 0, 0]
+    assert derived.values["oklch_color"] == [0.628, 0.2577, 29.23]
+
+
+@pytest.mark.parametrize("value", [[255, 0], ["255", 0, 0], [True, False, False], "rgb(255, 0, 0)"])
+def test_malformed_supplied_colors_are_corrected(value):
+    assert derive(hex_color="#ff0000", rgb_color=value).corrected == ["rgb_color"]
+
+
+def test_greys_have_no_hue():
+    derived = derive(hex_color="#808080", oklch_color=[0.5999, 0.0, 217.0])
+
+    assert derived.values["oklch_color"] == [0.5999, 0.0, 0.0]
+    # Any hue of a grey is as good as another.
+    assert derived.corrected == []
+
+
+@pytest.mark.parametrize(
+    ("hex_color", "supplied_hue"),
+    [("#9b0050", 359.5), ("#a00054", 0.2)],  # derived hues: 0.09 and 359.51
+)
+def test_hues_are_compared_around_the_circle(hex_color, supplied_hue):
+    derived_oklch = derive(hex_color=hex_color).values["oklch_color"]
+
+    assert derive(hex_color=hex_color, oklch_color=[*derived_oklch[:2], supplied_hue]).corrected == []
+
+
+def test_hues_further_apart_across_zero_are_corrected():
+    derived_oklch = derive(hex_color="#9b0050").values["oklch_color"]
+
+    assert derive(hex_color="#9b0050", oklch_color=[*derived_oklch[:2], 358.5]).corrected == ["oklch_color"]
+
+
+def test_stored_hue_is_never_360():
+    rounded = _round(np.array([[0.5, 0.1, 359.996], [0.5, 0.1, 360.0], [0.5, 0.00004, 120.0]]))
+
+    assert rounded[:, 2].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_own_gradients_are_kept():
+    derived = derive(**RED, gradient_start=[0.9, 0.01, 80.0], gradient_end=[0.2, 0.05, 300.0])
+
+    assert derived.values["gradient_start"] == [0.9, 0.01, 80.0]
+    assert derived.values["gradient_end"] == [0.2, 0.05, 300.0]
+    assert derived.corrected == []
+
+
+def test_gradients_copied_from_the_oklch_color_follow_its_correction():
+    wrong = [0.7, 0.1, 100.0]
+    derived = derive(hex_color="#ff0000", oklch_color=wrong, gradient_start=wrong, gradient_end=wrong)
+
+    assert derived.values["gradient_start"] == derived.values["gradient_end"] == [0.628, 0.2577, 29.23]
+    assert derived.corrected == ["oklch_color"]
+
+
+def test_invalid_gradients_are_corrected():
+    derived = derive(**RED, gradient_start=[1.5, 0.1, 20.0], gradient_end=[0.5, 0.1])
+
+    assert derived.values["gradient_start"] == derived.values["gradient_end"] == [0.628, 0.2577, 29.23]
+    assert derived.corrected == ["gradient_start", "gradient_end"]
@@ -0,0 +1,294 @@
+"""Tests for vendor imports run as background jobs."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from arq import Retry
+from core.config import settings
+from domain.importer import jobs
+from domain.importer.engine import ImportReport
+from domain.importer.jobs import ImportProgress, import_chunk, split_vendor_file, vendor_data_file
+from domain.importer.rows import PRODUCT, PRODUCT_LINE, VENDOR
+from domain.importer.schemas import ImportStatus
+from exceptions import BadRequestException, NotFoundException
+from src.api.main import app  # noqa: F401  (maps every model)
+
+
+VENDOR_RECORD = {
+    "vendor_name": "Vendor",
+    "vendor_url": "",
+    "slug": "vendor",
+    "platform": "",
+    "description": "",
+    "pdp_slug": "",
+    "plp_slug": "",
+}
+
+
+def split(records: list[tuple[str, dict]], chunk_size: int, monkeypatch) -> tuple[list, list, dict, ImportReport]:
+    monkeypatch.setattr(settings.importer, "CHUNK_SIZE", chunk_size)
+    parents, keys, report = [], {"vendors": set(), "product_lines": set(), "products": set()}, ImportReport()
+    chunks = list(split_vendor_file(records, parents, keys, report))
+    return chunks, parents, keys, report
+
+
+def names(chunk: dict) -> tuple[str, list[str]]:
+    [line] = chunk["product_lines"]
+    return line["product_line_name"], [product["name"] for product in line["products"]]
+
+
+def test_split_into_chunks_of_one_product_line(monkeypatch):
+    records = [
+        (VENDOR, VENDOR_RECORD),
+        (PRODUCT_LINE, {"product_line_name": "Line A"}),
+        *((PRODUCT, {"name": f"Red {i}"}) for i in range(5)),
+        (PRODUCT_LINE, {"product_line_name": "Line B"}),
+        (PRODUCT, {"name": "Blue"}),
+        (PRODUCT_LINE, {"product_line_name": "Empty"}),
+    ]
+
+    chunks, parents, keys, report = split(records, 2, monkeypatch)
+
+    assert [names(chunk) for chunk in chunks] == [
+        ("Line A", ["Red 0", "Red 1"]),
+        ("Line A", ["Red 2", "Red 3"]),
+        ("Line A", ["Red 4"]),
+        ("Line B", ["Blue"]),
+    ]
+    assert all(chunk["slug"] == "vendor" for chunk in chunks)
+    assert parents == records[:2] + [records[7], records[9]]
+    assert keys == {
+        "vendors": {"vendor"},
+        "product_lines": {"line-a", "line-b", "empty"},
+        "products": {"red-0", "red-1", "red-2", "red-3", "red-4", "blue"},
+    }
+    assert report.products_skipped == 0
+
+
+def test_split_passes_over_repeats(monkeypatch):
+    records = [
+        (VENDOR, VENDOR_RECORD),
+        (PRODUCT_LINE, {"product_line_name": "Line A"}),
+        (PRODUCT, {"name": "Red"}),
+        (PRODUCT_LINE, {"product_line_name": "Line B"}),
+        (PRODUCT, {"name": "Red"}),
+        (PRODUCT, {"name": "Blue"}),
+        # A repeated product line is passed over along with its products.
+        (PRODUCT_LINE, {"product_line_name": "Line A"}),
+        (PRODUCT, {"name": "Green"}),
+    ]
+
+    chunks, parents, keys, report = split(records, 10, monkeypatch)
+
+    assert [names(chunk) for chunk in chunks] == [("Line A", ["Red"]), ("Line B", ["Blue"])]
+    assert [kind for kind, _ in parents] == [VENDOR, PRODUCT_LINE, PRODUCT_LINE]
+    assert keys["products"] == {"red", "blue"}
+    assert report.products_skipped == 1
+
+
+@pytest.fixture
+def vendor_data(tmp_path: Path, monkeypatch) -> Path:
+    directory = tmp_path / "vendor-data"
+    (directory / "nested").mkdir(parents=True)
+    (directory / "nested" / "vendor.json").write_text("{}")
+    (tmp_path / "secret.json").write_text("{}")
+    monkeypatch.setattr(settings.importer, "VENDOR_DATA_DIR", str(directory))
+    return directory
+
+
+def test_vendor_data_file(vendor_data):
+    assert vendor_data_file("nested/vendor.json") == vendor_data / "nested" / "vendor.json"
+    assert vendor_data_file("nested/../nested/vendor.json") == vendor_data / "nested" / "vendor.json"
+
+
+@pytest.mark.parametrize("name", ["../secret.json", "nested/../../secret.json", "/etc/passwd", "link.json"])
+def test_vendor_data_file_out_of_the_directory(vendor_data, name):
+    (vendor_data / "link.json").symlink_to(vendor_data.parent / "secret.json")
+
+    with pytest.raises(BadRequestException):
+        vendor_data_file(name)
+
+
+@pytest.mark.parametrize("name", ["missing.json", "nested"])
+def test_vendor_data_file_missing(vendor_data, name):
+    with pytest.raises(NotFoundException):
+        vendor_data_file(name)
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def hset(self, key: str, mapping: dict) -> None:
+        self.commands.append(lambda: self.redis.hashes.setdefault(key, {}).update(mapping))
+
+    def expire(self, key: str, seconds: int) -> None:
+        self.commands.append(lambda: True)
+
+    def hincrby(self, key: str, name: str, amount: int) -> None:
+        def increment():
+            values = self.redis.hashes.setdefault(key, {})
+            values[name] = int(values.get(name, 0)) + amount
+            return values[name]
+
+        self.commands.append(increment)
+
+    async def execute(self) -> list:
+        return [command() for command in self.commands]
+
+
+class FakeRedis:
+    """The hashes and the queue of arq's Redis client, with hash values as it returns them."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict] = {}
+        self.jobs: list[tuple] = []
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def hgetall(self, key: str) -> dict[bytes, bytes]:
+        return {name.encode(): str(value).encode() for name, value in self.hashes.get(key, {}).items()}
+
+    async def enqueue_job(self, function: str, *args, _job_id: str) -> None:
+        self.jobs.append((function, *args))
+
+
+@pytest.fixture
+def redis() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.mark.asyncio
+async def test_progress_read_splits_counts_from_fields(redis):
+    progress = ImportProgress(redis, "import-1")
+    await progress.set(file="vendor.json", status=ImportStatus.importing, chunks_total=3)
+    await progress.add(chunks_done=2, chunks_finished=2, next_chunk=3, products_created=7)
+
+    read = await progress.read()
+
+    assert (read.id, read.file, read.status) == ("import-1", "vendor.json", ImportStatus.importing)
+    assert (read.chunks_total, read.chunks_done, read.chunks_failed) == (3, 2, 0)
+    assert read.counts == {"products_created": 7}
+
+
+@pytest.mark.asyncio
+async def test_progress_of_an_unknown_import(redis):
+    assert await ImportProgress(redis, "unknown").read() is None
+
+
+@pytest.mark.asyncio
+async def test_each_chunk_is_queued_once(redis):
+    progress = ImportProgress(redis, "import-1")
+
+    for _ in range(5):
+        await jobs._queue_next_chunk(redis, progress, 3)
+
+    assert redis.jobs == [("import_chunk", "import-1", index, 3) for index in range(3)]
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeImporter:
+    """Imports a chunk by running `importing`, and records the checkpoints discarded."""
+
+    importing = None
+    discarded: list[Path] = []
+
+    def __init__(self, session, *args, **kwargs):
+        pass
+
+    async def import_file(self, path: Path, **kwargs) -> ImportReport:
+        return await FakeImporter.importing()
+
+    async def discard_checkpoint(self, path: Path) -> None:
+        self.discarded.append(path)
+
+
+@pytest.fixture
+def importer(monkeypatch, tmp_path):
+    async def invalidate_counts(session):
+        pass
+
+    monkeypatch.setattr(jobs, "BulkImporter", FakeImporter)
+    monkeypatch.setattr(jobs, "invalidate_counts", invalidate_counts)
+    monkeypatch.setattr(settings.importer, "SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(settings.queue, "JOB_TRIES", 2)
+    monkeypatch.setattr(FakeImporter, "importing", None)
+    monkeypatch.setattr(FakeImporter, "discarded", [])
+    return FakeImporter
+
+
+async def started(redis: FakeRedis) -> None:
+    """Start import-1, with its first chunk queued."""
+    progress = ImportProgress(redis, "import-1")
+    await progress.set(file="vendor.json", status=ImportStatus.importing)
+    await progress.add(next_chunk=1)
+
+
+def context(redis: FakeRedis, attempt: int) -> dict:
+    db = type("FakeDB", (), {"session_factory": FakeSession})()
+    return {"redis": redis, "db": db, "job_try": attempt}
+
+
+@pytest.mark.asyncio
+async def test_last_chunk_queues_the_end_of_the_import(redis, importer):
+    async def importing():
+        return ImportReport(products_created=2)
+
+    importer.importing = importing
+    await started(redis)
+
+    counts = await import_chunk(context(redis, 1), "import-1", 0, 1)
+
+    assert counts == {"products_created": 2, "chunks_done": 1, "chunks_finished": 1}
+    assert redis.jobs == [("finish_import", "import-1")]
+
+
+@pytest.mark.asyncio
+async def test_chunk_timeout_is_a_failed_attempt(redis, importer, monkeypatch):
+    async def importing():
+        await asyncio.sleep(10)
+
+    importer.importing = importing
+    monkeypatch.setattr(settings.importer, "CHUNK_TIMEOUT", 0.01)
+    await started(redis)
+
+    with pytest.raises(Retry):
+        await import_chunk(context(redis, 1), "import-1", 0, 1)
+    counts = await import_chunk(context(redis, 2), "import-1", 0, 1)
+
+    assert counts == {"chunks_failed": 1, "chunks_finished": 1}
+    assert (await ImportProgress(redis, "import-1").read()).error == "Chunk 0 failed: timed out after 0.01 seconds"
+    assert importer.discarded == [jobs._chunk(jobs._spool("import-1"), 0)]
+    assert redis.jobs == [("finish_import", "import-1")]
+
+
+@pytest.mark.asyncio
+async def test_chunk_stopped_on_its_last_attempt_is_abandoned(redis, importer):
+    async def importing():
+        raise AssertionError("An abandoned chunk is not imported again.")
+
+    importer.importing = importing
+    await started(redis)
+
+    counts = await import_chunk(context(redis, 3), "import-1", 0, 2)
+
+    assert counts == {"chunks_failed": 1, "chunks_finished": 1}
+    assert importer.discarded == [jobs._chunk(jobs._spool("import-1"), 0)]
+    # The chain goes on with the next chunk.
+    assert redis.jobs == [("import_chunk", "import-1", 1, 2)]
@@ -0,0 +1,64 @@
+"""Tests for the batching of vendor file records."""
+
+from datetime import datetime, timezone
+from enum import Enum
+from uuid import UUID
+
+from domain.importer.rows import PRODUCT, PRODUCT_LINE, VENDOR, Position, chunks, content_hash
+from src.api.main import app  # noqa: F401  (maps every model)
+
+
+def records(*lines: tuple[str, list[str]]) -> list[tuple[str, dict]]:
+    vendor = {"vendor_name": "Vendor", "vendor_url": "", "slug": "vendor", "platform": "", "description": ""}
+    result = [(VENDOR, {**vendor, "pdp_slug": "", "plp_slug": ""})]
+    for line, products in lines:
+        result.append((PRODUCT_LINE, {"product_line_name": line}))
+        result += [(PRODUCT, {"name": name}) for name in products]
+    return result
+
+
+class Finish(Enum):
+    MATTE = "matte finish"
+    GLOSS = "gloss finish"
+
+
+def test_chunks_skip_products_repeated_in_a_later_batch():
+    batches = list(chunks(records(("Line A", ["Red", "Blue"]), ("Line B", ["Green", "Red"])), batch_size=2))
+
+    assert [[item.slug for item in batch.items] for batch in batches] == [["red", "blue"], ["green"]]
+    assert [batch.repeated for batch in batches] == [0, 1]
+    assert batches[-1].position == Position("vendor", "line-b", 2)
+
+
+def test_chunks_skip_repeats_of_products_passed_over_when_resuming():
+    resume_from = Position("vendor", "line-a", 1)
+    batches = list(chunks(records(("Line A", ["Red", "Blue", "Red"])), batch_size=10, resume_from=resume_from))
+
+    assert [batch.resumed for batch in batches] == [["red"]]
+    assert [item.slug for item in batches[0].items] == ["blue"]
+    assert batches[0].repeated == 1
+
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({"name": "Red", "price": 1.25}, "line") == content_hash({"price": 1.25, "name": "Red"}, "line")
+
+
+def test_content_hash_changes_with_any_value():
+    digest = content_hash({"name": "Red", "price": 1.25}, "line")
+
+    assert content_hash({"name": "Red", "price": 1.5}, "line") != digest
+    assert content_hash({"name": "Red", "price": 1.25}, "other line") != digest
+    assert content_hash({"name": "Red", "price": 1.25, "sku": None}, "line") != digest
+
+
+def test_content_hash_of_enums_is_by_name():
+    assert content_hash({"finish": Finish.MATTE}) == content_hash({"finish": "MATTE"})
+    assert content_hash({"finish": Finish.MATTE}) != content_hash({"finish": Finish.GLOSS})
+
+
+def test_content_hash_of_other_values_is_by_string():
+    product_id = UUID("01900000-0000-7000-8000-000000000001")
+    at = datetime(2025, 1, 2, tzinfo=timezone.utc)
+
+    assert content_hash({"id": product_id, "at": at}) == content_hash({"id": str(product_id), "at": str(at)})
+    assert len(content_hash()) == 32
@@ -0,0 +1,98 @@
+"""Tests for the incremental reading of vendor files."""
+
+import io
+import json
+
+import pytest
+from domain.importer.rows import PRODUCT, PRODUCT_LINE, VENDOR
+from domain.importer.stream import JsonStream, read_vendor_file
+
+
+VENDOR_FILE = {
+    "vendor_name": "Vendor",
+    "slug": "vendor",
+    "product_lines": [
+        {"product_line_name": "Line", "products": [{"name": "Red", "price": 1.25}, {"name": "Blue", "price": 10}]},
+        {"product_line_name": "Empty", "products": []},
+    ],
+}
+
+RECORDS = [
+    (VENDOR, {"vendor_name": "Vendor", "slug": "vendor"}),
+    (PRODUCT_LINE, {"product_line_name": "Line"}),
+    (PRODUCT, {"name": "Red", "price": 1.25}),
+    (PRODUCT, {"name": "Blue", "price": 10}),
+    (PRODUCT_LINE, {"product_line_name": "Empty"}),
+]
+
+
+def read(text: str, chunk_size: int = 7) -> list:
+    stream = JsonStream(io.StringIO(text), chunk_size)
+    return [stream.value() for _ in stream.items()]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64])
+def test_values_split_across_chunks(chunk_size):
+    values = [12345.678, -9, 'a string, with "quotes" and \\', {"nested": [1, 2]}, True, None, 1e21]
+    text = json.dumps(values)
+
+    assert read(text, chunk_size) == values
+
+
+def test_number_at_the_end_of_a_chunk_is_read_whole():
+    # "[1" then "23]": the number must not be cut to 1.
+    assert read("[123]", chunk_size=2) == [123]
+
+
+def test_offset_counts_consumed_characters():
+    stream = JsonStream(io.StringIO('  ["abc", 1]'), chunk_size=3)
+    stream.expect("[")
+    stream.value()
+
+    assert stream.offset == len('  ["abc"')
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1 << 16])
+def test_read_vendor_file(chunk_size, monkeypatch):
+    monkeypatch.setattr("domain.importer.stream.JsonStream", lambda file: JsonStream(file, chunk_size))
+    text = json.dumps(VENDOR_FILE, indent=2)
+
+    assert list(read_vendor_file(io.StringIO(text))) == RECORDS
+    assert list(read_vendor_file(io.StringIO(f"[{text}, {text}]"))) == RECORDS * 2
+
+
+def test_read_vendor_file_without_product_lines():
+    assert list(read_vendor_file(io.StringIO('{"slug": "vendor"}'))) == [(VENDOR, {"slug": "vendor"})]
+
+
+def test_fields_after_the_children_are_an_error():
+    text = json.dumps({"slug": "vendor", "product_lines": [], "vendor_name": "Vendor"})
+
+    with pytest.raises(ValueError, match="'vendor_name' comes after 'product_lines'"):
+        list(read_vendor_file(io.StringIO(text)))
+
+
+def test_product_line_fields_after_its_products_are_an_error():
+    text = json.dumps({"slug": "vendor", "product_lines": [{"products": [], "product_line_name": "Line"}]})
+
+    with pytest.raises(ValueError, match="'product_line_name' comes after 'products'"):
+        list(read_vendor_file(io.StringIO(text)))
+
+
+def test_trailing_data_is_an_error():
+    with pytest.raises(ValueError, match="Unexpected data after the vendors"):
+        list(read_vendor_file(io.StringIO('{"slug": "vendor"} {"slug": "other"}')))
+
+
+def test_trailing_whitespace_is_not_an_error():
+    assert list(read_vendor_file(io.StringIO('{"slug": "vendor"}\n\n'))) == [(VENDOR, {"slug": "vendor"})]
+
+
+def test_truncated_file_is_an_error():
+    with pytest.raises(ValueError, match="Expected"):
+        list(read_vendor_file(io.StringIO('{"slug": "vendor", "product_lines": [')))
+
+
+def test_invalid_value_is_an_error():
+    with pytest.raises(json.JSONDecodeError):
+        read('[{"name": }]')
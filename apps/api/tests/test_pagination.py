@@ -0,0 +1,167 @@
+"""Tests for the count strategies of paginated lists."""
+
+from types import SimpleNamespace
+
+import pytest
+from advanced_alchemy.filters import LimitOffset, SearchFilter
+from domain.catalog.models import ProductCatalog
+from domain.pagination import WRITTEN_TABLES_KEY, CountStrategy, filtered_statement, invalidate_counts, resolve_total
+from services import Cache
+from sqlalchemy import select
+from src.api.main import app  # noqa: F401  (maps every model, registering the catalog triggers)
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key: str) -> None:
+        self.redis.incremented.append(key)
+        self.redis.values[key] = self.redis.values.get(key, 0) + 1
+
+    async def execute(self) -> None:
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: dict[str, int] = {}
+        self.incremented: list[str] = []
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def mget(self, keys: list[str]) -> list[int | None]:
+        return [self.values.get(key) for key in keys]
+
+    async def get(self, key: str) -> int | None:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: int, ex: int | None = None) -> None:
+        self.values[key] = value
+
+
+class FakeSession:
+    def __init__(self, *written: str):
+        self.info = {WRITTEN_TABLES_KEY: set(written)}
+
+
+class FakeService:
+    """Counts the rows of the catalog, as `total`."""
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.counted = 0
+
+    async def count(self, *filters) -> int:
+        self.counted += 1
+        return self.total
+
+
+@pytest.fixture(autouse=True)
+def statement(monkeypatch):
+    monkeypatch.setattr("domain.pagination.filtered_statement", lambda service, *filters: select(ProductCatalog))
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(Cache, "_client", client)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_invalidate_counts_bumps_tables_written_by_triggers(redis):
+    await invalidate_counts(FakeSession("product_variants"))
+
+    assert sorted(redis.incremented) == ["count:generation:product_catalog", "count:generation:product_variants"]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_counts_leaves_unrelated_tables(redis):
+    await invalidate_counts(FakeSession("locales"))
+
+    assert redis.incremented == ["count:generation:locales"]
+
+
+@pytest.mark.asyncio
+async def test_exact_always_counts():
+    service = FakeService(total=42)
+
+    assert await resolve_total(service, count=CountStrategy.exact, offset=0, seen=3, has_more=False) == (42, False)
+    assert service.counted == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [CountStrategy.cached, CountStrategy.estimated, CountStrategy.none])
+async def test_last_page_gives_the_total_without_counting(count):
+    service = FakeService(total=42)
+
+    assert await resolve_total(service, count=count, offset=20, seen=5, has_more=False) == (25, False)
+    assert await resolve_total(service, count=count, offset=0, seen=0, has_more=False) == (0, False)
+    assert service.counted == 0
+
+
+@pytest.mark.asyncio
+async def test_none_has_no_total():
+    service = FakeService(total=42)
+
+    assert await resolve_total(service, count=CountStrategy.none, offset=0, seen=10, has_more=True) == (None, False)
+    # Past the last row the page does not tell the total either.
+    assert await resolve_total(service, count=CountStrategy.none, offset=50, seen=0, has_more=False) == (None, False)
+    assert service.counted == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("estimate", "total"), [(1000, 1000), (5, 31)])
+async def test_estimated_never_reports_fewer_rows_than_seen(monkeypatch, estimate, total):
+    async def estimate_count(service, *filters):
+        return estimate
+
+    monkeypatch.setattr("domain.pagination.estimate_count", estimate_count)
+
+    result = await resolve_total(FakeService(), count=CountStrategy.estimated, offset=20, seen=10, has_more=True)
+
+    assert result == (total, True)
+
+
+@pytest.mark.asyncio
+async def test_cached_counts_once_until_the_table_is_written(redis):
+    service = FakeService(total=42)
+
+    for _ in range(2):
+        assert await resolve_total(service, count=CountStrategy.cached, offset=0, seen=10, has_more=True) == (42, False)
+    assert service.counted == 1
+
+    service.total = 43
+    await invalidate_counts(FakeSession("product_variants"))
+
+    assert await resolve_total(service, count=CountStrategy.cached, offset=0, seen=10, has_more=True) == (43, False)
+    assert service.counted == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_counts_exactly_without_redis(monkeypatch):
+    monkeypatch.setattr(Cache, "_client", None)
+    service = FakeService(total=42)
+
+    assert await resolve_total(service, count=CountStrategy.cached, offset=0, seen=10, has_more=True) == (42, False)
+    assert service.counted == 1
+
+
+def test_filtered_statement_applies_filters_but_not_pagination():
+    repository = SimpleNamespace(statement=select(ProductCatalog), model_type=ProductCatalog)
+    filters = (ProductCatalog.vendor_slug == "citadel", SearchFilter("name", "red"), LimitOffset(10, 20))
+
+    statement = filtered_statement(SimpleNamespace(repository=repository), *filters)
+
+    assert str(statement.whereclause) == (
+        "product_catalog.vendor_slug = :vendor_slug_1 AND product_catalog.name LIKE :name_1"
+    )
+    assert "LIMIT" not in str(statement) and "OFFSET" not in str(statement)
@@ -1,18 +1,21 @@
 #!/bin/bash
 
-# Generate SQL statements from the JSON data
-echo "Generating SQL statements from JSON data..."
-python apps/api/src/scripts/generate_sql.py examples/data-sample-01.json import_data.sql
+# Generate SQL files from the JSON data
+echo "Generating SQL files from JSON data..."
+PYTHONPATH=apps/api/src/api python apps/api/src/scripts/generate_sql.py examples/data-sample-01.json -o import_data
 
-# Check if the SQL file was generated successfully
-if [ ! -f "import_data.sql" ]; then
-    echo "Failed to generate SQL statements."
+# Check if the SQL files were generated successfully
+if [ ! -f "import_data/2-merge.sql" ]; then
+    echo "Failed to generate SQL files."
     exit 1
 fi
 
-echo "SQL statements generated successfully and saved to import_data.sql"
+echo "SQL files generated successfully and saved to import_data/"
 echo ""
 echo "To import the data into PostgreSQL, run the following commands:"
 echo "1. Install PostgreSQL if not already installed"
-echo "2. Create the database: psql -U postgres -c 'CREATE DATABASE coloragent;'"
-echo "3. Execute the SQL statements: psql -U postgres -d coloragent -f import_data.sql"
+echo "2. Create the database and its tables, e.g. by starting the API once"
+echo "3. Create the staging tables: psql -U postgres -d coloragent -f import_data/0-setup.sql"
+echo "4. Load the data files, in parallel if you like:"
+echo "   ls import_data/1-data-*.sql | xargs -P 4 -n 1 psql -U postgres -d coloragent -q -f"
+echo "5. Merge them into the tables: psql -U postgres -d coloragent -f import_data/2-merge.sql"